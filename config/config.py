@@ -41,9 +41,26 @@ class Configuration(object, metaclass=Singleton):
             # [utility]
             self.PRIVATE_UTILITY = config.get('utility', 'private_utility')
             self.SUBMODULAR_P_UTILITY = config.getboolean('utility', 'submodular_p_utility')
+            self.UTILITY_CACHE_SIZE = config.getint('utility', 'utility_cache_size', fallback=100000)
+            self.DIGEST_CACHE_SIZE = config.getint('utility', 'digest_cache_size', fallback=100000)
+            self.SCORING_WORKERS = config.getint('utility', 'scoring_workers', fallback=0)
+            self.PARALLEL_SCORING_THRESHOLD = config.getint('utility', 'parallel_scoring_threshold', fallback=5000)
+
+            # [embedding]
+            self.EMBEDDING_STRATEGY = config.get('embedding', 'embedding_strategy', fallback='GREEDY')
+            self.ANYTIME_EMBEDDING = config.getboolean('embedding', 'anytime_embedding', fallback=False)
+            self.INCREMENTAL_REBID = config.getboolean('embedding', 'incremental_rebid', fallback=False)
+            self.EMBEDDING_SEEDS = config.getint('embedding', 'embedding_seeds', fallback=16)
+            self.BNB_NODE_BUDGET = config.getint('embedding', 'bnb_node_budget', fallback=2000)
+
+            # [bidding]
+            self.BIDDING_STORE = config.get('bidding', 'bidding_store', fallback='DICT')
+            self.WIRE_FORMAT = config.get('bidding', 'wire_format', fallback='JSON')
+            self.DELTA_SYNC = config.getboolean('bidding', 'delta_sync', fallback=False)
 
             # [logging]
             self.LOG_LEVEL = config.get('logging', 'log_level')
+            self.HOT_PATH_TRACING = config.getboolean('logging', 'hot_path_tracing', fallback=True)
             self.RESULTS_FOLDER = config.get('logging', 'results_folder')
 
             # [problem]
@@ -1,12 +1,24 @@
 import logging
 import colorlog
 
+from config.config import Configuration
+
 
 class LoggingConfiguration:
 
     VERBOSE = 15
     IMPORTANT = 25
 
+    @staticmethod
+    def tracing(level=logging.DEBUG):
+        """
+        Tells if the detailed tracing of hot paths (embedding, utilities, election loops) has to be logged.
+        Hot paths check it before building their log messages, so that nothing is formatted when it is disabled.
+        :param int level: level of the tracing messages
+        :return bool: True if hot_path_tracing is enabled and the level is not discarded
+        """
+        return Configuration().HOT_PATH_TRACING and logging.getLogger().isEnabledFor(level)
+
     def __init__(self, log_level, log_file=None):
         """
 
@@ -59,3 +71,24 @@ class LoggingConfiguration:
             logging.basicConfig(level=log_level,
                                 datefmt='%d/%m/%Y %H:%M:%S',
                                 handlers=[stream_handler])
+
+
+class LazyFormat:
+    """
+    Defers the formatting of a logged object until the log record is actually emitted, e.g.
+    logging.info("Winners: %s", LazyFormat(pprint.pformat, winners))
+    """
+
+    def __init__(self, formatter, *args, **kwargs):
+        """
+
+        :param formatter: function returning the string to log, as pprint.pformat
+        :param args: arguments of formatter
+        :param kwargs: keyword arguments of formatter
+        """
+        self.formatter = formatter
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return self.formatter(*self.args, **self.kwargs)
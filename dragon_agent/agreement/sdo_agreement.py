@@ -1,12 +1,12 @@
-import hashlib
 import logging
 import pprint
 
 import time
 
-from config.logging_configuration import LoggingConfiguration
+from config.logging_configuration import LoggingConfiguration, LazyFormat
 from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
 from dragon_agent.orchestration.sdo_orchestrator import SdoOrchestrator
+from dragon_agent.orchestration.winner_set import WinnerSet
 
 
 class SdoAgreement:
@@ -37,7 +37,8 @@ class SdoAgreement:
 
     def sdo_multi_agreement(self, received_data, rebid_enabled=True):
         """
-
+        Nodes whose bids, as received from every sender, are the ones already held are not merged again, and their
+        decision table is not evaluated with senders that also agree on their winners (see _unchanged_node).
         :param received_data:
         :param rebid_enabled:
         :type received_data: dict[str, dict[str, union[ dict[str, set of str], dict[str, dict[str, dict[str, union[int, str]]]] ]]]
@@ -46,7 +47,7 @@ class SdoAgreement:
 
         logging.info("--------------- START AGREEMENT ---------------")
 
-        current_bidding_data = dict(self.sdo_bidder.bidding_data)
+        current_bidding_data = self.sdo_bidder.bidding_data.copy()
         current_winners = dict(self.sdo_bidder.per_node_winners)
 
         overbid = False
@@ -55,10 +56,19 @@ class SdoAgreement:
         self.rebroadcast = False
         self.per_sdo_agreement = set()
 
+        unchanged_nodes = set()
         for node in self.rap.nodes:
 
             logging.log(LoggingConfiguration.IMPORTANT, "Conflict resolution for node '" + node + "'")
 
+            if self._unchanged_node(received_data, current_bidding_data, node):
+                # the merge would give back the local data
+                logging.info("Received bids for node '" + node + "' are the local ones")
+                unchanged_nodes.add(node)
+                # the table is not replaced by a merge, while a rebid may assign bids to it
+                current_bidding_data.detach(node)
+                continue
+
             # merge all information keeping the most updated one
             merged_data = dict()
 
@@ -122,25 +132,30 @@ class SdoAgreement:
             # check if the received message changed the situation
             for node in self.rap.nodes:
 
-                logging.info("Loc winners: " + str(sorted(current_winners[node])))
-                logging.info("Rec winners: " + str(sorted(received_data[sender]['winners'][node])))
-                logging.info("New winners: " + str(sorted(self.sdo_bidder.per_node_winners[node])))
-
-                current_winners_digest = hashlib.sha256(str(sorted(current_winners[node])).encode()).hexdigest()
-                rcvd_winners_digest = hashlib.sha256(
-                    str(sorted(received_data[sender]['winners'][node])).encode()).hexdigest()
-                new_winners_digest = hashlib.sha256(
-                    str(sorted(self.sdo_bidder.per_node_winners[node])).encode()).hexdigest()
-
-                current_node_consumption = {r: sum([current_bidding_data[node][s]["consumption"][r]
-                                                    for s in self.rap.sdos])
-                                            for r in self.rap.resources}
-                rcvd_node_consumption = {r: sum([received_data[sender]['bidding-data'][node][s]["consumption"][r]
-                                                 for s in self.rap.sdos])
-                                         for r in self.rap.resources}
-                new_node_consumption = {r: sum([self.sdo_bidder.bidding_data[node][s]["consumption"][r]
-                                                for s in self.rap.sdos])
-                                        for r in self.rap.resources}
+                logging.info("Loc winners: %s", LazyFormat(sorted, current_winners[node]))
+                logging.info("Rec winners: %s", LazyFormat(sorted, received_data[sender]['winners'][node]))
+                logging.info("New winners: %s", LazyFormat(sorted, self.sdo_bidder.per_node_winners[node]))
+
+                if node in unchanged_nodes \
+                        and not self._is_reset(sender, current_winners, received_data[sender]['winners']) \
+                        and WinnerSet.of(current_winners[node]) \
+                        == WinnerSet.of(received_data[sender]['winners'][node]) \
+                        == WinnerSet.of(self.sdo_bidder.per_node_winners[node]):
+                    # same bids and winners everywhere, i.e. same bid times and consumptions
+                    logging.log(LoggingConfiguration.IMPORTANT, "LEAVE & NO-REBROADCAST")
+                    logging.info("Agreement for node: True")
+                    continue
+
+                # winner sets are compared on their fingerprints first
+                current_node_winners = WinnerSet.of(current_winners[node])
+                rcvd_node_winners = WinnerSet.of(received_data[sender]['winners'][node])
+                new_node_winners = WinnerSet.of(self.sdo_bidder.per_node_winners[node])
+
+                current_node_consumption = self.rap.get_node_assignment_dict_consumption(current_bidding_data[node])
+                rcvd_node_consumption = self.rap.get_node_assignment_dict_consumption(
+                    received_data[sender]['bidding-data'][node])
+                new_node_consumption = self.rap.get_node_assignment_dict_consumption(
+                    self.sdo_bidder.bidding_data[node])
 
                 # NOTE: in our decision table "UPDATE" means "keep the merge result"
 
@@ -158,15 +173,14 @@ class SdoAgreement:
                 '''
                 agreement_on_node = False
 
-                if sender in current_winners and sender not in received_data[sender]['winners'] \
-                        and self.sdo_name in received_data[sender]['winners'] and self.sdo_name not in current_winners:
+                if self._is_reset(sender, current_winners, received_data[sender]['winners']):
                     # i is winner for k and k is winner for i
                     # reset & rebroadcast (*?)
                     logging.log(LoggingConfiguration.IMPORTANT, "RESET & REBROADCAST")
                     self._reset(node)
                     self.rebroadcast = True
                     self.updated = True
-                elif current_winners_digest == rcvd_winners_digest == new_winners_digest:
+                elif current_node_winners == rcvd_node_winners == new_node_winners:
                     logging.info("Current winners are equals to received!")
                     if self._compare_bid_times(received_data[sender]['bidding-data'][node], current_bidding_data[node]) > 0:
                         # received at least a new bid time
@@ -197,14 +211,14 @@ class SdoAgreement:
                         #     # leave & rebroadcast
                         #     logging.log(LoggingConfiguration.IMPORTANT, "LEAVE & REBROADCAST")
                         #     self.rebroadcast = True
-                elif rcvd_winners_digest == new_winners_digest:  # winners are same of received
+                elif rcvd_node_winners == new_node_winners:  # winners are same of received
                     # update & rebroadcast
                     logging.log(LoggingConfiguration.IMPORTANT, "UPDATE & REBROADCAST")
                     if self.rap.check_equals(rcvd_node_consumption, current_node_consumption):
                         agreement_on_node = True
                     self.rebroadcast = True
                     self.updated = True
-                elif current_winners_digest == new_winners_digest:  # winners remains the same
+                elif current_node_winners == new_node_winners:  # winners remains the same
                     logging.info("New winners are same of current but not received")
                     if self.sdo_name in self.sdo_bidder.per_node_winners[node]:
                         if self.sdo_name not in received_data[sender]['winners'][node]:
@@ -254,12 +268,12 @@ class SdoAgreement:
 
         logging.info("--------------- START AGREEMENT ---------------")
 
-        current_bidding_data = dict(self.sdo_bidder.bidding_data)
+        current_bidding_data = self.sdo_bidder.bidding_data.copy()
         current_winners = dict(self.sdo_bidder.per_node_winners)
 
         logging.info("Received data from '" + sender + "'")
-        logging.log(LoggingConfiguration.VERBOSE, "Local data: " + pprint.pformat(current_bidding_data))
-        logging.log(LoggingConfiguration.VERBOSE, "Received data: " + pprint.pformat(received_bidding_data))
+        logging.log(LoggingConfiguration.VERBOSE, "Local data: %s", LazyFormat(pprint.pformat, current_bidding_data))
+        logging.log(LoggingConfiguration.VERBOSE, "Received data: %s", LazyFormat(pprint.pformat, received_bidding_data))
 
         overbid = False
         self.agreement = True
@@ -358,24 +372,18 @@ class SdoAgreement:
         # check if the received message changed the situation
         for node in self.rap.nodes:
 
-            logging.info("Loc winners: " + str(sorted(current_winners[node])))
-            logging.info("Rec winners: " + str(sorted(received_winners[node])))
-            logging.info("New winners: " + str(sorted(self.sdo_bidder.per_node_winners[node])))
-
-            current_winners_digest = hashlib.sha256(str(sorted(current_winners[node])).encode()).hexdigest()
-            rcvd_winners_digest = hashlib.sha256(str(sorted(received_winners[node])).encode()).hexdigest()
-            new_winners_digest = hashlib.sha256(
-                str(sorted(self.sdo_bidder.per_node_winners[node])).encode()).hexdigest()
-
-            current_node_consumption = {r: sum([current_bidding_data[node][s]["consumption"][r]
-                                                for s in self.rap.sdos])
-                                        for r in self.rap.resources}
-            rcvd_node_consumption = {r: sum([received_bidding_data[node][s]["consumption"][r]
-                                             for s in self.rap.sdos])
-                                     for r in self.rap.resources}
-            new_node_consumption = {r: sum([self.sdo_bidder.bidding_data[node][s]["consumption"][r]
-                                            for s in self.rap.sdos])
-                                    for r in self.rap.resources}
+            logging.info("Loc winners: %s", LazyFormat(sorted, current_winners[node]))
+            logging.info("Rec winners: %s", LazyFormat(sorted, received_winners[node]))
+            logging.info("New winners: %s", LazyFormat(sorted, self.sdo_bidder.per_node_winners[node]))
+
+            # winner sets are compared on their fingerprints first
+            current_node_winners = WinnerSet.of(current_winners[node])
+            rcvd_node_winners = WinnerSet.of(received_winners[node])
+            new_node_winners = WinnerSet.of(self.sdo_bidder.per_node_winners[node])
+
+            current_node_consumption = self.rap.get_node_assignment_dict_consumption(current_bidding_data[node])
+            rcvd_node_consumption = self.rap.get_node_assignment_dict_consumption(received_bidding_data[node])
+            new_node_consumption = self.rap.get_node_assignment_dict_consumption(self.sdo_bidder.bidding_data[node])
 
             # NOTE: in our decision table "UPDATE" means "keep the merge result"
 
@@ -401,15 +409,14 @@ class SdoAgreement:
                 self.updated = True
                 logging.info("---------------- END AGREEMENT ----------------")
                 return  # if sdo rebidded, we already completed the agreement phase for all nodes
-            elif sender in current_winners and sender not in received_winners \
-                    and self.sdo_name in received_winners and self.sdo_name not in current_winners:
+            elif self._is_reset(sender, current_winners, received_winners):
                 # i is winner for k and k is winner for i
                 # reset & rebroadcast (*?)
                 logging.log(LoggingConfiguration.IMPORTANT, "RESET & REBROADCAST")
                 self._reset(node)
                 self.rebroadcast = True
                 self.updated = True
-            elif current_winners_digest == rcvd_winners_digest == new_winners_digest:
+            elif current_node_winners == rcvd_node_winners == new_node_winners:
                 logging.info("Current winners are equals to received!")
                 if self._compare_bid_times(received_bidding_data[node], current_bidding_data[node]) > 0:
                     # received at least a new bid time
@@ -440,14 +447,14 @@ class SdoAgreement:
                     #     # leave & rebroadcast
                     #     logging.log(LoggingConfiguration.IMPORTANT, "LEAVE & REBROADCAST")
                     #     self.rebroadcast = True
-            elif rcvd_winners_digest == new_winners_digest:  # winners are same of received
+            elif rcvd_node_winners == new_node_winners:  # winners are same of received
                 # update & rebroadcast
                 logging.log(LoggingConfiguration.IMPORTANT, "UPDATE & REBROADCAST")
                 if self.rap.check_equals(rcvd_node_consumption, current_node_consumption):
                     agreement_on_node = True
                 self.rebroadcast = True
                 self.updated = True
-            elif current_winners_digest == new_winners_digest:  # winners remains the same
+            elif current_node_winners == new_node_winners:  # winners remains the same
                 logging.info("New winners are same of current but not received")
                 if self.sdo_name in self.sdo_bidder.per_node_winners[node]:
                     if self.sdo_name not in received_winners[node]:
@@ -480,6 +487,32 @@ class SdoAgreement:
         # repeat for each node. --)
         logging.info("---------------- END AGREEMENT ----------------")
 
+    @staticmethod
+    def _unchanged_node(received_data, current_bidding_data, node):
+        """
+
+        :param received_data: data received from each sender (see sdo_multi_agreement)
+        :param current_bidding_data: local bidding data
+        :param str node:
+        :return bool: True if every sender sent, for the node, the same bids (and bid times) held locally
+        """
+        return all(received_data[sender]['bidding-data'][node] == current_bidding_data[node]
+                   for sender in received_data)
+
+    def _is_reset(self, sender, current_winners, received_winners):
+        """
+        RESET rule of the decision table: i is winner for k and k is winner for i.
+        NOTE: as in the original decision table, the sdos are looked up among the keys of the per-node winners, i.e.
+        among the nodes, so the rule never applies while sdo and node names differ. The quirk is kept on purpose,
+        checking current_winners[node] instead would change the outcome of the agreement.
+        :param str sender:
+        :param dict[str, set of str] current_winners: local winners of each node
+        :param dict[str, set of str] received_winners: winners of each node, as received from the sender
+        :return bool: True if the node should be reset and rebroadcast
+        """
+        return sender in current_winners and sender not in received_winners \
+            and self.sdo_name in received_winners and self.sdo_name not in current_winners
+
     @staticmethod
     def _old_bids_win(node_bidding_data, winners):
         """
@@ -522,7 +555,10 @@ class SdoAgreement:
 
         :param node: the node where the bid time should be updated
         """
-        self.sdo_bidder.bidding_data[node][self.sdo_name]['timestamp'] = time.time()
+        # bid entries are replaced, not edited (see BiddingData)
+        bid = dict(self.sdo_bidder.bidding_data[node][self.sdo_name])
+        bid['timestamp'] = time.time()
+        self.sdo_bidder.bidding_data[node][self.sdo_name] = bid
 
     def _reset(self, node):
         """
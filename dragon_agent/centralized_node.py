@@ -98,6 +98,8 @@ class CentralizedNode:
         '''
 
         self.end_time = time.time()
+        for sdo_name in self.sdo_names:
+            self.sdo_bidders[sdo_name].close()
 
         logging.log(LoggingConfiguration.IMPORTANT, "COMPLETED")
         total_service_utility = 0
@@ -11,6 +11,8 @@ from config.logging_configuration import LoggingConfiguration
 from dragon_agent.agreement.sdo_agreement import SdoAgreement
 from dragon_agent.orchestration.sdo_orchestrator import SdoOrchestrator
 from dragon_agent.utils.bidding_message import BiddingMessage
+from dragon_agent.utils.delta_sync import DeltaSynchronizer
+from dragon_agent.utils.message_codec import BiddingMessageCodec
 from dragon_agent.utils.messaging import Messaging
 from dragon_agent.utils.neighborhood import NeighborhoodDetector
 
@@ -39,6 +41,9 @@ class SDONode:
 
         # init messaging
         self._messaging = Messaging("localhost")
+        self._messaging.codec = BiddingMessageCodec(self.rap)
+        self.delta_sync = DeltaSynchronizer(self.sdo_name)
+        self.connected_neighbors = set()
 
         # message counters
         self.message_counter = 0
@@ -116,6 +121,7 @@ class SDONode:
               " | received messages: " + str(self.received_messages).rjust(7))
 
         # disconnect
+        self.sdo_bidder.close()
         self._messaging.disconnect()
         return strong_agreement, self.sdo_bidder.implementations, self.message_rates
 
@@ -124,12 +130,13 @@ class SDONode:
         self.broadcast()
         while self.end_time == 0:
             messages = self.dequeue_next_messages()
-            if len(messages) == 0:
-                continue
-            self.bid_messages_handler(messages)
+            if len(messages) > 0:
+                self.bid_messages_handler(messages)
             # for i, message in enumerate(messages):
             #     is_last = i == len(messages) - 1
             #     self.bid_message_handler(message, last=is_last)
+            # snapshots asked by or to the neighbors, if not sent by a broadcast
+            self.serve_sync_requests()
         self._messaging.disconnect_write()
 
     def bid_message_enqueue(self, message):
@@ -139,9 +146,12 @@ class SDONode:
         :return:
         """
         self.last_message_time = time.time()
+        # deltas are applied here, in the order they are received, as just the last message of each queue is handled
+        message = self.delta_sync.receive(message)
         self.cv.acquire()
         # self.queue_locks[message.sender].acquire()
-        self.message_queues[message.sender].append(message)
+        if message is not None:
+            self.message_queues[message.sender].append(message)
         # self.queue_locks[message.sender].release()
         self.cv.notify_all()
         self.cv.release()
@@ -312,19 +322,28 @@ class SDONode:
         """
         logging.info("Broadcasting bidding information ...")
 
-        # build the message to broadcast
-        message_to_broadcast = BiddingMessage(sender=self.sdo_name,
-                                              winners=self.sdo_bidder.per_node_winners,
-                                              bidding_data=self.sdo_bidder.bidding_data)
-
         # get the neighbors list
         neighborhood = self.neighborhood_detector.get_current_neighborhood()
 
+        # build the messages to broadcast
+        if configuration.DELTA_SYNC:
+            # reconnected neighbors are sent a snapshot
+            for neighbor in set(neighborhood) - self.connected_neighbors:
+                self.delta_sync.forget(neighbor)
+            self.connected_neighbors = set(neighborhood)
+            messages = self.delta_sync.messages(neighborhood, self.sdo_bidder.per_node_winners,
+                                                self.sdo_bidder.bidding_data)
+        else:
+            message_to_broadcast = BiddingMessage(sender=self.sdo_name,
+                                                  winners=self.sdo_bidder.per_node_winners,
+                                                  bidding_data=self.sdo_bidder.bidding_data)
+            messages = {neighbor: message_to_broadcast for neighbor in neighborhood}
+
         # time.sleep(0.06)
 
         for neighbor in neighborhood:
             logging.info("Sending message to neighbor '" + neighbor + "' ...")
-            self.send_bid_message(neighbor, message_to_broadcast)
+            self.send_bid_message(neighbor, messages[neighbor])
             logging.info("Message has been sent.")
             self.message_counter += 1
 
@@ -347,6 +366,23 @@ class SDONode:
 
         logging.info("broadcast successfully completed.")
 
+    def serve_sync_requests(self):
+        """
+        Sends a snapshot to the neighbors that asked for it, and asks it to the ones whose deltas could not be applied
+        (see DeltaSynchronizer)
+        """
+        for neighbors, resync in ((self.delta_sync.snapshot_requests(), False),
+                                  (self.delta_sync.resync_requests(), True)):
+            if len(neighbors) == 0:
+                continue
+            messages = self.delta_sync.messages(neighbors, self.sdo_bidder.per_node_winners,
+                                                self.sdo_bidder.bidding_data, resync=resync)
+            for neighbor, message in messages.items():
+                logging.info("Sending " + ("snapshot request" if resync else "snapshot") + " to neighbor '" +
+                             neighbor + "' ...")
+                self.send_bid_message(neighbor, message)
+                self.message_counter += 1
+
     def send_bid_message(self, dst_sdo, message):
         """
 
@@ -0,0 +1,171 @@
+import itertools
+
+
+class NodeBiddingData(dict):
+    """
+    Bids placed on a single node, i.e. dict {sdo: {'bid': int, 'consumption': dict, 'timestamp': float}}.
+    The table carries a version that is renewed each time the bid or the consumption of some sdo changes,
+    so that results depending just on those values (e.g. the election) can be cached against it.
+    The table also keeps the total consumption of its bids, computed on first request and then updated as single
+    bids are replaced.
+    Bid entries must be replaced rather than edited in place (editing the timestamp is allowed).
+    """
+
+    _versions = itertools.count(1)
+
+    def __init__(self, node_bidding_data=(), previous=None):
+        """
+
+        :param dict[str, dict[str, union[int, dict, float]]] node_bidding_data: initial bids
+        :param NodeBiddingData previous: table replaced by this one, if it holds the same bids its version is kept
+        """
+        super().__init__(node_bidding_data)
+        self._total_consumption = None
+        """ For each resource, the sum of the consumption of all the bids, None if not computed yet """
+        if previous is not None and self._same_bids(self, previous):
+            self.version = previous.version
+            if previous._total_consumption is not None:
+                self._total_consumption = dict(previous._total_consumption)
+        else:
+            self.version = next(self._versions)
+
+    def __setitem__(self, sdo, bid):
+        if sdo not in self or not self._same_bid(self[sdo], bid):
+            self.version = next(self._versions)
+            if sdo in self:
+                self._add_to_total(self[sdo], -1)
+            self._add_to_total(bid, 1)
+        super().__setitem__(sdo, bid)
+
+    def __delitem__(self, sdo):
+        self.version = next(self._versions)
+        self._add_to_total(self[sdo], -1)
+        super().__delitem__(sdo)
+
+    def update(self, *args, **kwargs):
+        for sdo, bid in dict(*args, **kwargs).items():
+            self[sdo] = bid
+
+    def setdefault(self, sdo, bid=None):
+        if sdo not in self:
+            self[sdo] = bid
+        return self[sdo]
+
+    def pop(self, sdo, *args):
+        self.version = next(self._versions)
+        if sdo in self:
+            self._add_to_total(self[sdo], -1)
+        return super().pop(sdo, *args)
+
+    def popitem(self):
+        self.version = next(self._versions)
+        sdo, bid = super().popitem()
+        self._add_to_total(bid, -1)
+        return sdo, bid
+
+    def clear(self):
+        self.version = next(self._versions)
+        self._total_consumption = None
+        super().clear()
+
+    def copy(self):
+        return NodeBiddingData(self, previous=self)
+
+    def __reduce__(self):
+        # copies and pickles are new tables (as if built from a dict), the total is computed again on request
+        return NodeBiddingData, (dict(self),)
+
+    def total_consumption(self):
+        """
+
+        :return dict[str, int]: for each resource, the sum of the consumption of all the bids
+        """
+        if self._total_consumption is None:
+            self._total_consumption = dict()
+            for bid in self.values():
+                self._add_to_total(bid, 1)
+        return dict(self._total_consumption)
+
+    def _add_to_total(self, bid, sign):
+        """
+        Updates the total consumption, if already computed, with the consumption of a single bid
+        :param dict bid:
+        :param int sign: 1 if the bid is added to the table, -1 if it is removed
+        """
+        if self._total_consumption is None:
+            return
+        for resource, amount in bid.get('consumption', {}).items():
+            self._total_consumption[resource] = self._total_consumption.get(resource, 0) + sign*amount
+
+    @staticmethod
+    def _same_bid(bid_a, bid_b):
+        """
+
+        :param dict bid_a:
+        :param dict bid_b:
+        :return: True if bid value and consumption are the same (timestamp is not considered)
+        """
+        return bid_a.get('bid') == bid_b.get('bid') and bid_a.get('consumption') == bid_b.get('consumption')
+
+    @staticmethod
+    def _same_bids(node_bidding_data_a, node_bidding_data_b):
+        """
+
+        :param dict node_bidding_data_a:
+        :param dict node_bidding_data_b:
+        :return: True if both tables hold the same bids for the same sdos
+        """
+        if node_bidding_data_a.keys() != node_bidding_data_b.keys():
+            return False
+        for sdo in node_bidding_data_a:
+            if not NodeBiddingData._same_bid(node_bidding_data_a[sdo], node_bidding_data_b[sdo]):
+                return False
+        return True
+
+
+class BiddingData(dict):
+    """
+    Bids placed on each node, i.e. dict {node: NodeBiddingData}.
+    Tables assigned to a node are wrapped in a new NodeBiddingData, so the previous table is never modified.
+    """
+
+    def __init__(self, bidding_data=()):
+        """
+
+        :param dict[str, dict[str, dict[str, union[int, dict, float]]]] bidding_data: initial bids for each node
+        """
+        super().__init__()
+        for node, node_bidding_data in dict(bidding_data).items():
+            self[node] = node_bidding_data
+
+    def __setitem__(self, node, node_bidding_data):
+        if not isinstance(node_bidding_data, NodeBiddingData):
+            node_bidding_data = NodeBiddingData(node_bidding_data, previous=self.get(node))
+        super().__setitem__(node, node_bidding_data)
+
+    def update(self, *args, **kwargs):
+        for node, node_bidding_data in dict(*args, **kwargs).items():
+            self[node] = node_bidding_data
+
+    def setdefault(self, node, node_bidding_data=None):
+        if node not in self:
+            self[node] = node_bidding_data if node_bidding_data is not None else dict()
+        return self[node]
+
+    def copy(self):
+        """
+        Shallow copy: the copy shares the node tables, that are never modified by table assignments, but are by the
+        assignment of single bids (see detach)
+        :return BiddingData:
+        """
+        bidding_data = BiddingData()
+        for node in self:
+            dict.__setitem__(bidding_data, node, self[node])
+        return bidding_data
+
+    def detach(self, node):
+        """
+        Gives the node a table of its own, so that bids assigned to the table it shared (see copy) do not affect it
+        :param str node:
+        """
+        dict.__setitem__(self, node, self[node].copy())
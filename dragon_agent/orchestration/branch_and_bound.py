@@ -0,0 +1,175 @@
+
+import numpy as np
+
+import time
+
+
+class BranchAndBoundEmbedding:
+    """
+    Branch-and-bound search of the bundle maximizing the sum of the marginal utilities of its services.
+    The search tree is the one of the greedy embedding: at each depth, a service:function:node is added to the bundle,
+    trying candidates by decreasing marginal utility, so that the first bundle found is the greedy one and the search
+    then improves on it. Branches are pruned:
+     - by utility: the utility of the bundle built so far, plus an upper bound of the marginal utility of each missing
+       service (the highest marginal utility, or, with submodular utilities, the last marginal utility added), cannot
+       exceed the best bundle found;
+     - by capacity: some missing service has no function fitting the residual resources of any usable node.
+    The search stops, returning the best bundle found, when the node budget is spent (deterministic) or when the time
+    limit is hit.
+    """
+
+    def __init__(self, orchestrator, resource_bound, blacklisted_nodes, node_budget, time_limit=None,
+                 utility_upper_bound=None, submodular=False):
+        """
+
+        :param orchestrator: the orchestrator of the sdo, giving services, marginal utilities and the instance
+        :param dict[str, dict[str, int]] resource_bound: for each node, resources that the bundle must fit
+        :param set of str blacklisted_nodes: nodes the bundle cannot use
+        :param int node_budget: maximum number of search nodes to expand
+        :param float time_limit: seconds after which the search stops, if not None
+        :param utility_upper_bound: highest marginal utility of any candidate, if None bundles are pruned by capacity
+                                    only
+        :param bool submodular: if True, the marginal utility of the services added in sequence never increases
+        :type orchestrator: SdoOrchestrator
+        """
+        self.orchestrator = orchestrator
+        self.service_bundle = orchestrator.service_bundle
+        self.rap = orchestrator.rap
+        self.node_budget = node_budget
+        self.time_limit = time_limit
+        self.utility_upper_bound = utility_upper_bound
+        self.submodular = submodular
+
+        compiled = self.rap.compiled
+        self.nodes = [node for node in self.rap.nodes
+                      if node not in blacklisted_nodes and resource_bound[node] is not None]
+        self._node_position = {node: i for i, node in enumerate(self.nodes)}
+        self._residual = compiled.to_matrix([resource_bound[node] for node in self.nodes]).astype(float)
+        """ Matrix nodes x resources, residual resources of each usable node along the search """
+        self._implementations = {service: list(self.rap.get_implementations_for_service(service.split('_', 1)[-1]))
+                                 for service in self.service_bundle}
+        self._demands = {service: compiled.to_matrix([self.rap.consumption[function]
+                                                      for function in self._implementations[service]])
+                         for service in self.service_bundle}
+        """ For each service, matrix functions x resources with the consumption of its implementations """
+
+        self.best_utility = None
+        self.best_bundle = None
+        """ Service, function, node and marginal utility of each service of the best bundle, in the order added """
+
+        self.explored = 0
+        self.pruned_by_utility = 0
+        self.pruned_by_capacity = 0
+        self.complete = False
+        """ True if the search ended before the budget, i.e. the best bundle is optimal """
+
+        self._deadline = None
+        self._stopped = False
+
+    def search(self):
+        """
+
+        :return list of (str, str, str, float): service, function, node and marginal utility of each service of the
+                                                best bundle found, in the order they are added; None if none fits
+        """
+        if self.time_limit is not None:
+            self._deadline = time.time() + self.time_limit
+        self._expand(dict(), list(), 0)
+        self.complete = not self._stopped
+        return self.best_bundle
+
+    def summary(self):
+        """
+
+        :return str: the search done so far, as logged by the orchestrator (see SdoOrchestrator.embedding_stats)
+        """
+        return "Branch-and-bound embedding: " + str(self.explored) + " nodes explored, " + \
+            str(self.pruned_by_utility) + " pruned by utility, " + str(self.pruned_by_capacity) + \
+            " pruned by capacity" + (", optimal" if self.complete else ", budget exhausted")
+
+    def _expand(self, bid_bundle, implementations, utility):
+        """
+
+        :param dict bid_bundle: the bundle built so far, as in the greedy embedding
+        :param list of (str, str, str, float) implementations: the services of the bundle, in the order added
+        :param float utility: sum of the marginal utilities of the bundle
+        """
+        missing_services = [service for service in self.service_bundle if service not in bid_bundle]
+        if len(missing_services) == 0:
+            if self.best_utility is None or utility > self.best_utility:
+                self.best_utility = utility
+                self.best_bundle = list(implementations)
+            return
+        if self.explored >= self.node_budget or (self._deadline is not None and time.time() > self._deadline):
+            self._stopped = True
+            return
+        self.explored += 1
+
+        if not self._missing_services_fit(missing_services):
+            self.pruned_by_capacity += 1
+            return
+
+        blacklisted_nodes = set()
+        if self.orchestrator.EXCLUDE_COMPLETED_BID_NODES:
+            blacklisted_nodes = self.orchestrator._get_completed_bid_nodes(bid_bundle)
+        candidates = list()
+        for service in missing_services:
+            service_candidates = [(function, node) for function in self._implementations[service]
+                                  for node in self.nodes if node not in blacklisted_nodes]
+            marginal_utilities = self.orchestrator._marginal_utilities(bid_bundle, service, service_candidates)
+            candidates.extend([(marginal_utility, service, function, node) for (function, node), marginal_utility
+                               in zip(service_candidates, marginal_utilities)])
+        # same order of the greedy ranking (ties broken on the enumeration order)
+        candidates.sort(key=lambda x: x[0], reverse=True)
+
+        for marginal_utility, service, function, node in candidates:
+            if self._stopped:
+                return
+            if self.best_utility is not None and \
+                    utility + marginal_utility + self._missing_utility_bound(len(missing_services) - 1,
+                                                                             marginal_utility) <= self.best_utility:
+                # candidates are sorted by decreasing utility, the following ones cannot do better
+                self.pruned_by_utility += 1
+                return
+            i = self._node_position[node]
+            demand = self.rap.compiled.function_vector(function)
+            if not np.all(demand <= self._residual[i]):
+                continue
+            # utilities order the bundle on added_at, that must be positive (see _pseudo_marginal_utility)
+            bid_bundle[service] = {"function": function, "node": node, "utility": marginal_utility,
+                                   "added_at": len(implementations) + 1}
+            implementations.append((service, function, node, marginal_utility))
+            self._residual[i] -= demand
+            self._expand(bid_bundle, implementations, utility + marginal_utility)
+            self._residual[i] += demand
+            implementations.pop()
+            del bid_bundle[service]
+
+    def _missing_utility_bound(self, missing_services, last_marginal_utility):
+        """
+
+        :param int missing_services: number of services still to add
+        :param float last_marginal_utility: marginal utility of the last service added
+        :return float: upper bound of the utility the missing services may add, inf if unknown
+        """
+        if missing_services == 0:
+            return 0
+        if self.utility_upper_bound is None:
+            return float('inf')
+        bound = self.utility_upper_bound
+        if self.submodular:
+            bound = min(bound, last_marginal_utility)
+        return missing_services*bound
+
+    def _missing_services_fit(self, missing_services):
+        """
+        Relaxed feasibility: each missing service, alone, must have a function fitting the residual resources of some
+        usable node.
+        :param list of str missing_services:
+        :return bool:
+        """
+        for service in missing_services:
+            demands = self._demands[service]
+            if not np.any(np.all(demands[:, np.newaxis, :] <= self._residual[np.newaxis, :, :], axis=-1)):
+                return False
+        return True
@@ -0,0 +1,256 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from dragon_agent.orchestration.bidding_data import NodeBiddingData
+
+
+class DenseBiddingData(MutableMapping):
+    """
+    Array-backed alternative to BiddingData.
+    Bids placed on each node are stored in dense arrays indexed as the compiled problem:
+    bids: matrix nodes x sdos
+    consumption: tensor nodes x sdos x resources (floats, as consumption may be fractional)
+    timestamps: matrix nodes x sdos
+    present: matrix nodes x sdos, True where the node table holds an entry for the sdo
+    totals: matrix nodes x resources, overall consumption of the entries of each node, updated as they change
+    Existing callers see the usual dict {node: {sdo: {'bid': int, 'consumption': dict, 'timestamp': float}}}
+    through views of the node tables (see DenseNodeBiddingData) that read and write the arrays.
+    Bid entries read from a view are copies, so, as for NodeBiddingData, they must be replaced rather than edited.
+    Each node table carries a version, renewed as for NodeBiddingData.
+    """
+
+    def __init__(self, resource_allocation_problem, bidding_data=None):
+        """
+
+        :param resource_allocation_problem: the instance of the problem, giving nodes, sdos and resources
+        :param dict[str, dict[str, dict[str, union[int, dict, float]]]] bidding_data: initial bids for each node
+        :type resource_allocation_problem: ResourceAllocationProblem
+        """
+        compiled = resource_allocation_problem.compiled
+        self.nodes = list(resource_allocation_problem.nodes)
+        self.sdos = list(resource_allocation_problem.sdos)
+        self.resources = list(compiled.resources)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.sdo_index = {sdo: i for i, sdo in enumerate(self.sdos)}
+        self.resource_index = dict(compiled.resource_index)
+
+        self.bids = np.zeros((len(self.nodes), len(self.sdos)))
+        self.consumption = np.zeros((len(self.nodes), len(self.sdos), len(self.resources)))
+        self.timestamps = np.zeros((len(self.nodes), len(self.sdos)))
+        self.present = np.zeros((len(self.nodes), len(self.sdos)), dtype=bool)
+        self.totals = np.zeros((len(self.nodes), len(self.resources)))
+        self.versions = np.array([next(NodeBiddingData._versions) for _ in self.nodes], dtype=np.int64)
+
+        if bidding_data is not None:
+            for node in bidding_data:
+                self[node] = bidding_data[node]
+
+    def __getitem__(self, node):
+        return DenseNodeBiddingData(self, self.node_index[node])
+
+    def __setitem__(self, node, node_bidding_data):
+        i = self.node_index[node]
+        # read the whole table before writing, since it may be a view on the same arrays
+        bids = np.zeros(len(self.sdos))
+        consumption = np.zeros((len(self.sdos), len(self.resources)))
+        timestamps = np.zeros(len(self.sdos))
+        present = np.zeros(len(self.sdos), dtype=bool)
+        for sdo in node_bidding_data:
+            j = self.sdo_index[sdo]
+            bids[j], consumption[j], timestamps[j] = self._read_bid(node_bidding_data[sdo])
+            present[j] = True
+
+        if not (np.array_equal(present, self.present[i]) and np.array_equal(bids[present], self.bids[i][present])
+                and np.array_equal(consumption[present], self.consumption[i][present])):
+            self.versions[i] = next(NodeBiddingData._versions)
+        self.bids[i] = bids
+        self.consumption[i] = consumption
+        self.timestamps[i] = timestamps
+        self.present[i] = present
+        self.totals[i] = consumption[present].sum(axis=0)
+
+    def __delitem__(self, node):
+        raise KeyError("nodes cannot be removed from dense bidding data: '" + node + "'")
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.node_index
+
+    def copy(self):
+        """
+        Copies the arrays, so the copy is not affected by later changes (as a snapshot of nested dicts would be)
+        :return DenseBiddingData:
+        """
+        bidding_data = DenseBiddingData.__new__(DenseBiddingData)
+        bidding_data.__dict__.update(self.__dict__)
+        for name in ('bids', 'consumption', 'timestamps', 'present', 'totals', 'versions'):
+            setattr(bidding_data, name, getattr(self, name).copy())
+        return bidding_data
+
+    def detach(self, node):
+        """
+        As BiddingData.detach, node tables of a copy never share the arrays
+        :param str node:
+        """
+        pass
+
+    def to_dict(self):
+        """
+        Converts to the wire format
+        :return dict[str, dict[str, dict[str, union[int, dict, float]]]]:
+        """
+        return {node: self[node].to_dict() for node in self.nodes}
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, resource_allocation_problem, bidding_data):
+        """
+        Builds dense bidding data from the wire format
+        :param resource_allocation_problem:
+        :param dict[str, dict[str, dict[str, union[int, dict, float]]]] bidding_data:
+        :return DenseBiddingData:
+        """
+        return cls(resource_allocation_problem, bidding_data)
+
+    def _read_bid(self, bid):
+        """
+
+        :param dict[str, union[int, dict, float]] bid: a bid entry
+        :return: bid value, consumption vector, timestamp
+        """
+        consumption = bid.get('consumption', {})
+        return (bid.get('bid', 0),
+                [consumption.get(resource, 0) for resource in self.resources],
+                bid.get('timestamp', 0.0))
+
+    @staticmethod
+    def _to_number(value):
+        """
+        Bids and consumption are stored as floats, integer values are given back as int as in the dict format
+        :param numpy.float64 value:
+        :return: int or float
+        """
+        value = value.item()
+        if value.is_integer():
+            return int(value)
+        return value
+
+    @staticmethod
+    def _to_numbers(values):
+        """
+        Same as _to_number, for a vector
+        :param numpy.ndarray values:
+        :return list of union[int, float]:
+        """
+        return [int(value) if value.is_integer() else value for value in values.tolist()]
+
+
+class DenseNodeBiddingData(MutableMapping):
+    """
+    View of the bids placed on a single node of a DenseBiddingData, i.e. dict {sdo: bid}
+    """
+
+    def __init__(self, store, node_i):
+        """
+
+        :param DenseBiddingData store:
+        :param int node_i: index of the node
+        """
+        self.store = store
+        self.node_i = node_i
+
+    @property
+    def version(self):
+        return self.store.versions[self.node_i].item()
+
+    def arrays(self):
+        """
+        Arrays of this node, for vectorized processing
+        :return: bids vector, consumption matrix sdos x resources, timestamps vector, present mask
+        """
+        i = self.node_i
+        return self.store.bids[i], self.store.consumption[i], self.store.timestamps[i], self.store.present[i]
+
+    def bidders(self, blacklisted_sdos=set()):
+        """
+
+        :param set of str blacklisted_sdos:
+        :return list of str: sdos that placed a not-null bid on the node, in sdos order
+        """
+        bids, consumption, timestamps, present = self.arrays()
+        return [self.store.sdos[j] for j in np.flatnonzero(present & (bids != 0))
+                if self.store.sdos[j] not in blacklisted_sdos]
+
+    def demands(self, sdos):
+        """
+
+        :param list of str sdos:
+        :return numpy.ndarray: matrix len(sdos) x resources with the consumption bid by each given sdo
+        """
+        return self.store.consumption[self.node_i][[self.store.sdo_index[sdo] for sdo in sdos]]
+
+    def total_consumption(self):
+        """
+
+        :return dict[str, union[int, float]]: for each resource, the sum of the consumption of all the bids
+        """
+        return dict(zip(self.store.resources, self.store._to_numbers(self.store.totals[self.node_i])))
+
+    def __getitem__(self, sdo):
+        store, i, j = self.store, self.node_i, self.store.sdo_index[sdo]
+        if not store.present[i, j]:
+            raise KeyError(sdo)
+        return {'bid': store._to_number(store.bids[i, j]),
+                'consumption': dict(zip(store.resources, store._to_numbers(store.consumption[i, j]))),
+                'timestamp': store.timestamps[i, j].item()}
+
+    def __setitem__(self, sdo, bid):
+        store, i, j = self.store, self.node_i, self.store.sdo_index[sdo]
+        value, consumption, timestamp = store._read_bid(bid)
+        if not store.present[i, j] or store.bids[i, j] != value \
+                or not np.array_equal(store.consumption[i, j], consumption):
+            store.versions[i] = next(NodeBiddingData._versions)
+        if store.present[i, j]:
+            store.totals[i] -= store.consumption[i, j]
+        store.bids[i, j] = value
+        store.consumption[i, j] = consumption
+        store.totals[i] += store.consumption[i, j]
+        store.timestamps[i, j] = timestamp
+        store.present[i, j] = True
+
+    def __delitem__(self, sdo):
+        store, i, j = self.store, self.node_i, self.store.sdo_index[sdo]
+        if not store.present[i, j]:
+            raise KeyError(sdo)
+        store.present[i, j] = False
+        store.totals[i] -= store.consumption[i, j]
+        store.versions[i] = next(NodeBiddingData._versions)
+
+    def __iter__(self):
+        present = self.store.present[self.node_i]
+        return iter([sdo for j, sdo in enumerate(self.store.sdos) if present[j]])
+
+    def __len__(self):
+        return int(self.store.present[self.node_i].sum())
+
+    def __contains__(self, sdo):
+        j = self.store.sdo_index.get(sdo)
+        return j is not None and bool(self.store.present[self.node_i, j])
+
+    def to_dict(self):
+        """
+
+        :return dict[str, dict[str, union[int, dict, float]]]: the node table in the wire format
+        """
+        return {sdo: self[sdo] for sdo in self}
+
+    def __repr__(self):
+        return repr(self.to_dict())
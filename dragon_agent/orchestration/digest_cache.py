@@ -0,0 +1,92 @@
+import hashlib
+from collections import OrderedDict
+
+
+class DigestCache:
+    """
+    Bounded LRU cache of the normalized SHA-256 digests (in [0, 1)) the pseudo utilities are drawn from.
+    Digests only depend on the names of the sdo, services, functions and nodes, that repeat a lot along the
+    embeddings, so they are computed once. The digest of the sdo name alone is computed at construction.
+    """
+
+    def __init__(self, sdo_name, max_size):
+        """
+
+        :param str sdo_name: the sdo whose utilities are drawn
+        :param int max_size: maximum number of cached digests, if not positive nothing is cached
+        """
+        self.sdo_name = sdo_name
+        self.max_size = max_size
+        self._digests = OrderedDict()
+
+        self.sdo_digest = self.normalized_digest(sdo_name)
+        """ Digest of the sdo name """
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalized_digest(text):
+        """
+
+        :param str text:
+        :return float: SHA-256 digest of text, scaled in [0, 1)
+        """
+        return int(hashlib.sha256(text.encode('utf-8')).hexdigest(), 16) / 2 ** 256
+
+    def _get(self, key, text_builder):
+        """
+
+        :param tuple key: identifies the digested text
+        :param text_builder: function returning the text to digest, called on misses only
+        :return float: the normalized digest
+        """
+        digest = self._digests.get(key)
+        if digest is not None:
+            self.hits += 1
+            self._digests.move_to_end(key)
+            return digest
+        self.misses += 1
+        digest = self.normalized_digest(text_builder())
+        if self.max_size > 0:
+            self._digests[key] = digest
+            if len(self._digests) > self.max_size:
+                # evict the least recently used
+                self._digests.popitem(last=False)
+        return digest
+
+    def sdo_digest_of(self, *names):
+        """
+
+        :param str names: e.g. node and service, in the order they are concatenated
+        :return float: digest of the sdo name followed by the given names
+        """
+        return self._get(('sdo',) + names, lambda: self.sdo_name + "".join(names))
+
+    def bundle_digest(self, services, functions):
+        """
+
+        :param list of str services: services of the bundle, in any order
+        :param list of str functions: functions of the bundle, in any order
+        :return float: digest of the sorted services, the sorted functions and the sdo name
+        """
+        return self._get(('bundle', tuple(services), tuple(functions)),
+                         lambda: "".join(sorted(services)) + "".join(sorted(functions)) + self.sdo_name)
+
+    def transformation_digests(self, services, functions):
+        """
+
+        :param list of str services: services of the bundle, in the order added
+        :param list of str functions: functions of the bundle, in the order added
+        :return (float, float): digests of services followed by functions, and of functions followed by services
+        """
+        services = tuple(services)
+        functions = tuple(functions)
+        return (self._get(('services-functions', services, functions), lambda: "".join(services + functions)),
+                self._get(('functions-services', services, functions), lambda: "".join(functions + services)))
+
+    def clear(self):
+        self._digests.clear()
+
+    def __len__(self):
+        return len(self._digests)
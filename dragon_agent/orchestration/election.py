@@ -0,0 +1,142 @@
+import heapq
+import logging
+import pprint
+
+from config.logging_configuration import LoggingConfiguration, LazyFormat
+
+from dragon_agent.orchestration.winner_set import WinnerSet
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+
+
+class ElectionEngine:
+    """
+    Greedy solver of the per-node knapsack problem: sdos are elected by decreasing bid/demand ratio,
+    skipping the ones that do not fit the residual resources of the node.
+    Ties on the ratio are broken in favour of the sdo that comes first in alphabetical order.
+    """
+
+    def __init__(self, resource_allocation_problem):
+        """
+
+        :param resource_allocation_problem: the instance of the problem
+        :type resource_allocation_problem: ResourceAllocationProblem
+        """
+        self.rap = resource_allocation_problem
+
+        self._cache = dict()
+        """ For each node, the version of its bidding table and the winners elected on that version """
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def elect(self, node, node_bidding_data, blacklisted_sdos=set()):
+        """
+        Returns the election results for the given node.
+        If the bidding table carries a version (see NodeBiddingData), results are cached against that version and
+        the blacklisted sdos that bid on the node, so that the election is repeated just when bids actually changed.
+        :param str node:
+        :param dict[str, dict[str, union[int, dict, float]]] node_bidding_data: bids placed on the node by each sdo
+        :param set of str blacklisted_sdos: those sdos will not be taken in account
+        :return: set of winners, node assignment_dict
+        """
+        version = getattr(node_bidding_data, 'version', None)
+        if version is None:
+            elected, node_assignment_dict = self._elect(node, node_bidding_data, blacklisted_sdos)
+            return self._winners_set(elected), node_assignment_dict
+
+        compiled = self.rap.compiled
+        node_cache = self._cache.get(node)
+        if node_cache is None or node_cache['version'] != version or node_cache['compiled'] is not compiled:
+            # bids changed since the last election on this node
+            node_cache = {'version': version,
+                          'compiled': compiled,
+                          'bidders': frozenset(self._get_bidders(node_bidding_data)),
+                          'results': dict()}
+            self._cache[node] = node_cache
+
+        # blacklisting sdos that do not bid on the node does not change its election
+        results_key = node_cache['bidders'].intersection(blacklisted_sdos)
+        if results_key in node_cache['results']:
+            self.cache_hits += 1
+            node_winners = self._winners_set(node_cache['results'][results_key])
+            logging.info(" NODE %s | WINNER LIST (cached): %s", node, LazyFormat(pprint.pformat, node_winners))
+            # bid entries are taken from the current table, since their timestamps may differ from the cached ones
+            node_assignment_dict = {sdo: node_bidding_data[sdo] if sdo in node_winners else dict()
+                                    for sdo in self.rap.sdos}
+        else:
+            self.cache_misses += 1
+            elected, node_assignment_dict = self._elect(node, node_bidding_data, blacklisted_sdos)
+            node_cache['results'][results_key] = tuple(elected)
+            node_winners = self._winners_set(elected)
+        return node_winners, node_assignment_dict
+
+    @staticmethod
+    def _winners_set(elected):
+        """
+        Winners are added in election order, so that the set iterates the same way whether it comes from the cache
+        or from a new election.
+        :param iterable of str elected: winners in election order
+        :return WinnerSet:
+        """
+        return WinnerSet(elected)
+
+    @staticmethod
+    def _get_bidders(node_bidding_data, blacklisted_sdos=set()):
+        """
+
+        :param dict[str, dict[str, union[int, dict, float]]] node_bidding_data:
+        :param set of str blacklisted_sdos:
+        :return list of str: sdos that placed a not-null bid on the node
+        """
+        if hasattr(node_bidding_data, 'bidders'):
+            # array-backed table (see DenseNodeBiddingData)
+            return node_bidding_data.bidders(blacklisted_sdos)
+        return [sdo for sdo in node_bidding_data
+                if sdo not in blacklisted_sdos
+                and 'bid' in node_bidding_data[sdo] and node_bidding_data[sdo]['bid'] != 0]
+
+    def _elect(self, node, node_bidding_data, blacklisted_sdos=set()):
+        """
+        Each bidder ratio is computed once and bidders are kept in a max-heap.
+        Since residual resources can only decrease along the election, a bidder that does not fit when popped would
+        never fit later, so it is discarded for good.
+        :param str node:
+        :param dict[str, dict[str, union[int, dict, float]]] node_bidding_data: bids placed on the node by each sdo
+        :param set of str blacklisted_sdos: those sdos will not be taken in account
+        :return: list of winners in election order, node assignment_dict
+        """
+        compiled = self.rap.compiled
+        node_assignment_dict = {sdo: dict() for sdo in self.rap.sdos}
+
+        bidders = self._get_bidders(node_bidding_data, blacklisted_sdos)
+        if hasattr(node_bidding_data, 'demands'):
+            # array-backed table (see DenseNodeBiddingData)
+            demands = node_bidding_data.demands(bidders)
+        else:
+            demands = compiled.to_matrix([node_bidding_data[sdo]['consumption'] for sdo in bidders])
+        demand_norms = compiled.norms(node, demands)
+        candidates = [(-(node_bidding_data[sdo]['bid']/float(demand_norm)), sdo, i)
+                      for i, (sdo, demand_norm) in enumerate(zip(bidders, demand_norms))]
+        heapq.heapify(candidates)
+
+        tracing = LoggingConfiguration.tracing()
+        elected = list()
+        # consumption may be fractional
+        node_residual_resources = compiled.node_vector(node).astype(float)
+        while len(candidates) > 0:
+            negative_ratio, sdo, i = heapq.heappop(candidates)
+            if -negative_ratio <= 0:
+                # only positive ratios can win
+                break
+            if not compiled.fits(demands[i], node_residual_resources):
+                if tracing:
+                    logging.debug(" --- candidate: '" + sdo + "' does not fit the residual resources, discarded.")
+                continue
+            if tracing:
+                logging.debug(" - WINNER: '" + sdo + "' | BID_RATIO: '" + str(-negative_ratio) + "'")
+            node_assignment_dict[sdo] = node_bidding_data[sdo]
+            elected.append(sdo)
+            node_residual_resources -= demands[i]
+
+        logging.info(" NODE %s | WINNER LIST: %s", node, LazyFormat(pprint.pformat, set(elected)))
+        return elected, node_assignment_dict
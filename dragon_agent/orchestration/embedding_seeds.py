@@ -0,0 +1,103 @@
+from collections import OrderedDict
+
+
+class EmbeddingSeeds:
+    """
+    Bundles found by complete greedy embeddings, to warm start the next embeddings (incremental rebidding).
+    The greedy embedding is a depth-first search over the ranked service:function:node candidates, so, when a new
+    embedding can only use some of the candidates of a past one (more nodes blacklisted, lower resource bounds),
+    every branch preceding the past bundle is still infeasible, and the new search reaches again the past bundle
+    prefix that does not use the nodes it lost. The search can start from that prefix: unless it has to backtrack
+    into it, it finds the same bundle of a search from scratch.
+    Seeds are bound to the instance of the problem they were found on.
+    """
+
+    def __init__(self, max_size):
+        """
+
+        :param int max_size: maximum number of seeds kept, if not positive no seed is kept
+        """
+        self.max_size = max_size
+        self._seeds = OrderedDict()
+        """ For each set of blacklisted nodes, resource bound and implementations (in the order they were added) """
+        self._problem = None
+
+        self.hits = 0
+        self.reused_services = 0
+
+    def put(self, problem, resource_bound, blacklisted_nodes, implementations):
+        """
+
+        :param problem: compiled problem the embedding was done on
+        :param dict[str, dict[str, int]] resource_bound: resources the bundle had to fit, for each node
+        :param set of str blacklisted_nodes: nodes the bundle could not use
+        :param list of (str, str, str, float) implementations: service, function, node and marginal utility of each
+                                                               service of the bundle, in the order they were added
+        """
+        if self.max_size <= 0:
+            return
+        if problem is not self._problem:
+            self.clear()
+            self._problem = problem
+        key = frozenset(blacklisted_nodes)
+        self._seeds[key] = ({node: (dict(bound) if bound is not None else None)
+                             for node, bound in resource_bound.items()}, list(implementations))
+        self._seeds.move_to_end(key)
+        if len(self._seeds) > self.max_size:
+            self._seeds.popitem(last=False)
+
+    def get(self, problem, resource_bound, blacklisted_nodes):
+        """
+
+        :param problem: compiled problem of the new embedding
+        :param dict[str, dict[str, int]] resource_bound: resources the new bundle has to fit, for each node
+        :param set of str blacklisted_nodes: nodes the new bundle cannot use
+        :return list of (str, str, str, float): the longest prefix of a past bundle the new embedding can start from
+        """
+        if problem is not self._problem:
+            return list()
+        best_seed = list()
+        for seed_blacklisted_nodes, (seed_resource_bound, implementations) in self._seeds.items():
+            if not seed_blacklisted_nodes.issubset(blacklisted_nodes):
+                continue
+            lost_nodes = self._lost_nodes(seed_resource_bound, resource_bound)
+            if lost_nodes is None:
+                # some node gained resources, the past search did not consider all the current candidates
+                continue
+            lost_nodes.update(blacklisted_nodes)
+            prefix_length = 0
+            while prefix_length < len(implementations) and implementations[prefix_length][2] not in lost_nodes:
+                prefix_length += 1
+            if prefix_length > len(best_seed):
+                best_seed = implementations[:prefix_length]
+        if len(best_seed) > 0:
+            self.hits += 1
+            self.reused_services += len(best_seed)
+        return best_seed
+
+    @staticmethod
+    def _lost_nodes(seed_resource_bound, resource_bound):
+        """
+
+        :param dict[str, dict[str, int]] seed_resource_bound:
+        :param dict[str, dict[str, int]] resource_bound:
+        :return set of str: nodes whose bound is lower than the seed one, None if any node bound is higher
+        """
+        lost_nodes = set()
+        for node, bound in resource_bound.items():
+            seed_bound = seed_resource_bound.get(node)
+            if bound == seed_bound:
+                continue
+            if bound is None:
+                lost_nodes.add(node)
+            elif seed_bound is None or any(bound[resource] > seed_bound[resource] for resource in bound):
+                return None
+            else:
+                lost_nodes.add(node)
+        return lost_nodes
+
+    def clear(self):
+        self._seeds.clear()
+
+    def __len__(self):
+        return len(self._seeds)
@@ -0,0 +1,224 @@
+import itertools
+import logging
+
+
+class FalseWinnerResolver:
+    """
+    Detects false winners of a multi-node election.
+    A false winner is an sdo that won some nodes, but lost at least an other node against somebody that is not,
+    in turn, a false winner. Ambiguity is solved giving precedence to the higher bidder.
+    Winners are checked in order of decreasing max bid. For each node a winner lost, the sdos it lost against are
+    searched, depth first along their own lost nodes, for a false winner that would give the node back; if there is
+    none, the winner is a false winner.
+    The search is the one of the original recursive implementation, and gives the same result on the same inputs
+    (including the iteration order of their sets), but it runs on an explicit stack of steps. The outcome of a step
+    only depends on the sdo and the node searched, on the false winners known to it and on the chain of sdos searched
+    above it: once settled, it is kept, and a step reached again (through an other order of the same chain, or by an
+    other search, as long as the false winners known do not change) is not searched twice. Sets of sdos of the steps
+    are bit masks, so that they are cheap to extend and to hash.
+    """
+
+    def __init__(self, winners, bidded_nodes, lost_nodes, max_bids):
+        """
+
+        :param dict[str, set of str] winners: for each node, the elected sdos
+        :param dict[str, set of str] bidded_nodes: for each sdo, nodes where it bid
+        :param dict[str, set of str] lost_nodes: for each sdo, nodes where it bid but it was not elected
+        :param dict[str, int] max_bids: for each sdo, its highest bid over all nodes
+        """
+        self.winners = winners
+        self.bidded_nodes = bidded_nodes
+        self.lost_nodes = lost_nodes
+        self.max_bids = max_bids
+
+        self._bits = {sdo: 1 << i for i, sdo in enumerate(sorted(max_bids))}
+        """ Bit of each sdo in the masks of the search """
+        self._settled = dict()
+        """ Outcome of each step searched, by (sdo, node, known false winners mask, chain mask) """
+        self._settled_known_fakes = None
+        """ Mask of the false winners known to the searches whose steps are in _settled """
+        self.searched = 0
+        """ Number of steps searched """
+        self.reused = 0
+        """ Number of steps whose outcome was already settled """
+
+    def resolve(self):
+        """
+
+        :return set of str: the false winners
+        """
+        known_fakes = set()
+        for sdo in sorted(set(itertools.chain(*self.winners.values())), key=lambda x: self.max_bids[x], reverse=True):
+            if sdo in known_fakes:
+                continue
+            # check if the sdo won in all nodes
+            if len(self.bidded_nodes[sdo]) > 0 and len(self.lost_nodes[sdo]) > 0:
+                collected_fakes = set()
+                for node in self.lost_nodes[sdo]:
+                    # check if the node is really lost
+                    false_winner, found_fakes = self._find_false_winner(sdo, node, self._mask(known_fakes))
+                    collected_fakes.update(found_fakes)
+                    if false_winner is not None:
+                        # found a possible fake winner
+                        collected_fakes.add(false_winner)
+                        continue
+                    logging.debug("false winners: node '" + node + "' is lost, '" + sdo + "' is a false winner")
+                    known_fakes.add(sdo)
+                    break
+                # a collected fake is considered fake only if he lost with at least someone that is not a fake in turn
+                for fake in sorted(collected_fakes):
+                    real_losts = [n for n in self.lost_nodes[fake] if len(self.winners[n].difference(known_fakes)) > 0]
+                    if len(real_losts) > 0:
+                        known_fakes.add(fake)
+        return known_fakes
+
+    def _find_false_winner(self, sdo, node, known_fakes):
+        """
+        Searches an sdo against who the given sdo lost the given node, but that, recursively, lost for sure an other
+        node against someone else.
+        Each step of the search is a _SearchStep: a step searching the lost nodes of a winner w pushes a step for each
+        of them, knowing the false winners found so far by the step that pushed it.
+        :param str sdo:
+        :param str node:
+        :param int known_fakes: mask of the false winners known to the search
+        :return (str, frozenset of str): the false winner found, None if the node is lost for sure, and the false
+            winners found along the search
+        """
+        if known_fakes != self._settled_known_fakes:
+            # steps are seldom reached again once more false winners are known, they are not kept
+            self._settled = dict()
+            self._settled_known_fakes = known_fakes
+        outcome = self._settled_outcome(sdo, node, known_fakes, 0)
+        if outcome is not None:
+            return outcome
+        stack = [_SearchStep(sdo, node, known_fakes, 0, self._candidates(node))]
+        while True:
+            step = stack[-1]
+            outcome = None
+            if step.child_outcome is not None:
+                other_false, other_fakes = step.child_outcome
+                step.child_outcome = None
+                if other_false is None:
+                    # no fakes winners found to save w, he lost that node for sure! so w is a fake winner
+                    outcome = step.candidates[step.index], frozenset(step.found)
+                else:
+                    # w is not for sure a fake winner, because we found that he lost, in turn, against a fake one
+                    step.add_found(other_false, self._bits[other_false])
+                    for fake in other_fakes:
+                        step.add_found(fake, self._bits[fake])
+            if outcome is None:
+                outcome = self._advance(step, stack)
+            if outcome is None:
+                continue
+            # the step is settled, its outcome goes to the step that pushed it
+            self._settled[step.key] = outcome
+            stack.pop()
+            if len(stack) == 0:
+                return outcome
+            stack[-1].child_outcome = outcome
+
+    def _advance(self, step, stack):
+        """
+        Moves the step to the next lost node to search, pushing the step that searches it if it is not settled yet
+        :param _SearchStep step:
+        :param list of _SearchStep stack:
+        :return (str, frozenset of str): the outcome of the step, if settled, None otherwise
+        """
+        while True:
+            if step.lost is not None:
+                for lost_node in step.lost:
+                    # w lost this node, check if, for this node there is a fake winner
+                    w = step.candidates[step.index]
+                    known_fakes = step.known_fakes | step.found_mask
+                    chain = step.chain | self._bits[step.sdo]
+                    outcome = self._settled_outcome(w, lost_node, known_fakes, chain)
+                    if outcome is not None:
+                        step.child_outcome = outcome
+                        return None
+                    stack.append(_SearchStep(w, lost_node, known_fakes, chain, self._candidates(lost_node)))
+                    return None
+                step.lost = None
+                step.index += 1
+            if step.index == len(step.candidates):
+                return None, frozenset(step.found)
+            w = step.candidates[step.index]
+            # check if w is a fake winner
+            if step.known_fakes & self._bits[w]:
+                # w is already known to be fake!
+                return w, frozenset(step.found)
+            if not step.chain & self._bits[w] and len(self.bidded_nodes[w]) > 0:
+                step.lost = iter(self.lost_nodes[w])
+            else:
+                step.index += 1
+
+    def _candidates(self, node):
+        """
+
+        :param str node:
+        :return list of str: winners of the node, in order of increasing max bid
+        """
+        self.searched += 1
+        return sorted(self.winners[node], key=lambda x: self.max_bids[x])
+
+    def _mask(self, sdos):
+        """
+
+        :param set of str sdos:
+        :return int: the mask of the sdos
+        """
+        mask = 0
+        for sdo in sdos:
+            mask |= self._bits[sdo]
+        return mask
+
+    def _settled_outcome(self, sdo, node, known_fakes, chain):
+        """
+
+        :return (str, frozenset of str): the outcome of the step, if already settled, None otherwise
+        """
+        outcome = self._settled.get((sdo, node, known_fakes, chain))
+        if outcome is not None:
+            self.reused += 1
+        return outcome
+
+
+class _SearchStep:
+    """
+    A step of FalseWinnerResolver._find_false_winner: the search, among the winners of a node, of a false winner
+    """
+
+    def __init__(self, sdo, node, known_fakes, chain, candidates):
+        """
+
+        :param str sdo: sdo that lost the node
+        :param str node:
+        :param int known_fakes: mask of the false winners known to the step
+        :param int chain: mask of the sdos searched above the step, ignored by it (avoid loops)
+        :param list of str candidates: winners of the node, in the order they are searched
+        """
+        self.sdo = sdo
+        self.node = node
+        self.known_fakes = known_fakes
+        self.chain = chain
+        self.candidates = candidates
+        self.key = (sdo, node, known_fakes, chain)
+
+        self.index = 0
+        """ Position, in candidates, of the winner w being searched """
+        self.lost = None
+        """ Lost nodes of w still to search, None if w has not been searched yet """
+        self.found = set()
+        """ False winners found by the step so far """
+        self.found_mask = 0
+        """ Mask of found """
+        self.child_outcome = None
+        """ Outcome of the last lost node of w searched, still to be taken in account """
+
+    def add_found(self, sdo, bit):
+        """
+
+        :param str sdo: a false winner found by the step
+        :param int bit: bit of the sdo
+        """
+        self.found.add(sdo)
+        self.found_mask |= bit
@@ -0,0 +1,158 @@
+import heapq
+import logging
+
+from dragon_agent.orchestration.exceptions import NoFunctionsLeft
+
+
+class LazyGreedyRanking:
+    """
+    Lazy ranking (accelerated greedy) of the next best service:function:node to add to a bid bundle.
+    Candidates of each depth of the bundle under construction are kept in a max-heap, and are extracted just as far as
+    the requested skip, instead of sorting all of them at each request. The ranking of a depth is kept while the
+    bundle prefix does not change, so skipping a candidate that exceeds capacity, or backtracking to a previous depth,
+    does not evaluate the marginal utilities again.
+    If the utility has diminishing returns (the marginal utility of a candidate never increases as the bundle grows),
+    utilities of the previous depth are valid upper bounds, so they are reused as in the Minoux lazy greedy, and just
+    the candidate on top is re-evaluated, until a candidate whose utility is up to date stays on top.
+    Ties are broken on the enumeration order of the candidates, as the stable sort of the eager ranking does.
+    """
+
+    def __init__(self, service_bundle, resource_allocation_problem, marginal_utility, diminishing_returns=False,
+                 marginal_utilities=None):
+        """
+
+        :param list of str service_bundle: services of the bundle to build
+        :param resource_allocation_problem: the instance of the problem
+        :param marginal_utility: function (bid_bundle, service, function, node) returning the marginal utility
+        :param bool diminishing_returns: True if the marginal utility of a candidate never increases as the bundle grows
+        :param marginal_utilities: function (bid_bundle, service, candidates) returning the marginal utility of each
+                                   function:node candidate, used to score the candidates of a depth service by service
+        :type resource_allocation_problem: ResourceAllocationProblem
+        """
+        self.service_bundle = service_bundle
+        self.rap = resource_allocation_problem
+        self.marginal_utility = marginal_utility
+        self.diminishing_returns = diminishing_returns
+        if marginal_utilities is None:
+            marginal_utilities = self._marginal_utilities
+        self.marginal_utilities = marginal_utilities
+
+        self.levels = list()
+        """ For each depth, the bundle prefix, blacklisted nodes, candidates heap and candidates ranked so far """
+
+        self.evaluations = 0
+        """ Marginal utilities actually computed """
+        self.eager_evaluations = 0
+        """ Marginal utilities that the eager ranking would have computed """
+
+    @property
+    def saved_evaluations(self):
+        return self.eager_evaluations - self.evaluations
+
+    def summary(self):
+        """
+
+        :return str: the evaluations done so far, as logged by the orchestrator (see SdoOrchestrator.embedding_stats)
+        """
+        return "Lazy greedy embedding: " + str(self.evaluations) + " utility evaluations, " + \
+            str(self.saved_evaluations) + " saved"
+
+    def get_next_best_service(self, bid_bundle, skip_first=0, blacklisted_nodes=set()):
+        """
+        Same as SdoOrchestrator._get_next_best_service
+        :param bid_bundle:
+        :param int skip_first: skip specified number of best services
+        :param set of str blacklisted_nodes: those nodes will not be taken in account
+        :raises NoFunctionsLeft: when is requested to skip mor services/functions than the available
+        :return (str, str, str, float): service, function, node, marginal utility
+        """
+        level = self._get_level(bid_bundle, blacklisted_nodes)
+        self.eager_evaluations += level['size']
+
+        while len(level['ranked']) <= skip_first:
+            if len(level['heap']) == 0:
+                raise NoFunctionsLeft("No function left for this bundle")
+            negative_bound, index, evaluated, service, function, node = heapq.heappop(level['heap'])
+            if evaluated:
+                # up to date and still on top: it is the next best one
+                level['ranked'].append((-negative_bound, index, service, function, node))
+            else:
+                marginal_utility = self.marginal_utility(bid_bundle, service, function, node)
+                self.evaluations += 1
+                heapq.heappush(level['heap'], (-marginal_utility, index, True, service, function, node))
+
+        marginal_utility, index, best_service, best_function, best_node = level['ranked'][skip_first]
+        return best_service, best_function, best_node, marginal_utility
+
+    def _get_level(self, bid_bundle, blacklisted_nodes):
+        """
+        Returns the level for the given bundle, building it if needed
+        :param bid_bundle:
+        :param set of str blacklisted_nodes:
+        :return dict:
+        """
+        prefix = tuple((service, bid_bundle[service]['function'], bid_bundle[service]['node'])
+                       for service in sorted(bid_bundle, key=lambda x: bid_bundle[x]['added_at']))
+        depth = len(prefix)
+
+        if depth < len(self.levels) and self.levels[depth]['prefix'] == prefix \
+                and self.levels[depth]['blacklisted_nodes'] == blacklisted_nodes:
+            del self.levels[depth+1:]
+            return self.levels[depth]
+
+        if self.diminishing_returns and 0 < depth <= len(self.levels) \
+                and self.levels[depth-1]['prefix'] == prefix[:-1] \
+                and self.levels[depth-1]['blacklisted_nodes'] <= blacklisted_nodes:
+            # bounds of the previous depth are still valid, they just need to be re-evaluated when on top
+            parent = self.levels[depth-1]
+            added_service = prefix[-1][0]
+            candidates = [(negative_bound, index, False, service, function, node)
+                          for negative_bound, index, evaluated, service, function, node in parent['heap']
+                          if service != added_service and node not in blacklisted_nodes]
+            candidates += [(-bound, index, False, service, function, node)
+                           for bound, index, service, function, node in parent['ranked']
+                           if service != added_service and node not in blacklisted_nodes]
+            heapq.heapify(candidates)
+        else:
+            logging.debug(" - Lazy greedy: evaluating candidates at depth " + str(depth))
+            candidates = list()
+            for service, service_candidates in self._enumerate_candidates():
+                service_candidates = [(index, function, node) for index, function, node in service_candidates
+                                      if node not in blacklisted_nodes]
+                if service in bid_bundle or len(service_candidates) == 0:
+                    continue
+                utilities = self.marginal_utilities(bid_bundle, service, [(function, node) for index, function, node
+                                                                          in service_candidates])
+                self.evaluations += len(service_candidates)
+                candidates += [(-marginal_utility, index, True, service, function, node)
+                               for (index, function, node), marginal_utility in zip(service_candidates, utilities)]
+            heapq.heapify(candidates)
+
+        del self.levels[depth:]
+        # padding, just in case the caller skipped some depth
+        self.levels += [{'prefix': None, 'blacklisted_nodes': None, 'heap': [], 'ranked': [], 'size': 0}
+                        for _ in range(depth - len(self.levels))]
+        level = {'prefix': prefix,
+                 'blacklisted_nodes': set(blacklisted_nodes),
+                 'heap': candidates,
+                 'ranked': list(),
+                 'size': len(candidates)}
+        self.levels.append(level)
+        return level
+
+    def _marginal_utilities(self, bid_bundle, service, candidates):
+        return [self.marginal_utility(bid_bundle, service, function, node) for function, node in candidates]
+
+    def _enumerate_candidates(self):
+        """
+        Enumerates all the service:function:node candidates, numbered in the order used by the eager ranking
+        :return: generator of service, list of (index, function, node)
+        """
+        index = 0
+        for service in self.service_bundle:
+            service_candidates = list()
+            for function in self.rap.get_implementations_for_service(service.split('_', 1)[-1]):
+                for node in self.rap.nodes:
+                    service_candidates.append((index, function, node))
+                    index += 1
+            yield service, service_candidates
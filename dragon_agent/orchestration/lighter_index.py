@@ -0,0 +1,76 @@
+import bisect
+import sys
+
+
+class LighterServiceIndex:
+    """
+    Implementations (function:node) of each service sorted by average consumption, to find by bisection the lightest
+    implementation consuming more than a given amount, instead of scanning all the functions and nodes.
+    Consumptions are taken from an AverageConsumptionTable, so the index is valid for the resource bound of that table.
+    Implementations consuming the same are sorted as functions and nodes are listed in the instance, so that the
+    index picks the same implementation of a sequential scan.
+    Nodes can be blacklisted (e.g. where the bid is completed): they are skipped until they are allowed again.
+    """
+
+    def __init__(self, resource_allocation_problem, consumption_table, service_bundle):
+        """
+
+        :param resource_allocation_problem: the instance of the problem
+        :param AverageConsumptionTable consumption_table: consumptions against the resource bound to index
+        :param list of str service_bundle: services to index
+        :type resource_allocation_problem: ResourceAllocationProblem
+        """
+        self.table = consumption_table
+
+        self._consumptions = dict()
+        """ For each service type, the sorted consumptions of its implementations """
+        self._implementations = dict()
+        """ For each service type, its implementations (function, node), sorted as _consumptions """
+        for service in service_bundle:
+            service_type = self._service_type(service)
+            if service_type in self._consumptions:
+                continue
+            entries = list()
+            for i, function in enumerate(resource_allocation_problem.get_implementations_for_service(service_type)):
+                consumptions = consumption_table.row(function, resource_allocation_problem.nodes)
+                for j, (node, consumption) in enumerate(zip(resource_allocation_problem.nodes, consumptions)):
+                    # implementations consuming sys.maxsize (no resources on the node) are never the lighter
+                    if consumption < sys.maxsize:
+                        entries.append((consumption, i, j, function, node))
+            entries.sort()
+            self._consumptions[service_type] = [entry[0] for entry in entries]
+            self._implementations[service_type] = [(entry[3], entry[4]) for entry in entries]
+
+        self.blacklisted_nodes = set()
+
+    @staticmethod
+    def _service_type(service):
+        """
+
+        :param str service: a service of the bundle, that may be prefixed to tell apart services of the same type
+        :return str: the service, as named in the instance
+        """
+        return service.split('_', 1)[-1]
+
+    def blacklist(self, nodes):
+        """
+        Skips the given nodes in next lookups, replacing the previously blacklisted ones
+        :param set of str nodes:
+        """
+        self.blacklisted_nodes = set(nodes)
+
+    def next_lighter(self, service, consumption):
+        """
+
+        :param str service:
+        :param consumption: only implementations consuming more than this are taken in account
+        :return: consumption, function and node of the lightest implementation, None if there is not any
+        """
+        service_type = self._service_type(service)
+        consumptions = self._consumptions[service_type]
+        implementations = self._implementations[service_type]
+        for k in range(bisect.bisect_right(consumptions, consumption), len(consumptions)):
+            function, node = implementations[k]
+            if node not in self.blacklisted_nodes:
+                return consumptions[k], function, node
+        return None
@@ -0,0 +1,118 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from config.config import Configuration
+
+_worker_orchestrator = None
+""" Orchestrator of the worker process, a read-only copy of the one that started the pool """
+
+
+def _init_worker(orchestrator_class, sdo_name, resource_allocation_problem, service_bundle, settings):
+    """
+    Builds the orchestrator of the worker process.
+    :param type orchestrator_class: class of the orchestrator that started the pool
+    :param str sdo_name:
+    :param resource_allocation_problem: copy of the instance of the problem
+    :param list of str service_bundle: services of the orchestrator, as prefixed by it
+    :param dict settings: the configuration of the process that started the pool
+    """
+    global _worker_orchestrator
+    configuration = Configuration()
+    configuration.__dict__.update(settings)
+    # workers score sequentially
+    configuration.SCORING_WORKERS = 0
+    _worker_orchestrator = orchestrator_class(sdo_name, resource_allocation_problem, [])
+    _worker_orchestrator.service_bundle = service_bundle
+
+
+def _score_shard(bid_bundle, service, candidates, service_specific):
+    """
+
+    :return list of float: the marginal utility of each candidate, computed by the worker orchestrator
+    """
+    return _worker_orchestrator._compute_marginal_utilities(bid_bundle, service, candidates, service_specific)
+
+
+class ParallelScorer:
+    """
+    Scores the function:node candidates of a service on a pool of worker processes, each holding a copy of the
+    orchestrator and of the instance of the problem (the pool is started again when the instance changes).
+    Candidates are split in contiguous shards, one for each worker, and the utilities are joined in the same order,
+    so that the result is the same of a sequential scoring. Calls with fewer candidates than the threshold are not
+    worth the inter-process communication and are scored sequentially.
+    Only utilities that are pure functions of the bundle and of the instance can be scored this way (see
+    SdoOrchestrator.UTILITY_READS_EXTERNAL_STATE).
+    """
+
+    def __init__(self, orchestrator, workers, threshold):
+        """
+
+        :param orchestrator: the orchestrator whose utilities are scored
+        :param int workers: number of worker processes, if lower than 2 candidates are always scored sequentially
+        :param int threshold: minimum number of candidates scored in parallel
+        :type orchestrator: SdoOrchestrator
+        """
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.threshold = threshold
+
+        self._executor = None
+        self._problem = None
+
+        self.parallel_calls = 0
+
+    def accepts(self, candidates):
+        """
+
+        :param list of (str, str) candidates:
+        :return bool: True if the candidates are worth scoring in parallel
+        """
+        return self.workers > 1 and not self.orchestrator.UTILITY_READS_EXTERNAL_STATE and \
+            len(candidates) >= max(self.threshold, self.workers)
+
+    def score(self, bid_bundle, service, candidates, service_specific=False):
+        """
+        Scores the candidates on the workers, whatever their number (see accepts)
+        :param bid_bundle: initial bundle
+        :param str service: service to add to the bundle
+        :param list of (str, str) candidates: function:node pairs
+        :param bool service_specific: if True, the service utility is used, whatever the private utility is
+        :return list of float: the marginal utility of each candidate
+        """
+        self.parallel_calls += 1
+        executor = self._get_executor()
+        shard_size = -(-len(candidates) // self.workers)
+        futures = [executor.submit(_score_shard, bid_bundle, service, candidates[i:i+shard_size], service_specific)
+                   for i in range(0, len(candidates), shard_size)]
+        utilities = list()
+        for future in futures:
+            utilities.extend(future.result())
+        return utilities
+
+    def _get_executor(self):
+        """
+
+        :return ProcessPoolExecutor: the pool of workers holding the current instance of the problem
+        """
+        if self._executor is not None and self._problem is self.orchestrator.rap.compiled:
+            return self._executor
+        self.shutdown()
+        orchestrator = self.orchestrator
+        logging.debug("Starting " + str(self.workers) + " scoring workers for sdo '" + orchestrator.sdo_name + "'")
+        self._problem = orchestrator.rap.compiled
+        # workers are spawned, rather than forked, not to inherit the threads and sockets of the agent
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker,
+                                             initargs=(type(orchestrator), orchestrator.sdo_name, orchestrator.rap,
+                                                       orchestrator.service_bundle, dict(vars(Configuration()))))
+        return self._executor
+
+    def shutdown(self):
+        """
+        Stops the worker processes, if any
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._problem = None
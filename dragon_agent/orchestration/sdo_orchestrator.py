@@ -1,8 +1,6 @@
-import hashlib
 import logging
 import pprint
 import math
-from functools import reduce
 
 import time
 
@@ -11,9 +9,22 @@ import itertools
 import sys
 
 from config.config import Configuration
-from config.logging_configuration import LoggingConfiguration
+from config.logging_configuration import LoggingConfiguration, LazyFormat
 from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+from dragon_agent.orchestration.bidding_data import BiddingData
+from dragon_agent.orchestration.branch_and_bound import BranchAndBoundEmbedding
+from dragon_agent.orchestration.dense_bidding_data import DenseBiddingData
+from dragon_agent.orchestration.digest_cache import DigestCache
+from dragon_agent.orchestration.election import ElectionEngine
+from dragon_agent.orchestration.embedding_seeds import EmbeddingSeeds
+from dragon_agent.orchestration.false_winners import FalseWinnerResolver
 from dragon_agent.orchestration.exceptions import NoFunctionsLeft, SchedulingTimeout
+from dragon_agent.orchestration.lazy_greedy import LazyGreedyRanking
+from dragon_agent.orchestration.lighter_index import LighterServiceIndex
+from dragon_agent.orchestration.parallel_scoring import ParallelScorer
+from dragon_agent.orchestration.utility_cache import UtilityCache
+from dragon_agent.orchestration.utility_strategies import UTILITIES
+from dragon_agent.orchestration.winner_set import WinnerSet
 
 
 configuration = Configuration()
@@ -28,6 +39,40 @@ class SdoOrchestrator:
     assignment: the final data that is stored, i.e. dict with bid, consumption, timestamp.
     """
 
+    UTILITIES = UTILITIES
+    """ Private utilities available to this orchestrator, by name (see UtilityRegistry) """
+
+    RELEASE_BIDS_ON_ORCHESTRATION = False
+    """ If True, bids of this sdo are released before a new bundle is searched """
+
+    EXCLUDE_COMPLETED_BID_NODES = True
+    """ If True, the greedy embedding does not add functions to nodes where the bid is completed """
+
+    GREEDY_TIME_LIMIT = True
+    """ If True, the greedy embedding is bound to scheduling_time_limit """
+
+    KEEP_LOWEST_BID_RATIO = False
+    """ If True, the bid ratio bound of a won node is lowered to the last bid ratio, but never raised """
+
+    UTILITY_READS_EXTERNAL_STATE = False
+    """
+    If True, utilities depend on something else than the bundle and the instance (e.g. statistics files), so they are
+    not cached and bundles are not reused from an orchestration to the next one
+    """
+
+    MARGINAL_UTILITY_UPPER_BOUND = 100
+    """
+    Highest marginal utility the private utilities may give, used by the branch-and-bound embedding to prune bundles.
+    None if unknown: bundles are then pruned by capacity only.
+    """
+
+    DIMINISHING_RETURNS = False
+    """
+    True if, with submodular_p_utility, the marginal utility of each service:function:node never increases as the
+    bundle grows. Utilities below just ensure that utilities of the services picked in sequence decrease,
+    so stale utilities can not be used as bounds by the lazy greedy embedding.
+    """
+
     def __init__(self, sdo_name, resource_allocation_problem, service_bundle):
         """
 
@@ -45,9 +90,9 @@ class SdoOrchestrator:
         self.sdo_name = sdo_name
 
         self.bidding_data = {node: {sdo: self.init_bid() for sdo in self.rap.sdos} for node in self.rap.nodes}
-        """ For each node, current resources assigned to sdos with bid values """
+        """ For each node, current resources assigned to sdos with bid values (see BiddingData) """
 
-        self.per_node_winners = {node: set() for node in self.rap.nodes}
+        self.per_node_winners = {node: WinnerSet() for node in self.rap.nodes}
         """ Winners sdos computed at the last iteration for each node """
 
         self.per_node_max_bid_ratio = {node: sys.maxsize for node in self.rap.nodes}
@@ -62,49 +107,142 @@ class SdoOrchestrator:
         self.detailed_implementations = list()
         """ If node is a winner, contains all the won implementation for each service of its bundle with utilities """
 
-    def multi_node_election(self, blacklisted_sdos=set()):
+        self.embedding_stats = None
         """
+        Search done by the last embedding: utility evaluations done (and saved) by the lazy greedy embedding (see
+        LazyGreedyRanking), or nodes explored by the branch-and-bound one (see BranchAndBoundEmbedding); both give
+        a summary() of it
+        """
+
+        self.embedding_quality = None
+        """ Quality of the last bundle embedded: utility, upper bound and gap, if the scheduling time limit was hit """
+
+        self.election_engine = ElectionEngine(self.rap)
+        """ Solves the knapsack problem on each node, caching results until node bids change """
+
+        self.utility = self.UTILITIES.bind(configuration.PRIVATE_UTILITY, self, configuration.SUBMODULAR_P_UTILITY)
+        """ Private utility of this sdo (see UtilityStrategy) """
+
+        self.service_utility = self.UTILITIES.bind("SERVICE", self, configuration.SUBMODULAR_P_UTILITY)
+        """ Utility of the services, used to evaluate the service utility of the implementations """
 
+        self.utility_cache = UtilityCache(configuration.UTILITY_CACHE_SIZE)
+        """ Marginal utilities already computed, for each bundle prefix and service:function:node """
+        self._utility_cache_problem = None
+
+        self.digest_cache = DigestCache(self.sdo_name, configuration.DIGEST_CACHE_SIZE)
+        """ Digests the pseudo utilities are drawn from, for each name combination """
+
+        self.parallel_scorer = ParallelScorer(self, configuration.SCORING_WORKERS,
+                                              configuration.PARALLEL_SCORING_THRESHOLD)
+        """ Scores large batches of candidates on worker processes, if scoring_workers is set """
+
+        self.embedding_seeds = EmbeddingSeeds(configuration.EMBEDDING_SEEDS if configuration.INCREMENTAL_REBID else 0)
+        """ Bundles of past greedy embeddings, to warm start the next ones """
+
+    @property
+    def bidding_data(self):
+        """
+        :return: BiddingData, or DenseBiddingData if so configured
+        """
+        return self._bidding_data
+
+    @bidding_data.setter
+    def bidding_data(self, bidding_data):
+        if configuration.BIDDING_STORE == "DENSE":
+            if not isinstance(bidding_data, DenseBiddingData):
+                bidding_data = DenseBiddingData(self.rap, bidding_data)
+        elif not isinstance(bidding_data, BiddingData):
+            bidding_data = BiddingData(bidding_data)
+        self._bidding_data = bidding_data
+
+    def serialize(self):
+        """
+        Serialize the class instance state into a dict
+        :return dict:
+        """
+        sdo_dict = dict()
+        sdo_dict['bidding-data'] = self.bidding_data
+        sdo_dict['per-node-winners'] = self.per_node_winners
+        sdo_dict['per-node-max-bid-ratio'] = self.per_node_max_bid_ratio
+        sdo_dict['implementations'] = self.implementations
+        sdo_dict['private-utility'] = self.private_utility
+        sdo_dict['detailed-implementations'] = self.detailed_implementations
+        return sdo_dict
+
+    def parse(self, sdo_dict):
+        """
+        Parse the class instance state from a dict
+        :param dict sdo_dict: as returned by serialize
+        """
+        self.bidding_data = sdo_dict['bidding-data']
+        self.per_node_winners = {node: WinnerSet.of(winners) for node, winners in sdo_dict['per-node-winners'].items()}
+        self.per_node_max_bid_ratio = sdo_dict['per-node-max-bid-ratio']
+        self.implementations = sdo_dict['implementations']
+        self.private_utility = sdo_dict['private-utility']
+        self.detailed_implementations = sdo_dict['detailed-implementations']
+        # the state a new orchestration starts from is replaced, so are utilities in some use cases
+        self.embedding_seeds.clear()
+
+    def close(self):
+        """
+        Releases the resources held by the orchestrator (i.e. the scoring workers), once the orchestration is over
+        """
+        self.parallel_scorer.shutdown()
+
+    def multi_node_election(self, blacklisted_sdos=set()):
+        """
+        Elects winners on each node. Then, false winners (see FalseWinnerResolver) are blacklisted and the election
+        is repeated, just on the nodes where they placed some bid, until there are no more false winners.
         :param set of str blacklisted_sdos:
         :return: winner_list, assignment_dict, lost_nodes
         """
+        tracing = LoggingConfiguration.tracing()
 
         logging.info("****** Start Election ******")
-        logging.log(LoggingConfiguration.VERBOSE, ": blacklisted sdos: " + str(blacklisted_sdos))
-        winners = {node: set() for node in self.rap.nodes}
+        logging.log(LoggingConfiguration.VERBOSE, ": blacklisted sdos: %s", blacklisted_sdos)
+        winners = {node: WinnerSet() for node in self.rap.nodes}
         lost_nodes = {sdo: set() for sdo in self.rap.sdos}
         bidded_nodes = {sdo: set() for sdo in self.rap.sdos}
-
-        # compute election for all nodes
         assignment_dict = dict()
-        for node in self.rap.nodes:
-            node_winner_list, node_assignment_dict = self.election(node, blacklisted_sdos)
-            logging.debug(": node_winner_list: " + str(node_winner_list))
-            winners[node] = node_winner_list
-            assignment_dict[node] = node_assignment_dict
-
-        # stores, for each sdo, lost nodes and bidded nodes
-        for sdo in self.rap.sdos:
-            bidded_nodes[sdo] = self.get_sdo_bid_nodes(sdo)
-            lost_nodes[sdo] = {n for n in bidded_nodes[sdo] if sdo not in winners[n]}
-
-        # check if, in some nodes, there are winner that lost for sure at least an other node
-        # in that case, remove them and repeate again the election
-        false_winners = self._compute_false_winners(winners, bidded_nodes, lost_nodes)
-        logging.debug("fake winners: " + str(false_winners))
-        if len(false_winners) > 0:
-            # recursion
-            new_winners, assignment_dict, residual_lost_nodes = self.multi_node_election(set.union(blacklisted_sdos,
-                                                                                                   false_winners))
+
+        blacklisted_sdos = set(blacklisted_sdos)
+        false_winners = set()
+        """ Lost nodes of false winners are the ones computed before they have been blacklisted """
+        to_elect_nodes = set(self.rap.nodes)
+        while True:
+            # compute election for the nodes whose bidders changed
+            for node in self.rap.nodes:
+                if node in to_elect_nodes:
+                    node_winner_list, node_assignment_dict = self.election(node, blacklisted_sdos)
+                    if tracing:
+                        logging.debug(": node_winner_list: " + str(node_winner_list))
+                    winners[node] = node_winner_list
+                    assignment_dict[node] = node_assignment_dict
+
+            # stores, for each sdo, lost nodes and bidded nodes
             for sdo in self.rap.sdos:
-                if sdo not in blacklisted_sdos:
-                    if sdo not in false_winners:
-                        lost_nodes[sdo] = residual_lost_nodes[sdo]
-            return new_winners, assignment_dict, lost_nodes
+                bidded_nodes[sdo] = self.get_sdo_bid_nodes(sdo)
+                if sdo not in false_winners:
+                    lost_nodes[sdo] = {n for n in bidded_nodes[sdo] if sdo not in winners[n]}
+
+            # check if, in some nodes, there are winner that lost for sure at least an other node
+            # in that case, remove them and repeat the election where they did bid
+            new_false_winners = self._compute_false_winners(winners, bidded_nodes, lost_nodes)
+            if tracing:
+                logging.debug("fake winners: " + str(new_false_winners))
+            if len(new_false_winners) == 0:
+                break
+            false_winners.update(new_false_winners)
+            blacklisted_sdos.update(new_false_winners)
+            to_elect_nodes = set()
+            for sdo in new_false_winners:
+                to_elect_nodes.update(bidded_nodes[sdo])
+            logging.log(LoggingConfiguration.VERBOSE, ": blacklisted sdos: %s", blacklisted_sdos)
 
         # Election completed
-        logging.info(" WINNERS DICT: '" + pprint.pformat(winners))
-        logging.info(" LOST NODES DICT: '" + pprint.pformat(lost_nodes))
+        logging.info(" WINNERS DICT: '%s", LazyFormat(pprint.pformat, winners))
+        logging.info(" LOST NODES DICT: '%s", LazyFormat(pprint.pformat, lost_nodes))
         logging.info("******* End Election *******")
         return winners, assignment_dict, lost_nodes
 
@@ -129,78 +267,8 @@ class SdoOrchestrator:
         :param lost_nodes:
         :return:
         """
-
-        known_fakes = set()
         max_bids = {sdo: max([self.bidding_data[node][sdo]['bid'] for node in self.rap.nodes]) for sdo in self.rap.sdos}
-
-        for sdo in sorted(set(itertools.chain(*winners.values())), key=lambda x: max_bids[x], reverse=True):
-            logging.debug("checking sdo:" + sdo)
-            if sdo in known_fakes:
-                continue
-            # check if the sdo won in all nodes
-            if len(bidded_nodes[sdo]) > 0 and len(lost_nodes[sdo]) > 0:
-                # sdo lost some nodes
-                logging.debug("sdo lost some nodes")
-                collected_fakes = set()
-                for node in lost_nodes[sdo]:
-                    # check if the node is really lost
-                    logging.debug("check if node " + node + " is really lost")
-                    # takes the possible fake winners starting from this sdo
-                    false_winner, found_falses = self._find_false_winner(sdo, node, winners, max_bids, bidded_nodes,
-                                                                         lost_nodes, known_fakes)
-                    collected_fakes.update(found_falses)
-                    if false_winner is not None:
-                        # found a possible fake winner
-                        logging.debug("possible fake winner: " + false_winner)
-                        collected_fakes.add(false_winner)
-                        continue
-                    else:
-                        logging.debug("node is lost, checked sdo is a fake winner!")
-                        known_fakes.add(sdo)
-                        break
-                # a collected fake is considered fake only if he lost with at least someone that is not a fake in turn
-                for fake in sorted(set(collected_fakes)):
-                    real_losts = [node for node in lost_nodes[fake] if len(winners[node].difference(known_fakes)) > 0]
-                    if len(real_losts) > 0:
-                        known_fakes.add(fake)
-        return set(known_fakes)
-
-    @staticmethod
-    def _find_false_winner(sdo, node, winners, max_bids, bidded_nodes, lost_nodes, known_falses, ignore=list()):
-        """
-        Search and return for an sdo against who the given sdo lost the given node, but that,
-        recursively, lost for sure an other node against someone else.
-        :param sdo:
-        :param node:
-        :param winners:
-        :param max_bids:
-        :param bidded_nodes:
-        :param lost_nodes:
-        :param known_falses:
-        :param ignore: the recursion chain of sdos to ignore (avoid recursion loops)
-        :return:
-        """
-        found_falses = set()
-        for w in sorted(winners[node], key=lambda x: max_bids[x]):
-            # check if w is a fake winner
-            if w in known_falses:
-                # w is already known to be fake!
-                return w, found_falses
-            if w not in ignore and len(bidded_nodes[w]) > 0:
-                for lost_node in lost_nodes[w]:
-                    # w lost this node, check if, for this node there is a fake winner
-                    other_false, other_falses = SdoOrchestrator._find_false_winner(w, lost_node, winners, max_bids,
-                                                                                   bidded_nodes, lost_nodes,
-                                                                                   known_falses.union(found_falses),
-                                                                                   ignore + [sdo])
-                    if other_false is None:
-                        # no fakes winners found to save w, he lost that node for sure! so w is a fake winner
-                        return w, found_falses
-                    else:
-                        # w is not for sure a fake winner, because we found that he lost, in turn, against a fake one
-                        found_falses.add(other_false)
-                        found_falses.update(other_falses)
-        return None, found_falses
+        return FalseWinnerResolver(winners, bidded_nodes, lost_nodes, max_bids).resolve()
 
     def election(self, node, blacklisted_sdos=set()):
         """
@@ -212,54 +280,9 @@ class SdoOrchestrator:
         """
 
         logging.info("****** Election on node '" + node + "' ******")
-        node_winners = set()
-        node_residual_resources = dict(self.rap.available_resources[node])
-        node_assignment_dict = {sdo: dict() for sdo in self.rap.sdos}
-        logging.info("Voting data: " + pprint.pformat(self.bidding_data[node], compact=True))
-        while True:
-            logging.debug(" - Search for best voter to add ...")
-            best_bid_demand_ratio = 0
-            best_bidder = None
-
-            # look for the highest one
-            for sdo in sorted(self.bidding_data[node], key=lambda x: x):
-                # skip if blacklisted
-                if sdo in blacklisted_sdos:
-                    continue
-                # skip if is already a winner
-                if sdo in node_winners or 'bid' not in self.bidding_data[node][sdo]:
-                    continue
-                # skip if bid is 0
-                if self.bidding_data[node][sdo]['bid'] == 0:
-                    continue
-                # get total bid for this sdo
-                sdo_bid = self.bidding_data[node][sdo]['bid']
-                sdo_demand = self.bidding_data[node][sdo]['consumption']
-                logging.debug(" --- candidate: '" + sdo + "' | bid: '" + str(sdo_bid) + "'")
-                # check if is the higher so far
-                sdo_ratio = sdo_bid/self.rap.norm(node, sdo_demand)
-                if sdo_ratio > best_bid_demand_ratio:
-                    logging.debug(" ----- is the best so far ...")
-                    # check if solution would be infrastructure-bounded
-                    if self.rap.check_custom_node_bound({sdo: self.bidding_data[node][sdo]}, node_residual_resources):
-                        logging.debug(" ----- is feasible: update best sdo.")
-                        best_bidder = sdo
-                        best_bid_demand_ratio = sdo_ratio
-
-            # check if we found one
-            if best_bidder is not None:
-                # add the bidder to the winner list
-                logging.debug(" - WINNER: '" + best_bidder + "' | BID_RATIO: '" + str(best_bid_demand_ratio) + "'")
-                node_assignment_dict[best_bidder] = self.bidding_data[node][best_bidder]
-                node_winners.add(best_bidder)
-                allocated_resources = node_assignment_dict[best_bidder]["consumption"]
-                node_residual_resources = self.rap.sub_resources(node_residual_resources, allocated_resources)
-            else:
-                # greedy process has finished
-                logging.debug(" - No winner found, election terminated.'")
-                break
-
-        logging.info(" NODE " + node + " | WINNER LIST: " + pprint.pformat(node_winners))
+        logging.info("Voting data: %s", LazyFormat(pprint.pformat, self.bidding_data[node], compact=True))
+        node_winners, node_assignment_dict = self.election_engine.elect(node, self.bidding_data[node],
+                                                                        blacklisted_sdos)
         logging.info("******* End Election *******")
         return node_winners, node_assignment_dict
 
@@ -272,8 +295,9 @@ class SdoOrchestrator:
 
         logging.info("------------ Starting orchestration process -------------")
         # 1. Build, greedy, the best function vector (max total BID), that also is infrastructure-bounded
-        winners = {node: set() for node in self.rap.nodes}
+        winners = {node: WinnerSet() for node in self.rap.nodes}
         assignment_dict = None
+        resource_bound = dict(self.rap.available_resources)
         blacklisted_nodes = set()
         desired_implementation = list()
         self.implementations = list()
@@ -283,16 +307,25 @@ class SdoOrchestrator:
         desired_bid_bundle = None
         impl = list()
         winners_set = set()
+        if self.UTILITY_READS_EXTERNAL_STATE:
+            # utilities may have changed since the last orchestration
+            self.embedding_seeds.clear()
+        if self.RELEASE_BIDS_ON_ORCHESTRATION:
+            for node in self.rap.nodes:
+                self.bidding_data[node][self.sdo_name] = self.init_bid(time.time())
         while self.sdo_name not in winners_set and len(blacklisted_nodes) < len(self.rap.nodes):
             logging.info("Search for desired bundle ...")
-            logging.info("Blacklisting nodes " + str(blacklisted_nodes))
+            logging.info("Blacklisting nodes %s", blacklisted_nodes)
             try:
-                desired_bid_bundle, impl = self._greedy_embedding(self.rap.available_resources, blacklisted_nodes)
+                if configuration.EMBEDDING_STRATEGY == "BRANCH-AND-BOUND":
+                    desired_bid_bundle, impl = self._branch_and_bound_embedding(resource_bound, blacklisted_nodes)
+                else:
+                    desired_bid_bundle, impl = self._greedy_embedding(resource_bound, blacklisted_nodes)
             except SchedulingTimeout as ste:
                 logging.info("Scheduling Timeout: " + ste.message)
                 desired_bid_bundle = None
                 impl = list()
-            logging.info("Desired bundle: " + pprint.pformat(desired_bid_bundle))
+            logging.info("Desired bundle: %s", LazyFormat(pprint.pformat, desired_bid_bundle))
             if desired_bid_bundle is None:
                 # release biddings
                 for node in self.rap.nodes:
@@ -315,14 +348,11 @@ class SdoOrchestrator:
             # set new bid ratio bound
             self._update_bid_ratio_bound(winners, lost_nodes)
             self.per_node_winners = winners
-            blacklisted_nodes.update(lost_nodes[self.sdo_name])
-            # release the bidding on lost nodes
-            for node in blacklisted_nodes:
-                self.bidding_data[node][self.sdo_name] = self.init_bid(time.time())
+            self._release_lost_nodes(lost_nodes[self.sdo_name], blacklisted_nodes, resource_bound)
             winners_set = self.get_winners()
 
-        logging.info(" --- Winners dict: " + pprint.pformat(winners, compact=True))
-        logging.info(" --- Assignment dict: " + pprint.pformat(assignment_dict))
+        logging.info(" --- Winners dict: %s", LazyFormat(pprint.pformat, winners, compact=True))
+        logging.info(" --- Assignment dict: %s", LazyFormat(pprint.pformat, assignment_dict))
         if self.sdo_name in winners_set:
             # we found the new bids for this sdo
             logging.info(" --- Sdo is a strong winner!!!")
@@ -336,7 +366,7 @@ class SdoOrchestrator:
             for node in self.rap.nodes:
                 if self.sdo_name in self.per_node_winners[node]:
                     # remove from winners
-                    self.per_node_winners[node].discard(self.sdo_name)
+                    self.per_node_winners[node] = self.per_node_winners[node].without_winner(self.sdo_name)
                 #else:
                 #    # set a limit lower than the current lowest one to avoid over-rebid
                 #    self.per_node_last_bids[node] = min([self.bidding_data[node][s]['bid']
@@ -350,7 +380,7 @@ class SdoOrchestrator:
             self.implementations = list()
             self.detailed_implementations = list()
             residual_resources = self.rap.get_residual_resources(assignment_dict)
-            logging.info(" ----- Residual resources: " + pprint.pformat(residual_resources))
+            logging.info(" ----- Residual resources: %s", LazyFormat(pprint.pformat, residual_resources))
             logging.info("Search for lighter bundle ...")
             try:
                 lighter_bid_bundle, impl = self._patience_embedding(residual_resources)
@@ -358,7 +388,7 @@ class SdoOrchestrator:
                 logging.info("Scheduling Timeout: " + ste.message)
                 lighter_bid_bundle = None
                 impl = list()
-            logging.info("Lighter bundle: " + pprint.pformat(lighter_bid_bundle))
+            logging.info("Lighter bundle: %s", LazyFormat(pprint.pformat, lighter_bid_bundle))
             if lighter_bid_bundle is None:
                 logging.info(" ----- There are no solutions fitting the remaining space.")
             else:
@@ -367,7 +397,7 @@ class SdoOrchestrator:
                 lighter_implementation = self._build_implementation_bundle_from_bid_bundle(lighter_bid_bundle)
                 for node in assignment:
                     self.bidding_data[node][self.sdo_name] = assignment[node][self.sdo_name]
-                    self.per_node_winners[node].add(self.sdo_name)
+                    self.per_node_winners[node] = self.per_node_winners[node].with_winner(self.sdo_name)
                 self.implementations = lighter_implementation
                 self.detailed_implementations = impl
                 self.private_utility = self._private_utility_from_bid_bundle(lighter_bid_bundle)
@@ -376,13 +406,31 @@ class SdoOrchestrator:
             for node in self.bidding_data:
                 # TODO il prossimo if va fatto con i nodi con bid non zero invece di così? (cambia?)
                 if self.sdo_name in self.per_node_winners[node]:
-                    self.per_node_max_bid_ratio[node] = self.bidding_data[node][self.sdo_name]['bid'] / self.rap.norm(
+                    bid_ratio = self.bidding_data[node][self.sdo_name]['bid'] / self.rap.norm(
                                                             node, self.bidding_data[node][self.sdo_name]['consumption'])
-
-        logging.info("Sdo final voting: " + pprint.pformat({node: self.bidding_data[node][self.sdo_name]
-                                                            for node in self.rap.nodes}))
+                    if self.KEEP_LOWEST_BID_RATIO:
+                        bid_ratio = min(self.per_node_max_bid_ratio[node], bid_ratio)
+                    self.per_node_max_bid_ratio[node] = bid_ratio
+
+        logging.info("Sdo final voting: %s", LazyFormat(pprint.pformat, {node: self.bidding_data[node][self.sdo_name]
+                                                                         for node in self.rap.nodes}))
+        logging.info("Utility cache: " + str(self.utility_cache.hits) + " hits, " +
+                     str(self.utility_cache.misses) + " misses")
+        logging.info("Digest cache: " + str(self.digest_cache.hits) + " hits, " +
+                     str(self.digest_cache.misses) + " misses")
         logging.info("------------ End of orchestration process -------------")
 
+    def _release_lost_nodes(self, lost_nodes, blacklisted_nodes, resource_bound):
+        """
+        Releases the bids on the nodes lost in the last election, and blacklists them for the next bundles
+        :param set of str lost_nodes: nodes lost by this sdo
+        :param set of str blacklisted_nodes: nodes excluded from next bundles, updated
+        :param dict[str, dict[str, int]] resource_bound: for each node, resources next bundles must fit, may be updated
+        """
+        blacklisted_nodes.update(lost_nodes)
+        for node in blacklisted_nodes:
+            self.bidding_data[node][self.sdo_name] = self.init_bid(time.time())
+
     def _update_bid_ratio_bound(self, winners, lost_nodes):
         """
         bound future bids on each node
@@ -393,9 +441,10 @@ class SdoOrchestrator:
         for node in self.rap.nodes:
             if len(winners[node]) > 0 and (self.sdo_name in winners[node] or node in lost_nodes[self.sdo_name]
                                           or self.per_node_max_bid_ratio[node] != sys.maxsize):
-                min_bid_ratio = min([self.bidding_data[node][w]['bid']/self.rap.norm(
-                                                                        node, self.bidding_data[node][w]['consumption'])
-                                     for w in winners[node]])
+                winners_list = list(winners[node])
+                demand_norms = self.rap.norms(node, [self.bidding_data[node][w]['consumption'] for w in winners_list])
+                min_bid_ratio = min([self.bidding_data[node][w]['bid']/float(demand_norm)
+                                     for w, demand_norm in zip(winners_list, demand_norms)])
                 if self.sdo_name not in winners[node] or \
                         min_bid_ratio < self.bidding_data[node][self.sdo_name]['bid']/self.rap.norm(
                                                         node, self.bidding_data[node][self.sdo_name]['consumption']):
@@ -409,6 +458,7 @@ class SdoOrchestrator:
         :param set of str blacklisted_nodes: those nodes will not be taken in account
         :return dict[str, dict[str, union[str, int]]]: the best optimization bid_bundle found
         """
+        tracing = LoggingConfiguration.tracing()
         begin_ts = time.time()
         current_bid_bundle = dict()
         """ { service_name: { function: function_name, node: node_name, utility: utility_value } } """
@@ -416,22 +466,51 @@ class SdoOrchestrator:
         skip_vector = [0]*len(self.service_bundle)
         added_services = list()
 
+        self.embedding_quality = None
+
+        lazy_ranking = None
+        if configuration.EMBEDDING_STRATEGY == "LAZY-GREEDY":
+            lazy_ranking = LazyGreedyRanking(self.service_bundle, self.rap, self._marginal_utility,
+                                             diminishing_returns=self.DIMINISHING_RETURNS and
+                                             configuration.SUBMODULAR_P_UTILITY,
+                                             marginal_utilities=self._marginal_utilities)
+        self.embedding_stats = lazy_ranking
+
+        # incremental rebidding: start from the part of a past bundle that this search would find again
+        seed = self.embedding_seeds.get(self.rap.compiled, resource_bound, blacklisted_nodes)
+        for serv, function, node, utility in seed:
+            current_bid_bundle[serv] = {"function": function, "node": node, "utility": utility, "added_at": time.time()}
+            added_services.append(serv)
+            current_utility += utility
+        seed_length = len(seed)
+        if len(seed) > 0:
+            logging.info("Greedy embedding warm started with " + str(seed_length) + " services of a past bundle")
+
         while len(current_bid_bundle) < len(self.service_bundle):
-            logging.debug(" - Current bundle: " + pprint.pformat(current_bid_bundle, compact=True))
-            logging.debug(" - Skip vector: " + pprint.pformat(skip_vector, compact=True))
-            logging.debug(" - Searching for service to add at index: " + str(len(current_bid_bundle)))
+            if tracing:
+                logging.debug(" - Current bundle: " + pprint.pformat(current_bid_bundle, compact=True))
+                logging.debug(" - Skip vector: " + pprint.pformat(skip_vector, compact=True))
+                logging.debug(" - Searching for service to add at index: " + str(len(current_bid_bundle)))
             try:
                 # exclude nodes where bid is completed
-                completed_bid_nodes = self._get_completed_bid_nodes(current_bid_bundle)
+                completed_bid_nodes = set()
+                if self.EXCLUDE_COMPLETED_BID_NODES:
+                    completed_bid_nodes = self._get_completed_bid_nodes(current_bid_bundle)
                 # get the best greedy
-                s, f, n, mu = self._get_next_best_service(current_bid_bundle,
-                                                          skip_vector[len(current_bid_bundle)],
-                                                          set.union(blacklisted_nodes, completed_bid_nodes))
-                logging.debug(" --- Found the next " + str(skip_vector[len(current_bid_bundle)]+1) +
-                              "-best service: '" + s +
-                              "' with function '" + f +
-                              "' on node '" + n +
-                              "' giving marginal utility " + str(mu))
+                if lazy_ranking is not None:
+                    s, f, n, mu = lazy_ranking.get_next_best_service(current_bid_bundle,
+                                                                     skip_vector[len(current_bid_bundle)],
+                                                                     set.union(blacklisted_nodes, completed_bid_nodes))
+                else:
+                    s, f, n, mu = self._get_next_best_service(current_bid_bundle,
+                                                              skip_vector[len(current_bid_bundle)],
+                                                              set.union(blacklisted_nodes, completed_bid_nodes))
+                if tracing:
+                    logging.debug(" --- Found the next " + str(skip_vector[len(current_bid_bundle)]+1) +
+                                  "-best service: '" + s +
+                                  "' with function '" + f +
+                                  "' on node '" + n +
+                                  "' giving marginal utility " + str(mu))
                 # add to current bundle
                 current_bid_bundle[s] = {"function": f, "node": n, "utility": mu, "added_at": time.time()}
                 current_implementations = [(serv,
@@ -440,30 +519,48 @@ class SdoOrchestrator:
                                             current_bid_bundle[serv]["utility"])
                                            for serv in sorted(current_bid_bundle,
                                                               key=lambda x: current_bid_bundle[x]["added_at"])]
-                logging.debug(" --- Current bundle = " + str(current_implementations))
+                if tracing:
+                    logging.debug(" --- Current bundle = " + str(current_implementations))
                 # check if the total is bounded
                 assignments = self._build_assignment_from_bid_bundle(current_bid_bundle)
                 if not self.rap.check_custom_bound(assignments, resource_bound):
                     # if not, remove the new function and repeat iteration looking for a worse one
-                    logging.debug(" ----- Exceeded capacity, looking for an other one ...")
+                    if tracing:
+                        logging.debug(" ----- Exceeded capacity, looking for an other one ...")
                     del current_bid_bundle[s]
                     skip_vector[len(current_bid_bundle)] += 1
                     # check timeout
-                    if time.time() > begin_ts + configuration.SCHEDULING_TIME_LIMIT:
+                    if self.GREEDY_TIME_LIMIT and time.time() > begin_ts + configuration.SCHEDULING_TIME_LIMIT:
+                        if configuration.ANYTIME_EMBEDDING:
+                            self._log_embedding_stats()
+                            return self._complete_bid_bundle(current_bid_bundle, added_services,
+                                                             resource_bound, blacklisted_nodes)
                         raise SchedulingTimeout("Scheduling took to long, aborted")
                 else:
                     # update utility and go next iteration
-                    logging.debug(" ----- Bounded, added to bundle.")
+                    if tracing:
+                        logging.debug(" ----- Bounded, added to bundle.")
                     added_services.append(s)
                     current_utility += mu
             except NoFunctionsLeft:
                 # remove most recently added function to go back to previous iteration
-                logging.debug(" --- No function fits the remaining capacity, "
-                              "changing the one picked at the previous step ...")
+                if tracing:
+                    logging.debug(" --- No function fits the remaining capacity, "
+                                  "changing the one picked at the previous step ...")
                 skip_vector[len(current_bid_bundle)] = 0
                 if len(added_services) == 0:
                     # there are no feasible solution
+                    self._log_embedding_stats()
                     return None, None
+                if len(added_services) <= seed_length:
+                    # alternatives to the services of the seed are not known, search again from scratch
+                    logging.info("Greedy embedding has to change the warm start bundle, starting from scratch")
+                    current_bid_bundle = dict()
+                    current_utility = 0
+                    skip_vector = [0]*len(self.service_bundle)
+                    added_services = list()
+                    seed_length = 0
+                    continue
                 del current_bid_bundle[added_services[-1]]
                 added_services = added_services[:-1]
                 skip_vector[len(current_bid_bundle)] += 1
@@ -474,6 +571,7 @@ class SdoOrchestrator:
                                     current_bid_bundle[serv]["utility"])
                                    for serv in sorted(current_bid_bundle,
                                                       key=lambda x: current_bid_bundle[x]["added_at"])]
+        self.embedding_seeds.put(self.rap.compiled, resource_bound, blacklisted_nodes, current_implementations)
 
         # round utilities
         current_bid_bundle = {k: {'function': v['function'],
@@ -481,8 +579,131 @@ class SdoOrchestrator:
                                   'utility': int(round(v['utility'])),
                                   'added_at': v['added_at']}
                               for k, v in current_bid_bundle.items()}
+        self._log_embedding_stats()
         return current_bid_bundle, current_implementations
 
+    def _branch_and_bound_embedding(self, resource_bound, blacklisted_nodes=set()):
+        """
+        Find the best solution fitting the given resources within the node budget (see BranchAndBoundEmbedding)
+        :param dict[str, dict[str, int]] resource_bound: for each node, resources that the solution must fit
+        :param set of str blacklisted_nodes: those nodes will not be taken in account
+        :raises SchedulingTimeout: if the budget is spent before any bundle is found
+        :return dict[str, dict[str, union[str, int]]]: the best optimization bid_bundle found
+        """
+        self.embedding_quality = None
+        search = BranchAndBoundEmbedding(self, resource_bound, blacklisted_nodes, configuration.BNB_NODE_BUDGET,
+                                         time_limit=configuration.SCHEDULING_TIME_LIMIT
+                                         if self.GREEDY_TIME_LIMIT else None,
+                                         utility_upper_bound=self.MARGINAL_UTILITY_UPPER_BOUND,
+                                         submodular=configuration.SUBMODULAR_P_UTILITY)
+        self.embedding_stats = search
+        best_bundle = search.search()
+        self._log_embedding_stats()
+        if best_bundle is None:
+            if search.complete:
+                # there are no feasible solution
+                return None, None
+            raise SchedulingTimeout("Branch-and-bound budget spent before finding any bundle")
+
+        current_bid_bundle = dict()
+        for serv, function, node, utility in best_bundle:
+            current_bid_bundle[serv] = {"function": function, "node": node, "utility": utility, "added_at": time.time()}
+        current_implementations = list(best_bundle)
+
+        # round utilities
+        current_bid_bundle = {k: {'function': v['function'],
+                                  'node': v['node'],
+                                  'utility': int(round(v['utility'])),
+                                  'added_at': v['added_at']}
+                              for k, v in current_bid_bundle.items()}
+        return current_bid_bundle, current_implementations
+
+    def _log_embedding_stats(self):
+        if self.embedding_stats is not None:
+            logging.info("%s", LazyFormat(self.embedding_stats.summary))
+
+    def _complete_bid_bundle(self, bid_bundle, added_services, resource_bound, blacklisted_nodes=set()):
+        """
+        Completes a partial greedy bundle adding, for each missing service, the lightest function:node fitting the
+        given resources, so that a feasible bundle can be returned when the scheduling time limit is hit.
+        If the partial bundle cannot be completed, its last services are dropped one by one until it can.
+        Sets embedding_quality: the upper bound is the utility that any completion of the partial bundle may reach
+        (with submodular utilities, each service added next gives at most the utility of the last one added).
+        :param dict[str, dict[str, union[str, int]]] bid_bundle: partial bundle, fitting the resource bound
+        :param list of str added_services: services of the partial bundle, in the order they have been added
+        :param dict[str, dict[str, int]] resource_bound: for each node, resources that the solution must fit
+        :param set of str blacklisted_nodes: those nodes will not be taken in account
+        :raises SchedulingTimeout: if even the lightest bundle does not fit the resources
+        :return dict[str, dict[str, union[str, int]]]: the completed bid_bundle
+        """
+        logging.info("Scheduling Timeout: completing the current bundle with the lightest functions ...")
+        partial_utility = sum([bid_bundle[s]['utility'] for s in added_services])
+        missing_services = len(self.service_bundle) - len(added_services)
+        if configuration.SUBMODULAR_P_UTILITY and len(added_services) > 0:
+            upper_bound = partial_utility + missing_services*bid_bundle[added_services[-1]]['utility']
+        else:
+            upper_bound = None
+
+        completed_bid_bundle = None
+        for prefix_length in range(len(added_services), -1, -1):
+            completed_bid_bundle = self._complete_with_lighter_services(
+                {s: bid_bundle[s] for s in added_services[:prefix_length]}, resource_bound, blacklisted_nodes)
+            if completed_bid_bundle is not None:
+                logging.debug(" - bundle completed keeping %s greedy services", prefix_length)
+                break
+        if completed_bid_bundle is None:
+            raise SchedulingTimeout("Scheduling took to long, bundle cannot be completed")
+        bid_bundle = completed_bid_bundle
+
+        utility = sum([bid_bundle[s]['utility'] for s in bid_bundle])
+        gap = None
+        if upper_bound is not None and upper_bound > 0:
+            gap = max(upper_bound - utility, 0)/upper_bound
+        self.embedding_quality = {'utility': utility, 'upper_bound': upper_bound, 'gap': gap}
+        logging.info("Completed bundle quality: %s", LazyFormat(pprint.pformat, self.embedding_quality))
+
+        current_implementations = [(serv,
+                                    bid_bundle[serv]["function"],
+                                    bid_bundle[serv]["node"],
+                                    bid_bundle[serv]["utility"])
+                                   for serv in sorted(bid_bundle, key=lambda x: bid_bundle[x]["added_at"])]
+
+        # round utilities
+        bid_bundle = {k: {'function': v['function'],
+                          'node': v['node'],
+                          'utility': int(round(v['utility'])),
+                          'added_at': v['added_at']}
+                      for k, v in bid_bundle.items()}
+        return bid_bundle, current_implementations
+
+    def _complete_with_lighter_services(self, bid_bundle, resource_bound, blacklisted_nodes=set()):
+        """
+
+        :param dict[str, dict[str, union[str, int]]] bid_bundle: partial bundle, fitting the resource bound
+        :param dict[str, dict[str, int]] resource_bound: for each node, resources that the solution must fit
+        :param set of str blacklisted_nodes: those nodes will not be taken in account
+        :return dict[str, dict[str, union[str, int]]]: the completed bid_bundle, None if it does not fit
+        """
+        bid_bundle = dict(bid_bundle)
+        consumption_iterator = {s: 0 for s in self.service_bundle}
+        # the bound does not change along the embedding
+        consumption_table = self.rap.compiled.average_consumption(resource_bound)
+        lighter_index = LighterServiceIndex(self.rap, consumption_table, self.service_bundle)
+        while len(bid_bundle) < len(self.service_bundle):
+            completed_bid_nodes = self._get_completed_bid_nodes(bid_bundle)
+            s, f, n, mu = self._get_next_lighter_service(bid_bundle,
+                                                         consumption_iterator,
+                                                         {s for s in bid_bundle},
+                                                         set.union(blacklisted_nodes, completed_bid_nodes),
+                                                         lighter_index=lighter_index)
+            if s is None:
+                return None
+            bid_bundle[s] = {"function": f, "node": n, "utility": mu, "added_at": time.time()}
+            assignments = self._build_assignment_from_bid_bundle(bid_bundle)
+            if not self.rap.check_custom_bound(assignments, resource_bound):
+                return None
+        return bid_bundle
+
     def _patience_embedding(self, resource_bound, blacklisted_nodes=set()):
         """
         Find the patience-best solution fitting the given resources.
@@ -492,17 +713,23 @@ class SdoOrchestrator:
         :param set of str blacklisted_nodes: those nodes will not be taken in account
         :return dict[str, dict[str, union[str, int]]]: the best optimization bid_bundle found
         """
+        tracing = LoggingConfiguration.tracing()
         begin_ts = time.time()
+        self.embedding_quality = None
         current_bid_bundle = dict()
         """ { service_name: { function: function_name, node: node_name, utility: utility_value } } """
         current_utility = 0
         skip_vector = [0]*len(self.service_bundle)
         added_services = list()
         consumption_iterator = {s: 0 for s in self.service_bundle}
+        # the bound does not change along the embedding
+        consumption_table = self.rap.compiled.average_consumption(resource_bound)
+        lighter_index = LighterServiceIndex(self.rap, consumption_table, self.service_bundle)
         while len(current_bid_bundle) < len(self.service_bundle):
-            logging.debug(" - Current bundle: " + pprint.pformat(current_bid_bundle, compact=True))
-            logging.debug(" - Skip vector: " + pprint.pformat(skip_vector, compact=True))
-            logging.debug(" - Searching for service to add at index: " + str(len(current_bid_bundle)))
+            if tracing:
+                logging.debug(" - Current bundle: " + pprint.pformat(current_bid_bundle, compact=True))
+                logging.debug(" - Skip vector: " + pprint.pformat(skip_vector, compact=True))
+                logging.debug(" - Searching for service to add at index: " + str(len(current_bid_bundle)))
             # exclude nodes where bid is completed
             completed_bid_nodes = self._get_completed_bid_nodes(current_bid_bundle)
             # get the best greedy
@@ -510,15 +737,16 @@ class SdoOrchestrator:
                                                          consumption_iterator,
                                                          {s for s in current_bid_bundle},
                                                          set.union(blacklisted_nodes, completed_bid_nodes),
-                                                         resource_bound=resource_bound)
+                                                         lighter_index=lighter_index)
             if s is None:
                 # building of bid_bundle is not possible
                 return None, None
-            logging.debug(" --- Found the next " + str(skip_vector[len(current_bid_bundle)]+1) +
-                          "-lighter service: '" + s +
-                          "' with function '" + f +
-                          "' on node '" + n +
-                          "' giving marginal utility " + str(mu))
+            if tracing:
+                logging.debug(" --- Found the next " + str(skip_vector[len(current_bid_bundle)]+1) +
+                              "-lighter service: '" + s +
+                              "' with function '" + f +
+                              "' on node '" + n +
+                              "' giving marginal utility " + str(mu))
             # add to current bundle
             current_bid_bundle[s] = {"function": f, "node": n, "utility": mu, "added_at": time.time()}
             current_implementations = [(serv,
@@ -528,24 +756,27 @@ class SdoOrchestrator:
                                        for serv in sorted(current_bid_bundle,
                                                           key=lambda x: current_bid_bundle[x]["added_at"])]
 
-            logging.debug(" --- Current bundle = " + str(current_implementations))
+            if tracing:
+                logging.debug(" --- Current bundle = " + str(current_implementations))
             # check if the total is bounded
             assignments = self._build_assignment_from_bid_bundle(current_bid_bundle)
             if not self.rap.check_custom_bound(assignments, resource_bound):
                 # if not, there are no feasible solution
-                logging.debug(" ----- Exceeded capacity, no feasible assignment found ...")
+                if tracing:
+                    logging.debug(" ----- Exceeded capacity, no feasible assignment found ...")
                 return None, None
             else:
                 # update utility and go next iteration
-                logging.debug(" ----- Bounded, added to bundle.")
+                if tracing:
+                    logging.debug(" ----- Bounded, added to bundle.")
                 added_services.append(s)
                 current_utility += mu
 
-        logging.debug(" - lightest bundle found, trying to improve it.")
+        if tracing:
+            logging.debug(" - lightest bundle found, trying to improve it.")
         not_improvable_services = set()
-        consumption_iterator = {s: self._get_function_average_consumption(current_bid_bundle[s]["function"],
-                                                                          node=current_bid_bundle[s]["node"],
-                                                                          resources=resource_bound)
+        consumption_iterator = {s: consumption_table.get(current_bid_bundle[s]["function"],
+                                                         node=current_bid_bundle[s]["node"])
                                 for s in current_bid_bundle}
         while len(not_improvable_services) < len(current_bid_bundle):
             # exclude nodes where bid is completed
@@ -556,11 +787,11 @@ class SdoOrchestrator:
                                                          consumption_iterator,
                                                          not_improvable_services,
                                                          set.union(blacklisted_nodes, completed_bid_nodes),
-                                                         resource_bound=resource_bound)
+                                                         lighter_index=lighter_index)
             if s is None:
                 # nothing better found
                 break
-            consumption_iterator[s] = self._get_function_average_consumption(f, node=n, resources=resource_bound)
+            consumption_iterator[s] = consumption_table.get(f, node=n)
             if mu > current_bid_bundle[s]["utility"]:
                 old_impl = dict(current_bid_bundle[s])
                 current_bid_bundle[s] = {"function": f, "node": n, "utility": mu, "added_at": time.time()}
@@ -569,22 +800,30 @@ class SdoOrchestrator:
                 assignments = self._build_assignment_from_bid_bundle(current_bid_bundle)
                 if not self.rap.check_custom_bound(assignments, resource_bound):
                     # if not, go back to last bundle
-                    logging.debug(" ----- Exceeded capacity, this service cannot be improved ...")
+                    if tracing:
+                        logging.debug(" ----- Exceeded capacity, this service cannot be improved ...")
                     current_bid_bundle[s] = old_impl
                     not_improvable_services.add(s)
                 else:
                     # update utility and go next iteration
-                    logging.debug(" ----- Bounded, added to bundle.")
+                    if tracing:
+                        logging.debug(" ----- Bounded, added to bundle.")
                     current_implementations = [(serv,
                                                 current_bid_bundle[serv]["function"],
                                                 current_bid_bundle[serv]["node"],
                                                 current_bid_bundle[serv]["utility"])
                                                for serv in sorted(current_bid_bundle,
                                                                   key=lambda x: current_bid_bundle[x]["added_at"])]
-                    logging.debug(" --- Current bundle = " + str(current_implementations))
+                    if tracing:
+                        logging.debug(" --- Current bundle = " + str(current_implementations))
                     added_services.append(s)
                     current_utility += mu
                     if time.time() > begin_ts + configuration.SCHEDULING_TIME_LIMIT:
+                        # the lightest bundle improved so far is returned, how much it could still improve is unknown
+                        logging.info("Scheduling Timeout: returning the bundle improved so far")
+                        self.embedding_quality = {'utility': self._private_utility_from_bid_bundle(current_bid_bundle),
+                                                  'upper_bound': None,
+                                                  'gap': None}
                         break
 
         current_implementations = [(serv,
@@ -628,32 +867,37 @@ class SdoOrchestrator:
         return best_service, best_function, best_node, marginal_utility
 
     def _get_next_lighter_service(self, bid_bundle, consumptions_iterator, skip_services=set(),
-                                  blacklisted_nodes=set(), resource_bound=None):
+                                  blacklisted_nodes=set(), resource_bound=None, lighter_index=None):
         """
-
+        Finds the function:node with the lowest average consumption, among the ones consuming more than the
+        current implementation of their service.
         :param bid_bundle:
+        :param consumptions_iterator: for each service, the consumption of its current implementation
         :param skip_services:
         :param blacklisted_nodes:
-        :param resource_bound:
-        :return:
+        :param resource_bound: resources the consumption is compared to, if None the available resources
+        :param LighterServiceIndex lighter_index: the index of resource_bound, if already built
+        :return: service, function, node, marginal utility
         """
+        if lighter_index is None:
+            lighter_index = LighterServiceIndex(self.rap, self.rap.compiled.average_consumption(resource_bound),
+                                                self.service_bundle)
+        lighter_index.blacklist(blacklisted_nodes)
 
-        lighter_function = (None, None, None, None)
-        lighter_consumption = sys.maxsize
-
+        lighter = None
         for service in self.service_bundle:
             if service not in skip_services:
-                free_bid_bundle = {s: bid_bundle[s] for s in bid_bundle if s != service}
-                for function in self.rap.get_implementations_for_service(service.split('_', 1)[-1]):
-                    for node in [node for node in self.rap.nodes if node not in blacklisted_nodes]:
-                        function_average_consumption = self._get_function_average_consumption(function,
-                                                                                              node=node,
-                                                                                              resources=resource_bound)
-                        if lighter_consumption > function_average_consumption > consumptions_iterator[service]:
-                            lighter_consumption = function_average_consumption
-                            marginal_utility = self._marginal_utility(free_bid_bundle, service, function, node)
-                            lighter_function = (service, function, node, marginal_utility)
-        return lighter_function
+                candidate = lighter_index.next_lighter(service, consumptions_iterator[service])
+                # on equal consumption, the service coming first in the bundle is kept
+                if candidate is not None and (lighter is None or candidate[0] < lighter[0]):
+                    lighter = (candidate[0], service, candidate[1], candidate[2])
+
+        if lighter is None:
+            return None, None, None, None
+        # the marginal utility is needed just for the lighter one
+        consumption, service, function, node = lighter
+        free_bid_bundle = {s: bid_bundle[s] for s in bid_bundle if s != service}
+        return service, function, node, self._marginal_utility(free_bid_bundle, service, function, node)
 
     # Not used
     def _get_best_function_for_service(self, bid_bundle, service):
@@ -691,50 +935,84 @@ class SdoOrchestrator:
         :return dict[(str, str), float]: dict of (function, node), marginal utility
         """
         # search for functions
-        ranked_functions = dict()
-        for function in self.rap.get_implementations_for_service(service.split('_', 1)[-1]):
-            for node in [node for node in self.rap.nodes if node not in blacklisted_nodes]:
-                marginal_utility = self._marginal_utility(bid_bundle, service, function, node)
-                ranked_functions[(function, node)] = marginal_utility
-        return ranked_functions
+        candidates = [(function, node)
+                      for function in self.rap.get_implementations_for_service(service.split('_', 1)[-1])
+                      for node in self.rap.nodes if node not in blacklisted_nodes]
+        return dict(zip(candidates, self._marginal_utilities(bid_bundle, service, candidates)))
 
     def _marginal_utility(self, bid_bundle, service, function, node, service_specific=False):
         """
         Compute the marginal utility that sdo gains by adding given service:function:node to the bundle.
-        This function may depend by the particular SDO.
         :param bid_bundle: initial bundle
         :param str service: service to add to the bundle
         :param str function: function implementing the service to add to the bundle
         :param str node: node where the function will be placed
         :return: the marginal utility
         """
-        spu = configuration.SUBMODULAR_P_UTILITY
-        if not self.rap.check_function_implements_service(service.split('_', 1)[-1], function):
-            return 0
-        if configuration.PRIVATE_UTILITY == "SERVICE" or service_specific:
-            # currently a pseudo-randomized value is returned
-            return self._pseudo_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-        elif configuration.PRIVATE_UTILITY == "POWER-CONSUMPTION":
-            return self._power_consumption_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-        elif configuration.PRIVATE_UTILITY == "GREEDY":
-            return self._greed_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-        elif configuration.PRIVATE_UTILITY == "LOAD-BALANCE":
-            return self._load_balancer_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-        elif configuration.PRIVATE_UTILITY == "NODE-LOADING":
-            return self._node_loading_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-        elif configuration.PRIVATE_UTILITY == "BEST-FIT-POLICY":
-            # if self.sdo_name == 'sdo1' or self.sdo_name == 'sdo4' or self.sdo_name == 'sdo7' or self.sdo_name == 'sdo10' or self.sdo_name == 'sdo13' or self.sdo_name == 'sdo19':
-            #     return self._load_balancer_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-            # elif self.sdo_name == 'sdo8' or self.sdo_name == 'sdo11' or self.sdo_name == 'sdo12' or self.sdo_name == 'sdo15' or self.sdo_name == 'sdo16' or self.sdo_name == 'sdo18':
-            #     return self._node_loading_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-            if self.sdo_name == 'sdo1' or self.sdo_name == 'sdo2' or self.sdo_name == 'sdo4' or self.sdo_name == 'sdo5' or self.sdo_name == 'sdo10' or self.sdo_name == 'sdo11' or self.sdo_name == 'sdo13' or self.sdo_name == 'sdo14' or self.sdo_name == 'sdo15':
-                return self._load_balancer_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-            elif self.sdo_name == 'sdo12' or self.sdo_name == 'sdo13' or self.sdo_name == 'sdo17':
-                return self._node_loading_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-            else:
-                return self._greed_marginal_utility(bid_bundle, service, function, node, submodular=spu)
-        else:
-            return 0
+        return self._marginal_utilities(bid_bundle, service, [(function, node)], service_specific)[0]
+
+    def _marginal_utilities(self, bid_bundle, service, candidates, service_specific=False):
+        """
+        Compute the marginal utility that sdo gains by adding to the bundle each of the given function:node
+        implementing the service. Candidates are scored in a single call to the utility strategy.
+        Utilities are pure functions of the services, functions and nodes in the bundle (and of their order),
+        so they are cached on those, unless _utility_is_cacheable says otherwise.
+        :param bid_bundle: initial bundle
+        :param str service: service to add to the bundle
+        :param list of (str, str) candidates: function:node pairs
+        :param bool service_specific: if True, the service utility is used, whatever the private utility is
+        :return list of float: the marginal utility of each candidate
+        """
+        if not self._utility_is_cacheable():
+            return self._compute_marginal_utilities(bid_bundle, service, candidates, service_specific)
+
+        if self._utility_cache_problem is not self.rap.compiled:
+            # problem instance changed (e.g. available resources), cached utilities may be stale
+            self.utility_cache.clear()
+            self._utility_cache_problem = self.rap.compiled
+        # the utility strategy is bound for the whole life of the orchestrator, so it is not part of the key
+        prefix = tuple((s, bid_bundle[s]['function'], bid_bundle[s]['node'])
+                       for s in sorted(bid_bundle, key=lambda x: bid_bundle[x]['added_at']))
+        keys = [(prefix, service, function, node, service_specific) for function, node in candidates]
+        utilities = [self.utility_cache.get(key) for key in keys]
+        missing = [i for i, marginal_utility in enumerate(utilities) if marginal_utility is None]
+        if len(missing) > 0:
+            computed = self._compute_marginal_utilities(bid_bundle, service, [candidates[i] for i in missing],
+                                                        service_specific)
+            for i, marginal_utility in zip(missing, computed):
+                utilities[i] = marginal_utility
+                self.utility_cache.put(keys[i], marginal_utility)
+        return utilities
+
+    def _utility_is_cacheable(self):
+        """
+        Utilities reading external state (e.g. statistics files) must not be cached,
+        see UTILITY_READS_EXTERNAL_STATE.
+        :return bool: True if marginal utilities can be cached
+        """
+        return not self.UTILITY_READS_EXTERNAL_STATE and configuration.UTILITY_CACHE_SIZE > 0
+
+    def _compute_marginal_utilities(self, bid_bundle, service, candidates, service_specific=False):
+        """
+        Compute, with a single call to the utility strategy, the marginal utility of each of the given candidates.
+        Large batches are split among the worker processes, if any (see ParallelScorer).
+        :param bid_bundle: initial bundle
+        :param str service: service to add to the bundle
+        :param list of (str, str) candidates: function:node pairs
+        :param bool service_specific: if True, the service utility is used, whatever the private utility is
+        :return list of float: the marginal utility of each candidate
+        """
+        if self.parallel_scorer.accepts(candidates):
+            return self.parallel_scorer.score(bid_bundle, service, candidates, service_specific)
+        utility = self.service_utility if service_specific else self.utility
+        implemented = [self.rap.check_function_implements_service(service.split('_', 1)[-1], function)
+                       for function, node in candidates]
+        if all(implemented):
+            return utility.marginal_utilities(bid_bundle, service, candidates)
+        utilities = iter(utility.marginal_utilities(bid_bundle, service, [candidate for candidate, implements
+                                                                           in zip(candidates, implemented)
+                                                                           if implements]))
+        return [next(utilities) if implements else 0 for implements in implemented]
 
     def _pseudo_marginal_utility(self, bid_bundle, service, function, node, submodular=True):
         """
@@ -749,7 +1027,9 @@ class SdoOrchestrator:
         :param node:
         :return:
         """
-        logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
+        tracing = LoggingConfiguration.tracing()
+        if tracing:
+            logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
 
         # put a placeholder element just to avoid zip() complain
         bid_bundle['.'] = {'function': '.', 'added_at': 0}
@@ -762,19 +1042,22 @@ class SdoOrchestrator:
         taken_services = list(taken_services)[1:]
         taken_functions = list(taken_functions)[1:]
 
-        logging.debug("Services in bundle: " + pprint.pformat(taken_services))
-        logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
+        if tracing:
+            logging.debug("Services in bundle: " + pprint.pformat(taken_services))
+            logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
 
         # Average consumption of first function of the bundle bounds all the utilities
         first_function_consumption = self._get_function_average_consumption((taken_functions + [function])[0])
         # first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 40, 1, 54.598)
         first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 30, 1, 20.0855)
-        logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
+        if tracing:
+            logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
 
         if submodular:
             # bounds
             bounds = [((len(self.service_bundle)-x)/len(self.service_bundle)) for x in range(len(taken_services)+2)]
-            logging.debug("Bounds: " + pprint.pformat(bounds))
+            if tracing:
+                logging.debug("Bounds: " + pprint.pformat(bounds))
 
             # apply a transformation to the bounds (transformation remains the same for previous bound)
             taken_services.append(service)
@@ -782,14 +1065,17 @@ class SdoOrchestrator:
             transformed_bounds = list()
             for index, bound in enumerate(bounds):
                 transformation, params = self._get_transformation(taken_services[:index], taken_functions[:index])
-                logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
+                if tracing:
+                    logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
                 transformed_bound = transformation(bound, *params)
                 if index > 0:
                     transformed_bound = transformed_bound*transformed_bounds[index-1]
                 transformed_bounds.append(transformed_bound)
-            logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
             transformed_bounds = [int(x*100) for x in transformed_bounds]
-            logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
 
             # range
             inf = transformed_bounds[-1]
@@ -799,29 +1085,31 @@ class SdoOrchestrator:
         else:
             inf = 1
             sup = 100
-        logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
+        if tracing:
+            logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
 
         # calculate a pseudo-random normalized utility on 1. resource usage 2. bundle+node_name+services+functions
         function_consumption = self._get_function_average_consumption(function)
         # spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 40, 1, 54.598)
         spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 30, 1, 20.0855)  # [0.00, 0.20] +-0.05
-        digest = int(hashlib.sha256((reduce(lambda x, y: x + y, sorted([""]+taken_services)) +
-                                     reduce(lambda x, y: x + y, sorted([""]+taken_functions)) +
-                                     self.sdo_name).encode('utf-8')).hexdigest(), 16)
-        decimal_digest = digest/2**256
         # perturbation_factor = (0.3-(-0.3))*decimal_digest + (-0.3)
         perturbation_factor = 0
-        logging.debug("av_decimal_consumption: " + str(function_consumption) + " | decimal_digest: " + str(decimal_digest))
-        logging.debug("spreaded_consumption: " + str(spreaded_consumption))
-        logging.debug("perturbation_factor: " + str(perturbation_factor))
+        if tracing:
+            # the bundle digest is not used by the utility while there is no perturbation, it is just logged
+            decimal_digest = self.digest_cache.bundle_digest(taken_services, taken_functions)
+            logging.debug("av_decimal_consumption: " + str(function_consumption) + " | decimal_digest: " + str(decimal_digest))
+            logging.debug("spreaded_consumption: " + str(spreaded_consumption))
+            logging.debug("perturbation_factor: " + str(perturbation_factor))
         # transform the decimal consumption so that it is better spread on [0, 1]
         # normalized_value = (spread_consumption+decimal_digest)/2
         perturbated_value = spreaded_consumption+perturbation_factor
-        logging.debug("perturbated_value: " + str(perturbated_value))
+        if tracing:
+            logging.debug("perturbated_value: " + str(perturbated_value))
         # normalized_value = (perturbated_value+0.3)/1.6
         normalized_value = perturbated_value
 
-        logging.debug("normalized_value: " + str(normalized_value))
+        if tracing:
+            logging.debug("normalized_value: " + str(normalized_value))
 
         # scale utility according to first function
         # utility = normalized_value*first_function_spreaded_consumption
@@ -837,7 +1125,7 @@ class SdoOrchestrator:
         utility = normalized_value
 
         # apply node-based scaling
-        scaling_factor = int(hashlib.sha256((self.sdo_name + node + service).encode()).hexdigest(), 16) / 2 ** 256
+        scaling_factor = self.digest_cache.sdo_digest_of(node, service)
         if self.sdo_name == 'sdo1' or self.sdo_name == 'sdo4' or self.sdo_name == 'sdo7' or self.sdo_name == 'sdo15' or self.sdo_name == 'sdo16':
             # put a low node scaling for already used node (between 0.0 and 3)
             if len(taken_services) > 1 and node in [bid_bundle[s]['node'] for s in taken_services[:-1]]:
@@ -865,23 +1153,27 @@ class SdoOrchestrator:
             #if len(taken_services) > 1 and node in [bid_bundle[s]['node'] for s in taken_services[:-1]]:
             #
         utility = utility*scaling_factor
-        logging.debug("node-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("node-based scaled utility: " + str(utility))
 
         # apply a scaling (given for orchestrator)
-        scaling_factor = int(hashlib.sha256(self.sdo_name.encode('utf-8')).hexdigest(), 16)/2**256
+        scaling_factor = self.digest_cache.sdo_digest
         utility = utility*scaling_factor
-        logging.debug("sdo-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("sdo-based scaled utility: " + str(utility))
 
         utility = 1.043935 + (0.0002072756 - 1.043935)/(1 + (utility/0.1348168)**1.411127)
 
         # put the utility value between inf and sup
         utility = (sup - inf) * utility + inf
-        logging.debug("bounded utility: " + str(utility))
+        if tracing:
+            logging.debug("bounded utility: " + str(utility))
 
-        logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
-                      " ... taken services " + str(taken_services) + " ... \n" +
-                      " ... and functions " + str(taken_functions) + " ... \n" +
-                      " ... is: " + str(utility))
+        if tracing:
+            logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
+                          " ... taken services " + str(taken_services) + " ... \n" +
+                          " ... and functions " + str(taken_functions) + " ... \n" +
+                          " ... is: " + str(utility))
 
         if utility < 5:
             utility = 5
@@ -901,7 +1193,9 @@ class SdoOrchestrator:
         :param node:
         :return:
         """
-        logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
+        tracing = LoggingConfiguration.tracing()
+        if tracing:
+            logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
 
         # put a placeholder element just to avoid zip() complain
         bid_bundle['.'] = {'function': '.', 'added_at': 0}
@@ -913,19 +1207,22 @@ class SdoOrchestrator:
         taken_services = list(taken_services)[1:]
         taken_functions = list(taken_functions)[1:]
 
-        logging.debug("Services in bundle: " + pprint.pformat(taken_services))
-        logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
+        if tracing:
+            logging.debug("Services in bundle: " + pprint.pformat(taken_services))
+            logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
 
         # Average consumption of first function of the bundle bounds all the utilities
         first_function_consumption = self._get_function_average_consumption((taken_functions + [function])[0])
         # first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 40, 1, 54.598)
         first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 30, 1, 20.0855)
-        logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
+        if tracing:
+            logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
 
         if submodular:
             # bounds
             bounds = [((len(self.service_bundle)-x)/len(self.service_bundle)) for x in range(len(taken_services)+2)]
-            logging.debug("Bounds: " + pprint.pformat(bounds))
+            if tracing:
+                logging.debug("Bounds: " + pprint.pformat(bounds))
 
             # apply a transformation to the bounds (transformation remains the same for previous bound)
             taken_services.append(service)
@@ -933,14 +1230,17 @@ class SdoOrchestrator:
             transformed_bounds = list()
             for index, bound in enumerate(bounds):
                 transformation, params = self._get_transformation(taken_services[:index], taken_functions[:index])
-                logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
+                if tracing:
+                    logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
                 transformed_bound = transformation(bound, *params)
                 if index > 0:
                     transformed_bound = transformed_bound*transformed_bounds[index-1]
                 transformed_bounds.append(transformed_bound)
-            logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
             transformed_bounds = [int(x*100) for x in transformed_bounds]
-            logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
 
             # range
             inf = transformed_bounds[-1]
@@ -950,15 +1250,17 @@ class SdoOrchestrator:
         else:
             inf = 1
             sup = 100
-        logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
+        if tracing:
+            logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
 
         # calculate a pseudo-random normalized utility on 1. resource usage !(2. bundle+node_name+services+functions)
         function_consumption = self._get_function_average_consumption(function)
         # spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 40, 1, 54.598)
         spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 30, 1, 20.0855)  # [0.00, 0.20] +-0.05
 
-        logging.debug("av_decimal_consumption: " + str(function_consumption))
-        logging.debug("spreaded_consumption: " + str(spreaded_consumption))
+        if tracing:
+            logging.debug("av_decimal_consumption: " + str(function_consumption))
+            logging.debug("spreaded_consumption: " + str(spreaded_consumption))
 
         utility = 1 - spreaded_consumption
 
@@ -968,22 +1270,26 @@ class SdoOrchestrator:
         #if len(taken_services) > 1 and node not in [bid_bundle[s]['node'] for s in taken_services[:-1]]:
         #    scaling_factor = (0.1 - 0) * scaling_factor
         # utility = utility*scaling_factor
-        logging.debug("node-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("node-based scaled utility: " + str(utility))
 
         # apply a scaling (given for orchestrator)
         # scaling_factor = 0.5
         # scaling_factor = int(hashlib.sha256(("-" + self.sdo_name).encode('utf-8')).hexdigest(), 16)/2**256
         # utility = utility*scaling_factor
-        logging.debug("sdo-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("sdo-based scaled utility: " + str(utility))
 
         # put the utility value between inf and sup
         utility = (sup - inf) * utility + inf
-        logging.debug("bounded utility: " + str(utility))
-
-        logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
-                      " ... taken services " + str(taken_services) + " ... \n" +
-                      " ... and functions " + str(taken_functions) + " ... \n" +
-                      " ... is: " + str(utility))
+        if tracing:
+            logging.debug("bounded utility: " + str(utility))
+
+        if tracing:
+            logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
+                          " ... taken services " + str(taken_services) + " ... \n" +
+                          " ... and functions " + str(taken_functions) + " ... \n" +
+                          " ... is: " + str(utility))
         if utility < 5:
             utility = 5
         return utility
@@ -1001,7 +1307,9 @@ class SdoOrchestrator:
         :param node:
         :return:
         """
-        logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
+        tracing = LoggingConfiguration.tracing()
+        if tracing:
+            logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
 
         # put a placeholder element just to avoid zip() complain
         bid_bundle['.'] = {'function': '.', 'added_at': 0}
@@ -1013,19 +1321,22 @@ class SdoOrchestrator:
         taken_services = list(taken_services)[1:]
         taken_functions = list(taken_functions)[1:]
 
-        logging.debug("Services in bundle: " + pprint.pformat(taken_services))
-        logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
+        if tracing:
+            logging.debug("Services in bundle: " + pprint.pformat(taken_services))
+            logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
 
         # Average consumption of first function of the bundle bounds all the utilities
         first_function_consumption = self._get_function_average_consumption((taken_functions + [function])[0])
         # first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 40, 1, 54.598)
         first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 30, 1, 20.0855)
-        logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
+        if tracing:
+            logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
 
         if submodular:
             # bounds
             bounds = [((len(self.service_bundle)-x)/len(self.service_bundle)) for x in range(len(taken_services)+2)]
-            logging.debug("Bounds: " + pprint.pformat(bounds))
+            if tracing:
+                logging.debug("Bounds: " + pprint.pformat(bounds))
 
             # apply a transformation to the bounds (transformation remains the same for previous bound)
             taken_services.append(service)
@@ -1033,14 +1344,17 @@ class SdoOrchestrator:
             transformed_bounds = list()
             for index, bound in enumerate(bounds):
                 transformation, params = self._get_transformation(taken_services[:index], taken_functions[:index])
-                logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
+                if tracing:
+                    logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
                 transformed_bound = transformation(bound, *params)
                 if index > 0:
                     transformed_bound = transformed_bound*transformed_bounds[index-1]
                 transformed_bounds.append(transformed_bound)
-            logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
             transformed_bounds = [int(x*100) for x in transformed_bounds]
-            logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
 
             # range
             inf = transformed_bounds[-1]
@@ -1050,40 +1364,46 @@ class SdoOrchestrator:
         else:
             inf = 1
             sup = 100
-        logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
+        if tracing:
+            logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
 
         # calculate a pseudo-random normalized utility on 1. resource usage !(2. bundle+node_name+services+functions)
         function_consumption = self._get_function_average_consumption(function)
         # spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 40, 1, 54.598)
         spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 30, 1, 20.0855)  # [0.00, 0.20] +-0.05
 
-        logging.debug("av_decimal_consumption: " + str(function_consumption))
-        logging.debug("spreaded_consumption: " + str(spreaded_consumption))
+        if tracing:
+            logging.debug("av_decimal_consumption: " + str(function_consumption))
+            logging.debug("spreaded_consumption: " + str(spreaded_consumption))
 
         utility = spreaded_consumption
 
         # apply node-based scaling
         # scaling_factor = 0.5
-        scaling_factor = int(hashlib.sha256((self.sdo_name + node + service).encode()).hexdigest(), 16) / 2 ** 256
+        scaling_factor = self.digest_cache.sdo_digest_of(node, service)
         # if len(taken_services) > 1 and node not in [bid_bundle[s]['node'] for s in taken_services[:-1]]:
         #    scaling_factor = (0.1 - 0) * scaling_factor
         utility = utility*scaling_factor
-        logging.debug("node-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("node-based scaled utility: " + str(utility))
 
         # apply a scaling (given for orchestrator)
         # scaling_factor = 0.5
         # scaling_factor = int(hashlib.sha256(("--" + self.sdo_name).encode('utf-8')).hexdigest(), 16)/2**256
         # utility = utility*scaling_factor
-        logging.debug("sdo-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("sdo-based scaled utility: " + str(utility))
 
         # put the utility value between inf and sup
         utility = (sup - inf) * utility + inf
-        logging.debug("bounded utility: " + str(utility))
-
-        logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
-                      " ... taken services " + str(taken_services) + " ... \n" +
-                      " ... and functions " + str(taken_functions) + " ... \n" +
-                      " ... is: " + str(utility))
+        if tracing:
+            logging.debug("bounded utility: " + str(utility))
+
+        if tracing:
+            logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
+                          " ... taken services " + str(taken_services) + " ... \n" +
+                          " ... and functions " + str(taken_functions) + " ... \n" +
+                          " ... is: " + str(utility))
         if utility < 5:
             utility = 5
         return utility
@@ -1100,7 +1420,9 @@ class SdoOrchestrator:
         :param node:
         :return:
         """
-        logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
+        tracing = LoggingConfiguration.tracing()
+        if tracing:
+            logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
 
         # put a placeholder element just to avoid zip() complain
         bid_bundle['.'] = {'function': '.', 'added_at': 0}
@@ -1112,19 +1434,22 @@ class SdoOrchestrator:
         taken_services = list(taken_services)[1:]
         taken_functions = list(taken_functions)[1:]
 
-        logging.debug("Services in bundle: " + pprint.pformat(taken_services))
-        logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
+        if tracing:
+            logging.debug("Services in bundle: " + pprint.pformat(taken_services))
+            logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
 
         # Average consumption of first function of the bundle bounds all the utilities
         first_function_consumption = self._get_function_average_consumption((taken_functions + [function])[0])
         # first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 40, 1, 54.598)
         first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 30, 1, 20.0855)
-        logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
+        if tracing:
+            logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
 
         if submodular:
             # bounds
             bounds = [((len(self.service_bundle)-x)/len(self.service_bundle)) for x in range(len(taken_services)+2)]
-            logging.debug("Bounds: " + pprint.pformat(bounds))
+            if tracing:
+                logging.debug("Bounds: " + pprint.pformat(bounds))
 
             # apply a transformation to the bounds (transformation remains the same for previous bound)
             taken_services.append(service)
@@ -1132,14 +1457,17 @@ class SdoOrchestrator:
             transformed_bounds = list()
             for index, bound in enumerate(bounds):
                 transformation, params = self._get_transformation(taken_services[:index], taken_functions[:index])
-                logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
+                if tracing:
+                    logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
                 transformed_bound = transformation(bound, *params)
                 if index > 0:
                     transformed_bound = transformed_bound*transformed_bounds[index-1]
                 transformed_bounds.append(transformed_bound)
-            logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
             transformed_bounds = [int(x*100) for x in transformed_bounds]
-            logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
 
             # range
             inf = transformed_bounds[-1]
@@ -1149,40 +1477,46 @@ class SdoOrchestrator:
         else:
             inf = 1
             sup = 100
-        logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
+        if tracing:
+            logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
 
         # calculate a pseudo-random normalized utility on 1. resource usage !(2. bundle+node_name+services+functions)
         function_consumption = self._get_function_average_consumption(function)
         # spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 40, 1, 54.598)
         spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 30, 1, 20.0855)  # [0.00, 0.20] +-0.05
 
-        logging.debug("av_decimal_consumption: " + str(function_consumption))
-        logging.debug("spreaded_consumption: " + str(spreaded_consumption))
+        if tracing:
+            logging.debug("av_decimal_consumption: " + str(function_consumption))
+            logging.debug("spreaded_consumption: " + str(spreaded_consumption))
 
         utility = 0.5
 
         # apply node-based scaling
         # scaling_factor = 0.5
-        scaling_factor = int(hashlib.sha256((self.sdo_name + service + node).encode()).hexdigest(), 16) / 2 ** 256
+        scaling_factor = self.digest_cache.sdo_digest_of(service, node)
         if len(taken_services) > 1 and node in [bid_bundle[s]['node'] for s in taken_services[:-1]]:
             scaling_factor = (0.1 - 0) * scaling_factor
         utility = utility*scaling_factor
-        logging.debug("node-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("node-based scaled utility: " + str(utility))
 
         # apply a scaling (given for orchestrator)
         # scaling_factor = 0.5
         # scaling_factor = int(hashlib.sha256(("--" + self.sdo_name).encode('utf-8')).hexdigest(), 16)/2**256
         # utility = utility*scaling_factor
-        logging.debug("sdo-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("sdo-based scaled utility: " + str(utility))
 
         # put the utility value between inf and sup
         utility = (sup - inf) * utility + inf
-        logging.debug("bounded utility: " + str(utility))
-
-        logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
-                      " ... taken services " + str(taken_services) + " ... \n" +
-                      " ... and functions " + str(taken_functions) + " ... \n" +
-                      " ... is: " + str(utility))
+        if tracing:
+            logging.debug("bounded utility: " + str(utility))
+
+        if tracing:
+            logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
+                          " ... taken services " + str(taken_services) + " ... \n" +
+                          " ... and functions " + str(taken_functions) + " ... \n" +
+                          " ... is: " + str(utility))
         if utility < 5:
             utility = 5
         return utility
@@ -1199,7 +1533,9 @@ class SdoOrchestrator:
         :param node:
         :return:
         """
-        logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
+        tracing = LoggingConfiguration.tracing()
+        if tracing:
+            logging.debug(" - Getting utility for function '" + function + "' on service '" + service + "'")
 
         # put a placeholder element just to avoid zip() complain
         bid_bundle['.'] = {'function': '.', 'added_at': 0}
@@ -1211,19 +1547,22 @@ class SdoOrchestrator:
         taken_services = list(taken_services)[1:]
         taken_functions = list(taken_functions)[1:]
 
-        logging.debug("Services in bundle: " + pprint.pformat(taken_services))
-        logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
+        if tracing:
+            logging.debug("Services in bundle: " + pprint.pformat(taken_services))
+            logging.debug("Functions in bundle: " + pprint.pformat(taken_functions))
 
         # Average consumption of first function of the bundle bounds all the utilities
         first_function_consumption = self._get_function_average_consumption((taken_functions + [function])[0])
         # first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 40, 1, 54.598)
         first_function_spreaded_consumption = self._gen_log_func(first_function_consumption, 0, 1, 30, 1, 20.0855)
-        logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
+        if tracing:
+            logging.debug("First function scalar: " + str(first_function_spreaded_consumption))
 
         if submodular:
             # bounds
             bounds = [((len(self.service_bundle)-x)/len(self.service_bundle)) for x in range(len(taken_services)+2)]
-            logging.debug("Bounds: " + pprint.pformat(bounds))
+            if tracing:
+                logging.debug("Bounds: " + pprint.pformat(bounds))
 
             # apply a transformation to the bounds (transformation remains the same for previous bound)
             taken_services.append(service)
@@ -1231,14 +1570,17 @@ class SdoOrchestrator:
             transformed_bounds = list()
             for index, bound in enumerate(bounds):
                 transformation, params = self._get_transformation(taken_services[:index], taken_functions[:index])
-                logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
+                if tracing:
+                    logging.debug("Transformation: " + str(transformation) + ", " + str(bound) + ", " + str(params))
                 transformed_bound = transformation(bound, *params)
                 if index > 0:
                     transformed_bound = transformed_bound*transformed_bounds[index-1]
                 transformed_bounds.append(transformed_bound)
-            logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Transformed bounds: " + pprint.pformat(transformed_bounds))
             transformed_bounds = [int(x*100) for x in transformed_bounds]
-            logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
+            if tracing:
+                logging.debug("Final bounds: " + pprint.pformat(transformed_bounds))
 
             # range
             inf = transformed_bounds[-1]
@@ -1248,40 +1590,46 @@ class SdoOrchestrator:
         else:
             inf = 1
             sup = 100
-        logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
+        if tracing:
+            logging.debug("inf: " + str(inf) + " | sup: " + str(sup))
 
         # calculate a pseudo-random normalized utility on 1. resource usage !(2. bundle+node_name+services+functions)
         function_consumption = self._get_function_average_consumption(function)
         # spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 40, 1, 54.598)
         spreaded_consumption = self._gen_log_func(function_consumption, 0, 1, 30, 1, 20.0855)  # [0.00, 0.20] +-0.05
 
-        logging.debug("av_decimal_consumption: " + str(function_consumption))
-        logging.debug("spreaded_consumption: " + str(spreaded_consumption))
+        if tracing:
+            logging.debug("av_decimal_consumption: " + str(function_consumption))
+            logging.debug("spreaded_consumption: " + str(spreaded_consumption))
 
         utility = 0.5
 
         # apply node-based scaling
         # scaling_factor = 0.5
-        scaling_factor = int(hashlib.sha256((self.sdo_name + service + node).encode()).hexdigest(), 16) / 2 ** 256
+        scaling_factor = self.digest_cache.sdo_digest_of(service, node)
         if len(taken_services) > 1 and node not in [bid_bundle[s]['node'] for s in taken_services[:-1]]:
             scaling_factor = (0.1 - 0) * scaling_factor
         utility = utility*scaling_factor
-        logging.debug("node-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("node-based scaled utility: " + str(utility))
 
         # apply a scaling (given for orchestrator)
         # scaling_factor = 0.5
         # scaling_factor = int(hashlib.sha256(("--" + self.sdo_name).encode('utf-8')).hexdigest(), 16)/2**256
         # utility = utility*scaling_factor
-        logging.debug("sdo-based scaled utility: " + str(utility))
+        if tracing:
+            logging.debug("sdo-based scaled utility: " + str(utility))
 
         # put the utility value between inf and sup
         utility = (sup - inf) * utility + inf
-        logging.debug("bounded utility: " + str(utility))
-
-        logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
-                      " ... taken services " + str(taken_services) + " ... \n" +
-                      " ... and functions " + str(taken_functions) + " ... \n" +
-                      " ... is: " + str(utility))
+        if tracing:
+            logging.debug("bounded utility: " + str(utility))
+
+        if tracing:
+            logging.debug("marginal_utility for function '" + function + "' on service '" + service + " ... \n" +
+                          " ... taken services " + str(taken_services) + " ... \n" +
+                          " ... and functions " + str(taken_functions) + " ... \n" +
+                          " ... is: " + str(utility))
         if utility < 5:
             utility = 5
         return utility
@@ -1293,12 +1641,7 @@ class SdoOrchestrator:
         :param functions:
         :return:
         """
-        services = [""] + services
-        functions = [""] + functions
-        pr_1 = int(hashlib.sha256(reduce(lambda x, y: x + y, services+functions).encode('utf-8')).hexdigest(), 16)
-        pr_2 = int(hashlib.sha256(reduce(lambda x, y: x + y, functions+services).encode('utf-8')).hexdigest(), 16)
-        normalized_pr1 = pr_1/2**256
-        normalized_pr2 = pr_2/2**256
+        normalized_pr1, normalized_pr2 = self.digest_cache.transformation_digests(services, functions)
         # bits_pr = bin(pr_2)[2:]
 
         # choose transformation
@@ -1357,37 +1700,15 @@ class SdoOrchestrator:
 
     def _get_function_average_consumption(self, function, node=None, resources=None):
         """
-
+        Looks the consumption up in the table of the compiled problem (see AverageConsumptionTable).
+        With a resource bound the table is built on the fly, so repeated lookups should go through
+        rap.compiled.average_consumption(resources).
         :param function:
+        :param node: if None, the consumption on the average node
+        :param resources: resource bound the consumption is compared to, if None the available resources
         :return: decimal average consumption
         """
-        consumption_percentages = list()
-
-        if node is None and resources is None:
-            total_resources_amount = self.rap.get_total_resources_amount()
-            nodes_number = len(self.rap.nodes)
-        elif node is not None and resources is None:
-            total_resources_amount = self.rap.available_resources[node]
-            nodes_number = 1
-        elif node is None and resources is not None:
-            total_resources_amount = {r: sum([resources[n][r] for n in self.rap.nodes]) for r in self.rap.resources}
-            nodes_number = len(self.rap.nodes)
-        else:
-            total_resources_amount = resources[node]
-            nodes_number = 1
-
-        average_node_resources = {}
-        for resource in self.rap.resources:
-            average_node_resources[resource] = total_resources_amount[resource]/nodes_number
-        for resource in self.rap.resources:
-            consumption = self.rap.get_function_resource_consumption(function)[resource]
-            total = average_node_resources[resource]
-            if total == 0:
-                return sys.maxsize
-            consumption_percentages.append(consumption / total)
-
-        av_decimal_consumption = sum(consumption_percentages) / float(len(consumption_percentages))
-        return av_decimal_consumption
+        return self.rap.compiled.average_consumption(resources).get(function, node)
 
     def _build_assignment_from_bid_bundle(self, bid_bundle):
         """
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+
+class UtilityCache:
+    """
+    Bounded LRU cache of marginal utilities.
+    Keys must identify everything the utility depends on, i.e. the ordered bundle prefix and the candidate
+    service:function:node (see SdoOrchestrator._marginal_utility).
+    """
+
+    def __init__(self, max_size):
+        """
+
+        :param int max_size: maximum number of cached utilities, if not positive nothing is cached
+        """
+        self.max_size = max_size
+        self._utilities = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+
+        :param tuple key:
+        :return: the cached utility, or None if not cached
+        """
+        utility = self._utilities.get(key)
+        if utility is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._utilities.move_to_end(key)
+        return utility
+
+    def put(self, key, utility):
+        """
+
+        :param tuple key:
+        :param float utility:
+        """
+        if self.max_size <= 0:
+            return
+        self._utilities[key] = utility
+        self._utilities.move_to_end(key)
+        if len(self._utilities) > self.max_size:
+            # evict the least recently used
+            self._utilities.popitem(last=False)
+
+    def clear(self):
+        self._utilities.clear()
+
+    def __len__(self):
+        return len(self._utilities)
@@ -0,0 +1,164 @@
+import logging
+
+
+class UtilityStrategy:
+    """
+    Private utility of an sdo, bound to its orchestrator when the orchestrator is built.
+    Subclasses implement marginal_utility. marginal_utilities scores, in one call, a batch of function:node
+    candidates for the same service: strategies able to vectorize the computation should override it.
+    """
+
+    def __init__(self, orchestrator, submodular):
+        """
+
+        :param orchestrator: the orchestrator of the sdo
+        :param bool submodular: True if utilities of the services picked in sequence must decrease
+        :type orchestrator: SdoOrchestrator
+        """
+        self.orchestrator = orchestrator
+        self.submodular = submodular
+
+    def marginal_utility(self, bid_bundle, service, function, node):
+        """
+
+        :param bid_bundle: initial bundle
+        :param str service: service to add to the bundle
+        :param str function: function implementing the service to add to the bundle
+        :param str node: node where the function will be placed
+        :return: the marginal utility
+        """
+        raise NotImplementedError()
+
+    def marginal_utilities(self, bid_bundle, service, candidates):
+        """
+
+        :param bid_bundle: initial bundle
+        :param str service: service to add to the bundle
+        :param list of (str, str) candidates: function:node pairs implementing the service
+        :return list of float: the marginal utility of each candidate
+        """
+        return [self.marginal_utility(bid_bundle, service, function, node) for function, node in candidates]
+
+
+class MethodUtility(UtilityStrategy):
+    """
+    Utility computed by a method of the orchestrator, e.g. SdoOrchestrator._greed_marginal_utility
+    """
+
+    def __init__(self, orchestrator, submodular, method_name):
+        """
+
+        :param orchestrator: the orchestrator of the sdo
+        :param bool submodular:
+        :param str method_name: name of a method (bid_bundle, service, function, node, submodular)
+        :type orchestrator: SdoOrchestrator
+        """
+        super().__init__(orchestrator, submodular)
+        self.method_name = method_name
+        self._method = getattr(orchestrator, method_name)
+
+    def marginal_utility(self, bid_bundle, service, function, node):
+        return self._method(bid_bundle, service, function, node, submodular=self.submodular)
+
+
+class NullUtility(UtilityStrategy):
+    """
+    Utility of a private utility that is not registered
+    """
+
+    def marginal_utility(self, bid_bundle, service, function, node):
+        return 0
+
+    def marginal_utilities(self, bid_bundle, service, candidates):
+        return [0]*len(candidates)
+
+
+def method_utility(method_name):
+    """
+
+    :param str method_name: name of a method of the orchestrator (see MethodUtility)
+    :return: a factory of MethodUtility, to register
+    """
+    return lambda orchestrator, submodular: MethodUtility(orchestrator, submodular, method_name)
+
+
+class UtilityRegistry:
+    """
+    Utility strategies by private utility name (see private_utility in the configuration).
+    A factory is a function (orchestrator, submodular) returning the UtilityStrategy of that orchestrator.
+    Orchestrators of other use cases register their utilities on a copy of the registry.
+    """
+
+    def __init__(self, factories=None):
+        """
+
+        :param dict[str, function] factories: initial factories, by name
+        """
+        self._factories = dict(factories or {})
+
+    def register(self, name, factory):
+        """
+
+        :param str name: private utility name
+        :param factory: function (orchestrator, submodular) returning a UtilityStrategy
+        """
+        self._factories[name] = factory
+
+    def copy(self):
+        """
+
+        :return UtilityRegistry: a registry with the same factories, that can be extended independently
+        """
+        return UtilityRegistry(self._factories)
+
+    def bind(self, name, orchestrator, submodular):
+        """
+
+        :param str name: private utility name
+        :param orchestrator: the orchestrator of the sdo
+        :param bool submodular:
+        :return UtilityStrategy: the strategy of the given orchestrator, NullUtility if name is not registered
+        :type orchestrator: SdoOrchestrator
+        """
+        factory = self._factories.get(name)
+        if factory is None:
+            logging.warning("Private utility '" + name + "' is not registered, all utilities will be null")
+            return NullUtility(orchestrator, submodular)
+        return factory(orchestrator, submodular)
+
+    def __contains__(self, name):
+        return name in self._factories
+
+
+BEST_FIT_LOAD_BALANCE_SDOS = frozenset(['sdo1', 'sdo2', 'sdo4', 'sdo5', 'sdo10', 'sdo11', 'sdo13', 'sdo14', 'sdo15'])
+""" With BEST-FIT-POLICY, sdos using the load balancer utility """
+BEST_FIT_NODE_LOADING_SDOS = frozenset(['sdo12', 'sdo17'])
+""" With BEST-FIT-POLICY, sdos using the node loading utility (the others use the greedy one) """
+
+
+def best_fit_policy_utility(orchestrator, submodular):
+    """
+    Mixes sdos with different policies, chosen by sdo name
+    :param orchestrator:
+    :param bool submodular:
+    :return MethodUtility:
+    :type orchestrator: SdoOrchestrator
+    """
+    if orchestrator.sdo_name in BEST_FIT_LOAD_BALANCE_SDOS:
+        method_name = '_load_balancer_marginal_utility'
+    elif orchestrator.sdo_name in BEST_FIT_NODE_LOADING_SDOS:
+        method_name = '_node_loading_marginal_utility'
+    else:
+        method_name = '_greed_marginal_utility'
+    return MethodUtility(orchestrator, submodular, method_name)
+
+
+UTILITIES = UtilityRegistry({
+    "SERVICE": method_utility('_pseudo_marginal_utility'),
+    "POWER-CONSUMPTION": method_utility('_power_consumption_marginal_utility'),
+    "GREEDY": method_utility('_greed_marginal_utility'),
+    "LOAD-BALANCE": method_utility('_load_balancer_marginal_utility'),
+    "NODE-LOADING": method_utility('_node_loading_marginal_utility'),
+    "BEST-FIT-POLICY": best_fit_policy_utility,
+})
+""" Utilities of the SdoOrchestrator """
@@ -0,0 +1,86 @@
+import hashlib
+
+
+class WinnerSet(frozenset):
+    """
+    Immutable set of the sdos winning a node, carrying an order-independent fingerprint of its members (the xor of
+    a 64 bit digest of each name), computed once when the set is built. Sets with different fingerprints are
+    different, so most comparisons between winner sets do not look at their members.
+    Fingerprints are not sent along with the winners: receivers compute them on the members they got.
+    Winners are changed by building a new set (see with_winner and without_winner).
+    """
+
+    _member_digests = dict()
+    """ Digest of each sdo name seen so far """
+
+    def __new__(cls, winners=(), fingerprint=None):
+        """
+
+        :param iterable of str winners: winners, iterated in election order
+        :param int fingerprint: fingerprint of the winners, if already known (e.g. derived from the one of an other set)
+        """
+        winner_set = super().__new__(cls, winners)
+        winner_set.fingerprint = fingerprint if fingerprint is not None else cls._fingerprint(winner_set)
+        return winner_set
+
+    @classmethod
+    def of(cls, winners):
+        """
+
+        :param iterable of str winners:
+        :return WinnerSet: winners, as a WinnerSet
+        """
+        if isinstance(winners, WinnerSet):
+            return winners
+        return cls(winners)
+
+    @classmethod
+    def _fingerprint(cls, winners):
+        """
+
+        :param iterable of str winners:
+        :return int:
+        """
+        fingerprint = 0
+        for sdo in winners:
+            digest = cls._member_digests.get(sdo)
+            if digest is None:
+                digest = int.from_bytes(hashlib.blake2b(sdo.encode(), digest_size=8).digest(), 'big')
+                cls._member_digests[sdo] = digest
+            fingerprint ^= digest
+        return fingerprint
+
+    def with_winner(self, sdo):
+        """
+
+        :param str sdo:
+        :return WinnerSet: these winners plus the given sdo
+        """
+        if sdo in self:
+            return self
+        return WinnerSet(list(self) + [sdo], fingerprint=self.fingerprint ^ self._fingerprint([sdo]))
+
+    def without_winner(self, sdo):
+        """
+
+        :param str sdo:
+        :return WinnerSet: these winners but the given sdo
+        """
+        if sdo not in self:
+            return self
+        return WinnerSet([winner for winner in self if winner != sdo],
+                         fingerprint=self.fingerprint ^ self._fingerprint([sdo]))
+
+    def __eq__(self, other):
+        if isinstance(other, WinnerSet) and self.fingerprint != other.fingerprint:
+            return False
+        return frozenset.__eq__(self, other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = frozenset.__hash__
+
+    def __repr__(self):
+        return "WinnerSet(" + repr(sorted(self)) + ")"
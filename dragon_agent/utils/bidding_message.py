@@ -2,31 +2,57 @@ import pprint
 
 import time
 
+from dragon_agent.orchestration.winner_set import WinnerSet
+
 
 class BiddingMessage:
 
-    def __init__(self, sender=None, winners=None, bidding_data=None):
+    def __init__(self, sender=None, winners=None, bidding_data=None, sequence=None, delta=False, removed=None,
+                 resync=False):
         """
 
         :param str sender:
-        :param dict[str, set of str] winners:
+        :param dict[str, WinnerSet] winners:
         :param dict[str, dict[str, union[int, dict, float]]] bidding_data:
+        :param int sequence: position of the message among the ones sent to the receiver, None if not synchronized
+        :param bool delta: if True, winners and bidding data hold just what changed since the previous message
+        :param dict[str, list of str] removed: for a delta, the sdos whose bid has been removed from each node
+        :param bool resync: if True, the sender asks the receiver for a full snapshot (see DeltaSynchronizer)
         """
         self.sender = sender
         self.winners = winners
         self.bidding_data = bidding_data
         self.timestamp = time.time()
+        self.sequence = sequence
+        self.delta = delta
+        self.removed = removed if removed is not None else dict()
+        self.resync = resync
 
     def to_dict(self):
         bidding_message_dict = dict()
         bidding_message_dict["sender"] = self.sender
         bidding_message_dict["winners"] = {node: list(self.winners[node]) for node in self.winners}
-        bidding_message_dict["bidding_data"] = self.bidding_data
+        if hasattr(self.bidding_data, 'to_dict'):
+            # e.g. DenseBiddingData
+            bidding_message_dict["bidding_data"] = self.bidding_data.to_dict()
+        else:
+            bidding_message_dict["bidding_data"] = self.bidding_data
         bidding_message_dict["timestamp"] = self.timestamp
+        if self.sequence is not None:
+            bidding_message_dict["sequence"] = self.sequence
+            bidding_message_dict["delta"] = self.delta
+            bidding_message_dict["removed"] = {node: list(self.removed[node]) for node in self.removed}
+            bidding_message_dict["resync"] = self.resync
         return bidding_message_dict
 
     def parse_dict(self, bidding_message_dict):
         self.sender = bidding_message_dict["sender"]
-        self.winners = {node: set(bidding_message_dict["winners"][node]) for node in bidding_message_dict["winners"]}
+        # fingerprints are computed on the received winners, a wrong one would make equal sets look different
+        self.winners = {node: WinnerSet(bidding_message_dict["winners"][node])
+                        for node in bidding_message_dict["winners"]}
         self.bidding_data = bidding_message_dict["bidding_data"]
         self.timestamp = bidding_message_dict["timestamp"]
+        self.sequence = bidding_message_dict.get("sequence")
+        self.delta = bidding_message_dict.get("delta", False)
+        self.removed = bidding_message_dict.get("removed", dict())
+        self.resync = bidding_message_dict.get("resync", False)
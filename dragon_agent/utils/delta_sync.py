@@ -0,0 +1,179 @@
+import logging
+from threading import Lock
+
+from dragon_agent.utils.bidding_message import BiddingMessage
+
+
+class DeltaSynchronizer:
+    """
+    Delta synchronization of the bidding messages exchanged with the neighbors.
+    For each neighbor, keeps the sequence number and the state (winners and bids) of the last message sent to it,
+    so that the following message carries just the node winners and the (node, sdo) bids changed since then.
+    The first message sent to a neighbor, and the one following its request, is a full snapshot.
+    For each sender, keeps a mirror of its state, to which the received deltas are applied in sequence order.
+    A delta that does not follow the last one applied (e.g. this sdo restarted) is dropped and a snapshot is asked to
+    the sender (see resync_requests); messages without sequence number carry the whole state and are taken as they are.
+    Bid entries are never edited in place (see NodeBiddingData), so states and mirrors share them.
+    """
+
+    def __init__(self, sdo_name):
+        """
+
+        :param str sdo_name: the sdo sending and receiving the messages
+        """
+        self.sdo_name = sdo_name
+
+        self._sent = dict()
+        """ For each neighbor, sequence number and state of the last message sent to it """
+        self._mirrors = dict()
+        """ For each sender, sequence number and state of the last message applied """
+        self._out_of_sync = set()
+        """ Senders whose mirror missed some delta, waiting for a snapshot """
+
+        # requests are recorded by the receiving thread and served by the sending one
+        self._lock = Lock()
+        self._snapshot_requests = set()
+        """ Neighbors that asked for a snapshot """
+        self._resync_requests = set()
+        """ Senders a snapshot has to be asked to """
+
+    def messages(self, neighbors, winners, bidding_data, resync=False):
+        """
+        Builds the messages carrying the current state to the neighbors, and records it as sent to them
+        :param iterable of str neighbors:
+        :param dict[str, WinnerSet] winners: current winners of each node
+        :param bidding_data: current bids placed on each node
+        :param bool resync: if True, messages ask the neighbors for a snapshot
+        :return dict[str, BiddingMessage]: the message for each neighbor
+        """
+        state = self._capture(winners, bidding_data)
+        with self._lock:
+            snapshot_requests = self._snapshot_requests.intersection(neighbors)
+            self._snapshot_requests -= snapshot_requests
+
+        # most neighbors have been sent the same previous state, so its delta is computed once
+        deltas = dict()
+        messages = dict()
+        for neighbor in neighbors:
+            sent = self._sent.get(neighbor)
+            sequence = sent[0] + 1 if sent is not None else 0
+            if sent is None or neighbor in snapshot_requests:
+                message = BiddingMessage(sender=self.sdo_name, winners=state[0], bidding_data=state[1],
+                                         sequence=sequence, resync=resync)
+            else:
+                if id(sent[1]) not in deltas:
+                    deltas[id(sent[1])] = self._delta(sent[1], state)
+                changed_winners, changed_bids, removed = deltas[id(sent[1])]
+                message = BiddingMessage(sender=self.sdo_name, winners=changed_winners, bidding_data=changed_bids,
+                                         sequence=sequence, delta=True, removed=removed, resync=resync)
+            self._sent[neighbor] = (sequence, state)
+            messages[neighbor] = message
+        return messages
+
+    @staticmethod
+    def _capture(winners, bidding_data):
+        """
+
+        :param dict[str, WinnerSet] winners:
+        :param bidding_data:
+        :return: a copy of winners and bidding data that is not changed by later bids (bid entries are shared)
+        """
+        return dict(winners), {node: dict(bidding_data[node]) for node in bidding_data}
+
+    @staticmethod
+    def _delta(previous_state, state):
+        """
+
+        :param previous_state: winners and bidding data, as captured
+        :param state: winners and bidding data, as captured
+        :return: the winners and the bids that changed in state, and the sdos whose bid has been removed, by node
+        """
+        previous_winners, previous_bidding_data = previous_state
+        winners, bidding_data = state
+        changed_winners = {node: winners[node] for node in winners if previous_winners.get(node) != winners[node]}
+        changed_bids = dict()
+        removed = dict()
+        for node, node_bidding_data in bidding_data.items():
+            previous_node_bidding_data = previous_bidding_data.get(node, dict())
+            changed_node_bids = {sdo: bid for sdo, bid in node_bidding_data.items()
+                                 if previous_node_bidding_data.get(sdo) is not bid
+                                 and previous_node_bidding_data.get(sdo) != bid}
+            if len(changed_node_bids) > 0:
+                changed_bids[node] = changed_node_bids
+            removed_sdos = [sdo for sdo in previous_node_bidding_data if sdo not in node_bidding_data]
+            if len(removed_sdos) > 0:
+                removed[node] = removed_sdos
+        return changed_winners, changed_bids, removed
+
+    def receive(self, message):
+        """
+        Applies a received message to the mirror of its sender
+        :param BiddingMessage message:
+        :return BiddingMessage: a message with the whole state of the sender, None if the message cannot be applied
+        """
+        sender = message.sender
+        if message.resync:
+            with self._lock:
+                self._snapshot_requests.add(sender)
+        if message.sequence is None:
+            # not synchronized, the message carries the whole state
+            self._mirrors.pop(sender, None)
+            return message
+
+        if not message.delta:
+            winners = dict(message.winners)
+            bidding_data = message.bidding_data
+            self._out_of_sync.discard(sender)
+        else:
+            mirror = self._mirrors.get(sender)
+            if mirror is None or message.sequence != mirror[0] + 1:
+                # older messages are duplicates, newer ones mean some message has been missed
+                if (mirror is None or message.sequence > mirror[0] + 1) and sender not in self._out_of_sync:
+                    logging.warning("Missed some message from '" + sender + "' (received " + str(message.sequence) +
+                                    "), asking a snapshot")
+                    self._out_of_sync.add(sender)
+                    with self._lock:
+                        self._resync_requests.add(sender)
+                return None
+            _, mirror_winners, mirror_bidding_data = mirror
+            winners = dict(mirror_winners)
+            winners.update(message.winners)
+            # changed nodes get a new table, the ones of previous messages are left as they are
+            bidding_data = dict(mirror_bidding_data)
+            for node in set(message.bidding_data).union(message.removed):
+                node_bidding_data = dict(bidding_data.get(node, dict()))
+                node_bidding_data.update(message.bidding_data.get(node, dict()))
+                for sdo in message.removed.get(node, ()):
+                    node_bidding_data.pop(sdo, None)
+                bidding_data[node] = node_bidding_data
+        self._mirrors[sender] = (message.sequence, winners, bidding_data)
+
+        full_message = BiddingMessage(sender=sender, winners=winners, bidding_data=bidding_data,
+                                      sequence=message.sequence)
+        full_message.timestamp = message.timestamp
+        return full_message
+
+    def resync_requests(self):
+        """
+
+        :return set of str: the senders a snapshot has to be asked to, since the last call
+        """
+        with self._lock:
+            requests = self._resync_requests
+            self._resync_requests = set()
+        return requests
+
+    def snapshot_requests(self):
+        """
+
+        :return set of str: the neighbors that asked for a snapshot that has not been sent yet
+        """
+        with self._lock:
+            return set(self._snapshot_requests)
+
+    def forget(self, neighbor):
+        """
+        Drops what has been sent to the neighbor, so that it is sent a snapshot next (e.g. on reconnection)
+        :param str neighbor:
+        """
+        self._sent.pop(neighbor, None)
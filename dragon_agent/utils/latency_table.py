@@ -0,0 +1,87 @@
+import heapq
+
+
+class LatencyTable:
+    """
+    All-pairs shortest latencies of a topology given as links {"node_a:node_b": latency}.
+    Links are directed: a bidirectional link appears twice.
+    Shortest paths are computed once, with a Dijkstra from each node, so that lookups take constant time.
+    Among paths with the same latency, the one with fewer hops is taken (then the first in node name order).
+    """
+
+    def __init__(self, topology):
+        """
+
+        :param dict[str, int] topology: latency of each link "node_a:node_b"
+        """
+        self.topology = topology
+
+        self._links = dict()
+        """ For each node, the latency towards each of its neighbors """
+        for link, latency in topology.items():
+            src, dst = link.split(':')
+            self._links.setdefault(src, dict())[dst] = latency
+            self._links.setdefault(dst, dict())
+
+        self._latencies = dict()
+        """ For each node, the latency towards each reachable node """
+        self._predecessors = dict()
+        """ For each node, the previous hop on the shortest path towards each reachable node """
+        for node in sorted(self._links):
+            self._latencies[node], self._predecessors[node] = self._dijkstra(node)
+
+    def _dijkstra(self, source):
+        """
+
+        :param str source:
+        :return: latencies and predecessors on the shortest paths from source
+        """
+        latencies = {source: 0}
+        predecessors = {source: None}
+        hops = {source: 0}
+        heap = [(0, 0, source)]
+        while len(heap) > 0:
+            latency, hop, node = heapq.heappop(heap)
+            if (latency, hop) > (latencies[node], hops[node]):
+                # stale entry
+                continue
+            for neighbor in sorted(self._links[node]):
+                candidate = (latency + self._links[node][neighbor], hop + 1)
+                if neighbor not in latencies or candidate < (latencies[neighbor], hops[neighbor]):
+                    latencies[neighbor], hops[neighbor] = candidate
+                    predecessors[neighbor] = node
+                    heapq.heappush(heap, (candidate[0], candidate[1], neighbor))
+        return latencies, predecessors
+
+    def latency(self, node_a, node_b):
+        """
+
+        :param str node_a:
+        :param str node_b:
+        :return: latency of the shortest path from node_a to node_b, 0 if they are the same node
+        :raise ValueError: if node_b cannot be reached from node_a
+        """
+        if node_a == node_b:
+            return 0
+        latencies = self._latencies.get(node_a, {})
+        if node_b not in latencies:
+            raise ValueError("no path from '" + node_a + "' to '" + node_b + "'")
+        return latencies[node_b]
+
+    def path(self, node_a, node_b):
+        """
+
+        :param str node_a:
+        :param str node_b:
+        :return list of str: nodes of the shortest path, node_a and node_b included, empty if they are the same node
+        :raise ValueError: if node_b cannot be reached from node_a
+        """
+        if node_a == node_b:
+            return []
+        predecessors = self._predecessors.get(node_a, {})
+        if node_b not in predecessors:
+            raise ValueError("no path from '" + node_a + "' to '" + node_b + "'")
+        path = [node_b]
+        while path[-1] != node_a:
+            path.append(predecessors[path[-1]])
+        return list(reversed(path))
@@ -0,0 +1,216 @@
+import hashlib
+import struct
+
+import numpy as np
+
+from dragon_agent.orchestration.winner_set import WinnerSet
+from dragon_agent.utils.bidding_message import BiddingMessage
+
+
+class BiddingMessageCodec:
+    """
+    Binary wire format of BiddingMessage, alternative to the JSON one.
+    Names of sdos, nodes and resources are replaced by their index in the instance of the problem, so both ends must
+    share the same instance: the header carries a fingerprint of the names, and messages built on a different instance
+    are refused. Layout (little endian):
+     - header: magic, version, flags, number of nodes, sdos and resources, instance fingerprint, sender index,
+       message timestamp;
+     - if the SEQUENCED flag is set, the sequence number (uint64);
+     - winners: bit matrix nodes x sdos, preceded, if the DELTA flag is set, by a bit mask of the nodes whose winners
+       are sent;
+     - bidding data: bit matrix nodes x sdos of the entries present, followed, if the DELTA flag is set, by a bit
+       matrix of the entries removed, then, for each present entry (in node, sdo order), the bid (float64), the
+       consumption of each resource (int64, float64 if the FLOAT_CONSUMPTION flag is set) and the timestamp (float64).
+    Binary messages start with MAGIC, so receivers can tell them from JSON ones (see Messaging).
+    """
+
+    MAGIC = b'DRBM'
+    VERSION = 1
+
+    FLOAT_CONSUMPTION = 1
+    """ Flag set if some consumption is not integer """
+    SEQUENCED = 2
+    """ Flag set if the message carries a sequence number (see DeltaSynchronizer) """
+    DELTA = 4
+    """ Flag set if the message holds just what changed since the previous one """
+    RESYNC = 8
+    """ Flag set if the sender asks for a full snapshot """
+
+    _HEADER = struct.Struct('<4sBBIIIQId')
+    _SEQUENCE = struct.Struct('<Q')
+
+    def __init__(self, resource_allocation_problem):
+        """
+
+        :param resource_allocation_problem: the instance of the problem, shared by all the sdos
+        :type resource_allocation_problem: ResourceAllocationProblem
+        """
+        self.nodes = list(resource_allocation_problem.nodes)
+        self.sdos = list(resource_allocation_problem.sdos)
+        self.resources = list(resource_allocation_problem.resources)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        self.sdo_index = {sdo: j for j, sdo in enumerate(self.sdos)}
+
+        digest = hashlib.blake2b(digest_size=8)
+        for names in (self.nodes, self.sdos, self.resources):
+            digest.update(("\n".join(names) + "\0").encode())
+        self.instance_fingerprint = int.from_bytes(digest.digest(), 'little')
+
+    @classmethod
+    def is_binary(cls, body):
+        """
+
+        :param bytes body: a message as received
+        :return bool: True if the message is in this binary format
+        """
+        return body[:len(cls.MAGIC)] == cls.MAGIC
+
+    def encode(self, message):
+        """
+
+        :param BiddingMessage message:
+        :return bytes:
+        :raises ValueError: if the message holds some name that is not in the instance
+        """
+        try:
+            present, bids, consumption, timestamps = self._bidding_arrays(message.bidding_data)
+            winners = np.zeros((len(self.nodes), len(self.sdos)), dtype=bool)
+            winner_nodes = np.zeros(len(self.nodes), dtype=bool)
+            for node, node_winners in message.winners.items():
+                winner_nodes[self.node_index[node]] = True
+                winners[self.node_index[node], [self.sdo_index[sdo] for sdo in node_winners]] = True
+            removed = np.zeros((len(self.nodes), len(self.sdos)), dtype=bool)
+            for node, sdos in message.removed.items():
+                removed[self.node_index[node], [self.sdo_index[sdo] for sdo in sdos]] = True
+            sender = self.sdo_index[message.sender]
+        except KeyError as key_error:
+            raise ValueError("'" + str(key_error.args[0]) + "' is not in the instance of the problem")
+
+        flags = 0
+        if not np.all(np.mod(consumption, 1) == 0):
+            flags |= self.FLOAT_CONSUMPTION
+        else:
+            consumption = consumption.astype(np.int64)
+        sections = list()
+        if message.sequence is not None:
+            flags |= self.SEQUENCED
+            sections.append(self._SEQUENCE.pack(message.sequence))
+        if message.delta:
+            flags |= self.DELTA
+            sections.append(np.packbits(winner_nodes).tobytes())
+        if message.resync:
+            flags |= self.RESYNC
+        sections.append(np.packbits(winners).tobytes())
+        sections.append(np.packbits(present).tobytes())
+        if message.delta:
+            sections.append(np.packbits(removed).tobytes())
+        header = self._HEADER.pack(self.MAGIC, self.VERSION, flags, len(self.nodes), len(self.sdos),
+                                   len(self.resources), self.instance_fingerprint, sender, message.timestamp)
+        entries = present.reshape(-1)
+        return b''.join([header] + sections +
+                        [bids.reshape(-1)[entries].astype('<f8').tobytes(),
+                         consumption.reshape(-1, len(self.resources))[entries].astype(
+                             '<f8' if flags & self.FLOAT_CONSUMPTION else '<i8').tobytes(),
+                         timestamps.reshape(-1)[entries].astype('<f8').tobytes()])
+
+    def _bidding_arrays(self, bidding_data):
+        """
+
+        :param bidding_data: bids placed on each node, as dicts or as DenseBiddingData
+        :return: present mask, bids, consumption tensor and timestamps, indexed as the instance (nodes x sdos)
+        """
+        if hasattr(bidding_data, 'present') and bidding_data.nodes == self.nodes and bidding_data.sdos == self.sdos \
+                and bidding_data.resources == self.resources:
+            # array-backed store (see DenseBiddingData), already indexed as the instance
+            return bidding_data.present, bidding_data.bids, bidding_data.consumption, bidding_data.timestamps
+        shape = (len(self.nodes), len(self.sdos))
+        present = np.zeros(shape, dtype=bool)
+        bids = np.zeros(shape)
+        consumption = np.zeros(shape + (len(self.resources),))
+        timestamps = np.zeros(shape)
+        for node in bidding_data:
+            i = self.node_index[node]
+            node_bidding_data = bidding_data[node]
+            for sdo in node_bidding_data:
+                j = self.sdo_index[sdo]
+                bid = node_bidding_data[sdo]
+                bid_consumption = bid.get('consumption', {})
+                present[i, j] = True
+                bids[i, j] = bid.get('bid', 0)
+                consumption[i, j] = [bid_consumption.get(resource, 0) for resource in self.resources]
+                timestamps[i, j] = bid.get('timestamp', 0.0)
+        return present, bids, consumption, timestamps
+
+    def decode(self, body):
+        """
+
+        :param bytes body: a message in this binary format
+        :return BiddingMessage: the message, with bidding data as dicts (as in the JSON format)
+        :raises ValueError: if the message is not in a known version or has been built on a different instance
+        """
+        magic, version, flags, nodes, sdos, resources, instance_fingerprint, sender, timestamp = \
+            self._HEADER.unpack_from(body)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("Unknown message format, version " + str(version))
+        if instance_fingerprint != self.instance_fingerprint \
+                or (nodes, sdos, resources) != (len(self.nodes), len(self.sdos), len(self.resources)):
+            raise ValueError("Message built on a different instance of the problem")
+
+        offset = self._HEADER.size
+        sequence = None
+        if flags & self.SEQUENCED:
+            sequence, = self._SEQUENCE.unpack_from(body, offset)
+            offset += self._SEQUENCE.size
+        delta = bool(flags & self.DELTA)
+        winner_nodes = np.ones(nodes, dtype=bool)
+        if delta:
+            winner_nodes = self._unpack_bits(body, offset, nodes)
+            offset += (nodes + 7) // 8
+        mask_size = (nodes*sdos + 7) // 8
+        winners = self._unpack_bits(body, offset, nodes*sdos).reshape(nodes, sdos)
+        offset += mask_size
+        present = self._unpack_bits(body, offset, nodes*sdos).reshape(nodes, sdos)
+        offset += mask_size
+        removed = dict()
+        if delta:
+            removed_entries = self._unpack_bits(body, offset, nodes*sdos).reshape(nodes, sdos)
+            offset += mask_size
+            removed = {self.nodes[i]: [self.sdos[j] for j in np.flatnonzero(removed_entries[i])]
+                       for i in np.flatnonzero(removed_entries.any(axis=1))}
+        entries = int(present.sum())
+        bids = np.frombuffer(body, dtype='<f8', count=entries, offset=offset)
+        offset += 8*entries
+        consumption = np.frombuffer(body, dtype='<f8' if flags & self.FLOAT_CONSUMPTION else '<i8',
+                                    count=entries*resources, offset=offset).reshape(entries, resources)
+        offset += 8*entries*resources
+        timestamps = np.frombuffer(body, dtype='<f8', count=entries, offset=offset)
+
+        bid_values = [int(bid) if bid.is_integer() else bid for bid in bids.tolist()]
+        consumption = consumption.tolist()
+        timestamps = timestamps.tolist()
+        # deltas hold just the nodes with some bid changed
+        bidding_data = {self.nodes[i]: dict() for i in np.flatnonzero(present.any(axis=1) if delta else winner_nodes)}
+        for k, (i, j) in enumerate(zip(*np.nonzero(present))):
+            bidding_data[self.nodes[i]][self.sdos[j]] = {'bid': bid_values[k],
+                                                         'consumption': dict(zip(self.resources, consumption[k])),
+                                                         'timestamp': timestamps[k]}
+
+        message = BiddingMessage(sender=self.sdos[sender],
+                                 winners={self.nodes[i]: WinnerSet([self.sdos[j] for j in np.flatnonzero(winners[i])])
+                                          for i in np.flatnonzero(winner_nodes)},
+                                 bidding_data=bidding_data, sequence=sequence, delta=delta, removed=removed,
+                                 resync=bool(flags & self.RESYNC))
+        message.timestamp = timestamp
+        return message
+
+    @staticmethod
+    def _unpack_bits(body, offset, count):
+        """
+
+        :param bytes body:
+        :param int offset: position of the packed bits in body
+        :param int count: number of bits
+        :return numpy.ndarray: the bits, as bool
+        """
+        return np.unpackbits(np.frombuffer(body, dtype=np.uint8, count=(count + 7) // 8, offset=offset),
+                             count=count).astype(bool)
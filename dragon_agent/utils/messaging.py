@@ -4,8 +4,10 @@ import threading
 
 import pika
 
-from config.logging_configuration import LoggingConfiguration
+from config.config import Configuration
+from config.logging_configuration import LoggingConfiguration, LazyFormat
 from dragon_agent.utils.bidding_message import BiddingMessage
+from dragon_agent.utils.message_codec import BiddingMessageCodec
 from dragon_agent.utils.singleton import Singleton
 
 
@@ -28,6 +30,8 @@ class Messaging(object, metaclass=Singleton):
         self._write_connection = None
         self._write_channel = None
         self._message_handler = self._default_message_handler
+        self.codec = None
+        """ BiddingMessageCodec of the instance of the problem, if None messages are sent and received as JSON """
 
     def connect(self):
         logging.log(LoggingConfiguration.IMPORTANT, threading.get_ident())
@@ -100,11 +104,50 @@ class Messaging(object, metaclass=Singleton):
         :param BiddingMessage message:
         :return:
         """
-        logging.log(LoggingConfiguration.IMPORTANT, threading.get_ident())
+        if LoggingConfiguration.tracing():
+            logging.debug("Sending message to '" + dst + "' from thread " + str(threading.get_ident()))
         # self._channel.queue_declare(queue=dst)
         # self._channel.basic_publish(exchange='', routing_key=dst, body=json.dumps(message.to_dict()))
         self._write_channel.queue_declare(queue=dst)
-        self._write_channel.basic_publish(exchange='', routing_key=dst, body=json.dumps(message.to_dict()))
+        self._write_channel.basic_publish(exchange='', routing_key=dst, body=self.encode(message))
+
+    def encode(self, message):
+        """
+        Encodes the message in the configured wire format, falling back to JSON if it cannot be sent as BINARY
+        :param BiddingMessage message:
+        :return: the message body
+        """
+        if Configuration().WIRE_FORMAT == "BINARY" and self.codec is not None:
+            try:
+                return self.codec.encode(message)
+            except ValueError as ve:
+                logging.warning("Message sent as JSON, cannot be encoded as BINARY: " + str(ve))
+        return json.dumps(message.to_dict())
+
+    def decode(self, body):
+        """
+        Decodes a message received in any wire format
+        :param bytes body: the message body
+        :return BiddingMessage:
+        """
+        if BiddingMessageCodec.is_binary(body):
+            if self.codec is None:
+                raise ValueError("Received a BINARY message but no instance of the problem is set to decode it")
+            return self.codec.decode(body)
+        message = BiddingMessage()
+        message.parse_dict(json.loads(body.decode()))
+        return message
+
+    @staticmethod
+    def _describe(body):
+        """
+
+        :param bytes body: the message body
+        :return str: the body, if JSON, or its size
+        """
+        if BiddingMessageCodec.is_binary(body):
+            return "binary message of " + str(len(body)) + " bytes"
+        return body.decode()
 
     def start_consuming(self):
         """
@@ -134,8 +177,7 @@ class Messaging(object, metaclass=Singleton):
         for method, properties, body in self._channel.consume(queue=topic):
             self._channel.basic_ack(method.delivery_tag)
             if q.method.message_count == 0:
-                message = BiddingMessage()
-                message.parse_dict(json.loads(body.decode()))
+                message = self.decode(body)
                 break
         return message
 
@@ -170,12 +212,11 @@ class Messaging(object, metaclass=Singleton):
         :param bytes body: The message body
         :return:
         """
-        logging.log(15, " [x] Received " + body.decode())
+        logging.log(LoggingConfiguration.VERBOSE, " [x] Received %s", LazyFormat(Messaging._describe, body))
         self = Messaging()
         self._permanent_timeout_id = self._refresh_timeout(self._permanent_timeout_id, self._permanent_timeout)
 
-        message = BiddingMessage()
-        message.parse_dict(json.loads(body.decode()))
+        message = self.decode(body)
         self._message_handler(message)
 
     @staticmethod
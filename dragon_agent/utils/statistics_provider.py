@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+
+
+class StatisticsProvider:
+    """
+    In-memory copy of a statistics file written by a use-case simulator (e.g. config/use_case_stat/*.json).
+    The file is parsed once, and parsed again only when its modification time or size change.
+    Simulators running in the same process can also push statistics, that are served without reading the file.
+    Statistics are shared by all the callers, so they must not be modified: push new ones instead.
+    """
+
+    _providers = dict()
+
+    @classmethod
+    def of(cls, filename):
+        """
+
+        :param str filename: path of the statistics file
+        :return StatisticsProvider: the provider of the given file, shared in the process
+        """
+        path = os.path.abspath(filename)
+        provider = cls._providers.get(path)
+        if provider is None:
+            provider = cls(path)
+            cls._providers[path] = provider
+        return provider
+
+    def __init__(self, filename):
+        """
+
+        :param str filename: path of the statistics file
+        """
+        self.filename = filename
+        self._stats = None
+        self._file_signature = None
+        """ Modification time and size of the file the statistics come from, None if they were pushed """
+        self.loads = 0
+
+    def stats(self):
+        """
+        Statistics, parsed again just if the file changed since the last load or push
+        :return dict: the statistics, not to be modified
+        """
+        try:
+            file_signature = self._signature()
+        except FileNotFoundError:
+            if self._stats is None:
+                raise
+            # pushed statistics never written to file
+            return self._stats
+        if self._stats is None or file_signature != self._file_signature:
+            with open(self.filename, "r") as stat_file:
+                self._stats = json.loads(stat_file.read())
+            self._file_signature = file_signature
+            self.loads += 1
+            logging.debug("Statistics loaded from '" + self.filename + "'")
+        return self._stats
+
+    def push(self, stats, write=True):
+        """
+        Replaces the statistics served by this provider.
+        :param dict stats: the new statistics, that must not be modified afterwards
+        :param bool write: if True, statistics are also written to file for other processes
+        """
+        if write:
+            with open(self.filename, "w") as f:
+                f.write(json.dumps(stats, indent=4))
+        self._stats = stats
+        try:
+            self._file_signature = self._signature()
+        except FileNotFoundError:
+            self._file_signature = None
+
+    def _signature(self):
+        """
+
+        :return: modification time and size of the file
+        """
+        file_stat = os.stat(self.filename)
+        return file_stat.st_mtime_ns, file_stat.st_size
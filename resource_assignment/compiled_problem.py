@@ -0,0 +1,207 @@
+import sys
+
+import numpy as np
+
+
+class CompiledProblem:
+    """
+    Array-backed form of a ResourceAllocationProblem instance.
+    Names of sdos, nodes, functions and resources are mapped on positional indexes, so that consumption and
+    available resources can be stored as dense matrices and processed with vector operations.
+    consumption: matrix functions x resources
+    available_resources: matrix nodes x resources
+    """
+
+    def __init__(self, resource_allocation_problem):
+        """
+
+        :param resource_allocation_problem: the instance to compile
+        :type resource_allocation_problem: ResourceAllocationProblem
+        """
+        rap = resource_allocation_problem
+
+        # indexes
+        self.sdo_index = {sdo: i for i, sdo in enumerate(rap.sdos)}
+        self.node_index = {node: i for i, node in enumerate(rap.nodes)}
+        # some instances give the consumption (and implement services) with functions not listed among functions
+        functions = list(rap.functions) + [function for function in rap.consumption if function not in rap.functions]
+        self.function_index = {function: i for i, function in enumerate(functions)}
+        self.resource_index = {resource: i for i, resource in enumerate(rap.resources)}
+        self.resources = list(rap.resources)
+
+        # problem instance data
+        self.consumption = np.array([[rap.consumption[function][resource] for resource in rap.resources]
+                                     for function in functions]).reshape(len(functions), len(rap.resources))
+        self.available_resources = np.array([[rap.available_resources[node][resource] for resource in rap.resources]
+                                             for node in rap.nodes]).reshape(len(rap.nodes), len(rap.resources))
+
+        # resource scalars: for each node (and for the whole infrastructure), weights each resource by the ratio
+        # between the average resource amount and the amount of that resource
+        self.node_scalars = self._resource_scalars(self.available_resources)
+        self.total_scalars = self._resource_scalars(self.available_resources.sum(axis=0))
+
+        self._average_consumption = None
+        """ AverageConsumptionTable of the available resources, built on first use """
+
+    @staticmethod
+    def _resource_scalars(amounts):
+        """
+
+        :param numpy.ndarray amounts: a resources vector, or a matrix with a resources vector on each row
+        :return numpy.ndarray: the scalars for each resource, with the same shape of amounts
+        """
+        averages = amounts.sum(axis=-1, keepdims=True) / amounts.shape[-1]
+        return averages / amounts
+
+    def scalars(self, node=None):
+        """
+
+        :param str node: if None, scalars are computed over the total amount of resources
+        :return numpy.ndarray: the resource scalars vector
+        """
+        if node is None:
+            return self.total_scalars
+        return self.node_scalars[self.node_index[node]]
+
+    def norms(self, node, demands):
+        """
+        Weighted quadratic norm of a batch of demand vectors
+        :param str node: node whose scalars weight the demands, if None total resources are used
+        :param numpy.ndarray demands: a demand vector, or a matrix with a demand vector on each row
+        :return numpy.ndarray: the norm of each demand vector
+        """
+        return np.sqrt(np.sum((demands * self.scalars(node)) ** 2, axis=-1))
+
+    def average_consumption(self, resource_bound=None):
+        """
+
+        :param dict[str, dict[str, int]] resource_bound: for each node, the resources consumption is compared to,
+         if None the available resources of the instance are used
+        :return AverageConsumptionTable:
+        """
+        if resource_bound is None:
+            if self._average_consumption is None:
+                self._average_consumption = AverageConsumptionTable(self, self.available_resources)
+            return self._average_consumption
+        # nodes whose bound is None (i.e. already exceeded) have no resources left
+        no_resources = dict.fromkeys(self.resources, 0)
+        return AverageConsumptionTable(self, self.to_matrix([resource_bound[node] if resource_bound[node] is not None
+                                                             else no_resources for node in self.node_index]))
+
+    def to_vector(self, resources):
+        """
+        Converts a resources dict into a vector ordered as the resources index
+        :param dict[str, int] resources:
+        :return numpy.ndarray:
+        """
+        return np.array([resources[resource] for resource in self.resources])
+
+    def to_resources(self, vector):
+        """
+        Converts a vector ordered as the resources index into a resources dict
+        :param numpy.ndarray vector:
+        :return dict[str, int]:
+        """
+        return dict(zip(self.resources, vector.tolist()))
+
+    def to_matrix(self, resources_list):
+        """
+        Stacks a list of resources dicts into a matrix, one row for each dict
+        :param list of dict[str, int] resources_list:
+        :return numpy.ndarray: matrix len(resources_list) x resources
+        """
+        if len(resources_list) == 0:
+            return np.zeros((0, len(self.resources)), dtype=int)
+        return np.array([[resources[resource] for resource in self.resources] for resources in resources_list])
+
+    def function_vector(self, function):
+        """
+
+        :param str function:
+        :return numpy.ndarray: the consumption of the given function
+        """
+        return self.consumption[self.function_index[function]]
+
+    def node_vector(self, node):
+        """
+
+        :param str node:
+        :return numpy.ndarray: the resources available on the given node
+        """
+        return self.available_resources[self.node_index[node]]
+
+    def bundle_vector(self, functions):
+        """
+
+        :param list of str functions:
+        :return numpy.ndarray: the overall consumption of the given functions
+        """
+        return self.consumption[[self.function_index[f] for f in functions]].sum(axis=0)
+
+    @staticmethod
+    def fits(demand, bound):
+        """
+        Checks if the demand vector(s) fit the bound
+        :param numpy.ndarray demand: a vector, or a matrix with a demand vector on each row
+        :param numpy.ndarray bound: the resources vector to fit
+        :return: True if the demand fits (or, for a matrix, a boolean vector telling which rows fit)
+        """
+        return np.all(demand <= bound, axis=-1)
+
+
+class AverageConsumptionTable:
+    """
+    For each function, its consumption as the average, over resources, of the fraction of each resource it takes:
+     - on each node;
+     - on the average node, i.e. over the total amount of resources divided by the number of nodes.
+    Resource amounts are the available resources of the instance or any resource bound (e.g. residual resources).
+    A function consumes sys.maxsize where the amount of any resource is 0.
+    """
+
+    def __init__(self, compiled, amounts):
+        """
+
+        :param CompiledProblem compiled:
+        :param numpy.ndarray amounts: matrix nodes x resources
+        """
+        self.function_index = compiled.function_index
+        self.node_index = compiled.node_index
+
+        consumption = compiled.consumption[:, np.newaxis, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_node = (consumption / amounts).sum(axis=-1) / float(len(compiled.resources))
+            average = amounts.sum(axis=0) / len(amounts)
+            overall = (compiled.consumption / average).sum(axis=-1) / float(len(compiled.resources))
+        per_node[:, (amounts == 0).any(axis=-1)] = np.inf
+        if (average == 0).any():
+            overall[:] = np.inf
+
+        self.per_node = per_node.tolist()
+        """ Matrix functions x nodes, as nested lists """
+        self.overall = overall.tolist()
+        """ Vector functions, over the average node """
+
+    def get(self, function, node=None):
+        """
+
+        :param str function:
+        :param str node: if None, the consumption on the average node
+        :return float: the decimal average consumption
+        """
+        if node is None:
+            value = self.overall[self.function_index[function]]
+        else:
+            value = self.per_node[self.function_index[function]][self.node_index[node]]
+        if value == np.inf:
+            return sys.maxsize
+        return value
+
+    def row(self, function, nodes):
+        """
+
+        :param str function:
+        :param list of str nodes:
+        :return list of float: the consumption of the function on each of the given nodes (inf for sys.maxsize)
+        """
+        per_node = self.per_node[self.function_index[function]]
+        return [per_node[self.node_index[node]] for node in nodes]
@@ -1,12 +1,13 @@
 import pprint
 
-import math
-
-import sys
+from resource_assignment.compiled_problem import CompiledProblem
 
 
 class ResourceAllocationProblem:
 
+    _COMPILED_ATTRIBUTES = {'sdos', 'functions', 'resources', 'nodes', 'consumption', 'available_resources'}
+    """ Attributes the compiled form of the instance is built from """
+
     def __init__(self, sdos=None, services=None, functions=None, resources=None, nodes=None,
                  consumption=None, available_resources=None, implementation=None):
         """
@@ -41,6 +42,29 @@ class ResourceAllocationProblem:
         self.available_resources = available_resources
         self.implementation = implementation
 
+    def __setattr__(self, name, value):
+        # replacing any of the indexes or of the instance data makes the compiled form stale
+        if name in self._COMPILED_ATTRIBUTES:
+            self.__dict__['_compiled'] = None
+        super().__setattr__(name, value)
+
+    @property
+    def compiled(self):
+        """
+        Array-backed form of this instance, built on first access
+        :return CompiledProblem:
+        """
+        if self.__dict__.get('_compiled') is None:
+            self.__dict__['_compiled'] = CompiledProblem(self)
+        return self.__dict__['_compiled']
+
+    def invalidate(self):
+        """
+        Drops the compiled form of this instance.
+        Must be called if instance data (e.g. available_resources) are modified in place.
+        """
+        self.__dict__['_compiled'] = None
+
     def parse_dict(self, rap_dict):
 
         self.sdos = rap_dict["sdos"]
@@ -73,11 +97,8 @@ class ResourceAllocationProblem:
         :param str node: the node where the assignment should be bounded
         :return: True if is bounded
         """
-        node_assignment_dict_consumption = self.get_node_assignment_dict_consumption(node_assignment_dict)
-        for resource in self.resources:
-            if node_assignment_dict_consumption[resource] > self.available_resources[node][resource]:
-                return False
-        return True
+        return bool(self.compiled.fits(self.get_node_assignment_dict_vector(node_assignment_dict),
+                                       self.compiled.node_vector(node)))
 
     def check_infrastructure_bound(self, assignment_dict):
         """
@@ -113,22 +134,15 @@ class ResourceAllocationProblem:
         :param bound:
         :return:
         """
-        node_assignment_dict_consumption = self.get_node_assignment_dict_consumption(node_assignment_dict)
-        for resource in self.resources:
-            if node_assignment_dict_consumption[resource] > bound[resource]:
-                return False
-        return True
+        return bool(self.compiled.fits(self.get_node_assignment_dict_vector(node_assignment_dict),
+                                       self.compiled.to_vector(bound)))
 
     def get_total_resources_amount(self):
         """
 
         :return:
         """
-        total_resources = {resource: 0 for resource in self.resources}
-
-        for node in self.nodes:
-            total_resources = self.sum_resources(total_resources, self.available_resources[node])
-        return total_resources
+        return self.compiled.to_resources(self.compiled.available_resources.sum(axis=0))
 
     def get_residual_resources(self, assignment_dict):
         """
@@ -153,13 +167,10 @@ class ResourceAllocationProblem:
         :param str node: the node
         :return: the residual resources on the given node
         """
-        assignment_dict_consumption = self.get_node_assignment_dict_consumption(node_assignment_dict)
-        residual_res = dict()
-        for resource in self.resources:
-            if assignment_dict_consumption[resource] > self.available_resources[node][resource]:
-                return None
-            residual_res[resource] = self.available_resources[node][resource] - assignment_dict_consumption[resource]
-        return residual_res
+        residual_vector = self.compiled.node_vector(node) - self.get_node_assignment_dict_vector(node_assignment_dict)
+        if (residual_vector < 0).any():
+            return None
+        return self.compiled.to_resources(residual_vector)
 
     def check_waste_freedom(self):
         """
@@ -174,12 +185,22 @@ class ResourceAllocationProblem:
         :param dict[str, union[int, dict]] node_assignment_dict:
         :return dict[str, int]:
         """
-        assignment_dict_consumption = {r: 0 for r in self.resources}
-        for sdo in node_assignment_dict:
-            if 'consumption' in node_assignment_dict[sdo]:
-                assignment_dict_consumption = self.sum_resources(assignment_dict_consumption,
-                                                                 node_assignment_dict[sdo]['consumption'])
-        return assignment_dict_consumption
+        return self.compiled.to_resources(self.get_node_assignment_dict_vector(node_assignment_dict))
+
+    def get_node_assignment_dict_vector(self, node_assignment_dict):
+        """
+        Same as get_node_assignment_dict_consumption, but returns the consumption as a vector
+        :param dict[str, union[int, dict]] node_assignment_dict:
+        :return numpy.ndarray:
+        """
+        if hasattr(node_assignment_dict, 'total_consumption'):
+            # tables of the bidding stores keep their total (see NodeBiddingData)
+            total_consumption = node_assignment_dict.total_consumption()
+            return self.compiled.to_vector({resource: total_consumption.get(resource, 0)
+                                            for resource in self.compiled.resources})
+        consumptions = [node_assignment_dict[sdo]['consumption'] for sdo in node_assignment_dict
+                        if 'consumption' in node_assignment_dict[sdo]]
+        return self.compiled.to_matrix(consumptions).sum(axis=0)
 
     def get_function_resource_consumption(self, function):
         """
@@ -195,21 +216,16 @@ class ResourceAllocationProblem:
         :param functions: list of functions
         :return:
         """
-        # init total consumption for each resource
-        total_consumption = dict()
-        for resource in self.resources:
-            total_consumption[resource] = 0
-        # add each function consumption to total
-        for function in functions:
-            total_consumption = self.sum_resources(total_consumption, self.consumption[function])
-        return total_consumption
+        return self.compiled.to_resources(self.compiled.bundle_vector(functions))
 
     def sum_resources(self, resources_a, resources_b):
         """
-
-        :param resources_a:
-        :param resources_b:
-        :return:
+        Kept as a loop over the resources on purpose: callers give and keep dicts, and converting them to vectors costs
+        more than the loop. Computations over many consumptions should sum the vectors of compiled instead (see
+        get_node_assignment_dict_vector)
+        :param dict[str, int] resources_a:
+        :param dict[str, int] resources_b:
+        :return dict[str, int]:
         """
         sum_resources = dict()
         for resource in self.resources:
@@ -218,10 +234,10 @@ class ResourceAllocationProblem:
 
     def sub_resources(self, resources_a, resources_b):
         """
-
-        :param resources_a:
-        :param resources_b:
-        :return:
+        Loop over the resources, as sum_resources
+        :param dict[str, int] resources_a:
+        :param dict[str, int] resources_b:
+        :return dict[str, int]:
         """
         sub_resources = dict()
         for resource in self.resources:
@@ -230,10 +246,11 @@ class ResourceAllocationProblem:
 
     def check_equals(self, resources_a, resources_b):
         """
-
-        :param resources_a:
-        :param resources_b:
-        :return:
+        Loop over the resources, as sum_resources: on the few resources of an instance, it is faster than comparing
+        vectors, even when the dicts come from vectors (see get_node_assignment_dict_consumption)
+        :param dict[str, int] resources_a:
+        :param dict[str, int] resources_b:
+        :return bool:
         """
         for resource in self.resources:
             if resources_a[resource] != resources_b[resource]:
@@ -311,15 +328,16 @@ class ResourceAllocationProblem:
         :param resources:
         :return:
         """
-        quadratic_values = list()
-        for resource in self.resources:
-
-            consumption = resources[resource]*self.resource_scalar(resource, node)
-            quadratic_value = consumption**2
-            quadratic_values.append(quadratic_value)
+        return float(self.compiled.norms(node, self.compiled.to_vector(resources)))
 
-        weighted_quadratic_norm = math.sqrt(sum(quadratic_values))
-        return weighted_quadratic_norm
+    def norms(self, node, resources_list):
+        """
+        Vectorized version of norm
+        :param str node:
+        :param list of dict[str, int] resources_list: demands to compute the norm for
+        :return numpy.ndarray: the norm of each given demand
+        """
+        return self.compiled.norms(node, self.compiled.to_matrix(resources_list))
 
     def resource_scalar(self, resource, node=None):
         """
@@ -328,12 +346,7 @@ class ResourceAllocationProblem:
         :param node:
         :return:
         """
-        if node is None:
-            total_resources_amount = self.get_total_resources_amount()
-        else:
-            total_resources_amount = self.available_resources[node]
-        avg = sum(total_resources_amount.values())/len(self.resources)
-        return avg/total_resources_amount[resource]
+        return float(self.compiled.scalars(node)[self.compiled.resource_index[resource]])
 
     def __str__(self):
         return "************************* RAP INSTANCE ************************\n" + "sdos: " + str(self.sdos) + "\n " \
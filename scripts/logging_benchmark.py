@@ -0,0 +1,137 @@
+"""
+Measures the time spent in logging on the orchestration hot paths.
+Log records are written to /dev/null, so that records actually emitted are formatted as usual.
+ 1. micro benchmark: a discarded debug message built eagerly, lazily (LazyFormat) or guarded by the tracing check;
+ 2. orchestration of all the sdos of the instance at different log levels, with and without hot_path_tracing.
+"""
+
+import argparse
+import json
+import logging
+import os
+import pprint
+import random
+import timeit
+
+import time
+
+from config.config import Configuration
+from config.logging_configuration import LoggingConfiguration, LazyFormat
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+from dragon_agent.orchestration.sdo_orchestrator import SdoOrchestrator
+
+SCENARIOS = [("WARNING", True), ("INFO", True), ("DEBUG", False), ("DEBUG", True)]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        type=int,
+        default=3,
+        help='Number of orchestration runs for each scenario.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the service bundles.'
+    )
+    return parser.parse_args()
+
+
+def configure_log(log_level):
+    """
+    Sends every emitted record to /dev/null
+    :param str log_level:
+    """
+    logging.addLevelName(LoggingConfiguration.VERBOSE, "VERBOSE")
+    logging.addLevelName(LoggingConfiguration.IMPORTANT, "IMPORTANT")
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(os.devnull)
+    handler.setFormatter(logging.Formatter("%(asctime)s.%(msecs)03d | %(levelname)10s | [%(funcName)15s] "
+                                           "%(message)s - %(filename)s:%(lineno)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.getLevelName(log_level))
+
+
+def micro_benchmark(bidding_table, number=20000):
+    """
+
+    :param bidding_table: a bidding table to log
+    :param int number: repetitions of each statement
+    :return dict[str, float]: seconds per statement
+    """
+    configure_log("INFO")
+
+    def eager():
+        logging.debug("Voting data: " + pprint.pformat(bidding_table, compact=True))
+
+    def lazy():
+        logging.debug("Voting data: %s", LazyFormat(pprint.pformat, bidding_table, compact=True))
+
+    def guarded():
+        if LoggingConfiguration.tracing():
+            logging.debug("Voting data: " + pprint.pformat(bidding_table, compact=True))
+
+    return {name: timeit.timeit(statement, number=number) / number
+            for name, statement in [("eager", eager), ("lazy", lazy), ("guarded", guarded)]}
+
+
+def orchestration_benchmark(rap, bundles, log_level, tracing, repeat):
+    """
+
+    :param ResourceAllocationProblem rap:
+    :param dict[str, list of str] bundles: service bundle of each sdo
+    :param str log_level:
+    :param bool tracing: value of hot_path_tracing
+    :param int repeat:
+    :return float: best time, in seconds, to orchestrate all the sdos
+    """
+    configuration = Configuration()
+    configuration.HOT_PATH_TRACING = tracing
+    configure_log(log_level)
+    times = list()
+    for _ in range(repeat):
+        orchestrators = [SdoOrchestrator(sdo, rap, bundles[sdo]) for sdo in rap.sdos]
+        begin = time.perf_counter()
+        for orchestrator in orchestrators:
+            orchestrator.sdo_orchestrate()
+        times.append(time.perf_counter() - begin)
+    return min(times)
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+
+    rnd = random.Random(args.seed)
+    bundle_size = max(1, len(rap.services)*configuration.BUNDLE_PERCENTAGE//100)
+    bundles = {sdo: rnd.sample(rap.services, bundle_size) for sdo in rap.sdos}
+
+    print("Discarded debug message (us per call):")
+    table = SdoOrchestrator(rap.sdos[0], rap, bundles[rap.sdos[0]]).bidding_data[rap.nodes[0]]
+    for name, seconds in micro_benchmark(table).items():
+        print("  {:10s} {:10.2f}".format(name, seconds*1e6))
+
+    print("Orchestration of " + str(len(rap.sdos)) + " sdos (best of " + str(args.repeat) + ", s):")
+    for log_level, tracing in SCENARIOS:
+        seconds = orchestration_benchmark(rap, bundles, log_level, tracing, args.repeat)
+        print("  {:8s} hot_path_tracing={:5s} {:10.3f}".format(log_level, str(tracing).lower(), seconds))
@@ -0,0 +1,105 @@
+"""
+Compares the JSON and the binary (see BiddingMessageCodec) wire formats of BiddingMessage.
+Messages carry random bids of every sdo on every node of a generated instance, as the bidding data broadcast by an
+sdo once its neighbors bid everywhere. For each size, prints the message size and the time to encode and decode it.
+"""
+
+import argparse
+import json
+import random
+import timeit
+
+from dragon_agent.orchestration.dense_bidding_data import DenseBiddingData
+from dragon_agent.orchestration.winner_set import WinnerSet
+from dragon_agent.utils.bidding_message import BiddingMessage
+from dragon_agent.utils.message_codec import BiddingMessageCodec
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+
+SIZES = [(20, 4), (50, 20), (200, 50)]
+""" Number of sdos and nodes of each instance """
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-r',
+        '--repeat',
+        type=int,
+        default=5,
+        help='Number of encodings and decodings timed for each format.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the bids.'
+    )
+    return parser.parse_args()
+
+
+def build_message(sdos_number, nodes_number, rnd):
+    """
+
+    :param int sdos_number:
+    :param int nodes_number:
+    :param random.Random rnd:
+    :return: the instance of the problem and a message with a bid of each sdo on each node
+    """
+    rap = ResourceAllocationProblem()
+    rap.parse_dict({'sdos': ['sdo' + str(i) for i in range(sdos_number)],
+                    'functions': [], 'services': [], 'resources': ['cpu', 'memory', 'bandwidth'],
+                    'nodes': ['node' + str(i) for i in range(nodes_number)],
+                    'consumption': {}, 'implementation': {},
+                    'available_resources': {'node' + str(i): {'cpu': 64, 'memory': 65536, 'bandwidth': 10000}
+                                            for i in range(nodes_number)}})
+    bidding_data = {node: {sdo: {'bid': rnd.randint(0, 1000),
+                                 'consumption': {'cpu': rnd.randint(0, 8), 'memory': rnd.randint(0, 8192),
+                                                 'bandwidth': rnd.randint(0, 1000)},
+                                 'timestamp': 1500000000 + rnd.random()*1000}
+                           for sdo in rap.sdos}
+                    for node in rap.nodes}
+    winners = {node: WinnerSet(rnd.sample(rap.sdos, min(len(rap.sdos), 5))) for node in rap.nodes}
+    return rap, BiddingMessage(sender=rap.sdos[0], winners=winners, bidding_data=bidding_data)
+
+
+def best_time(statement, repeat):
+    """
+
+    :param statement: function to time
+    :param int repeat:
+    :return float: best time of a call, in seconds
+    """
+    return min(timeit.repeat(statement, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    rnd = random.Random(args.seed)
+
+    print("{:>6s} {:>6s} {:8s} {:>12s} {:>12s} {:>12s}".format("sdos", "nodes", "format", "bytes", "encode ms",
+                                                               "decode ms"))
+    for sdos_number, nodes_number in SIZES:
+        rap, message = build_message(sdos_number, nodes_number, rnd)
+        codec = BiddingMessageCodec(rap)
+
+        json_body = json.dumps(message.to_dict()).encode()
+        binary_body = codec.encode(message)
+
+        def decode_json():
+            BiddingMessage().parse_dict(json.loads(json_body.decode()))
+
+        dense_message = BiddingMessage(sender=message.sender, winners=message.winners,
+                                       bidding_data=DenseBiddingData(rap, message.bidding_data))
+        results = [("JSON", len(json_body), best_time(lambda: json.dumps(message.to_dict()).encode(), args.repeat),
+                    best_time(decode_json, args.repeat)),
+                   ("BINARY", len(binary_body), best_time(lambda: codec.encode(message), args.repeat),
+                    best_time(lambda: codec.decode(binary_body), args.repeat)),
+                   ("BINARY*", len(codec.encode(dense_message)), best_time(lambda: codec.encode(dense_message),
+                                                                           args.repeat),
+                    best_time(lambda: codec.decode(binary_body), args.repeat))]
+        for name, size, encode_time, decode_time in results:
+            print("{:>6d} {:>6d} {:8s} {:>12d} {:>12.2f} {:>12.2f}".format(sdos_number, nodes_number, name, size,
+                                                                          encode_time*1e3, decode_time*1e3))
+    print("BINARY*: encoding from DenseBiddingData")
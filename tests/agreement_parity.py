@@ -0,0 +1,194 @@
+"""
+Checks that the agreement among the sdos of the instance reaches the same outcome of a recorded run.
+All the sdos are orchestrated, then they exchange their bidding data and winners with each other, in rounds, through
+SdoAgreement.sdo_multi_agreement, until nobody rebroadcasts. Implementations, winners, number of rounds and the flags
+of each agreement (agreement, updated, rebroadcast, per-sdo agreement) are digested, for each private utility with and
+without the submodular utility.
+Bid times are drawn from a counter rather than from the clock, so that runs are reproducible; since sets of sdos are
+iterated, PYTHONHASHSEED must be fixed as well (the seed is recorded along with the digests).
+Digests are compared with the ones recorded by --record, e.g. on a previous commit, and, optionally, with the ones of
+the same run on the dense bidding store and with parallel scoring, that must give the same outcome.
+agreement_parity.json holds the digests recorded on the original code (no skip of the unchanged nodes, dict-based
+instance of the problem), with PYTHONHASHSEED=0 python -m tests.agreement_parity --record tests/agreement_parity.json
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+from config.config import Configuration
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+from dragon_agent.agreement.sdo_agreement import SdoAgreement
+from dragon_agent.orchestration.sdo_orchestrator import SdoOrchestrator
+
+UTILITIES = ["SERVICE", "GREEDY", "LOAD-BALANCE", "NODE-LOADING", "POWER-CONSUMPTION", "BEST-FIT-POLICY"]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the service bundles.'
+    )
+    parser.add_argument(
+        '-r',
+        '--rounds',
+        type=int,
+        default=30,
+        help='Maximum number of agreement rounds.'
+    )
+    parser.add_argument(
+        '-u',
+        '--utilities',
+        nargs='+',
+        default=UTILITIES,
+        choices=UTILITIES,
+        help='Private utilities checked.'
+    )
+    parser.add_argument(
+        '--record',
+        help='File where the digests of this run are recorded.'
+    )
+    parser.add_argument(
+        '--compare',
+        help='File of recorded digests this run is compared with.'
+    )
+    parser.add_argument(
+        '--dense',
+        action='store_true',
+        help='Runs again on the dense bidding store, expecting the same digests.'
+    )
+    parser.add_argument(
+        '-w',
+        '--scoring_workers',
+        type=int,
+        default=0,
+        help='If greater than 1, runs again scoring all the candidates on this number of workers, expecting the same '
+             'digests.'
+    )
+    return parser.parse_args()
+
+
+class Clock:
+    """
+    Replaces time.time with a counter, so that bid times only depend on the order of the bids
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1e-6
+        return self.now
+
+
+def agreement(rap, bundles, max_rounds):
+    """
+    Runs the agreement among all the sdos of the instance, each receiving the data of all the others at each round
+    :param ResourceAllocationProblem rap:
+    :param dict[str, list of str] bundles:
+    :param int max_rounds:
+    :return str: digest of the outcome
+    """
+    time.time = Clock().time
+    orchestrators = {sdo: SdoOrchestrator(sdo, rap, bundles[sdo]) for sdo in rap.sdos}
+    agreements = {sdo: SdoAgreement(sdo, rap, orchestrators[sdo]) for sdo in rap.sdos}
+    for sdo in rap.sdos:
+        orchestrators[sdo].sdo_orchestrate()
+
+    flags = list()
+    rounds = 0
+    for rounds in range(max_rounds):
+        messages = {sdo: {'bidding-data': copy.deepcopy(orchestrators[sdo].bidding_data),
+                          'winners': copy.deepcopy(orchestrators[sdo].per_node_winners)} for sdo in rap.sdos}
+        rebroadcast = False
+        for sdo in rap.sdos:
+            agreements[sdo].sdo_multi_agreement({sender: messages[sender] for sender in rap.sdos if sender != sdo})
+            rebroadcast |= agreements[sdo].rebroadcast
+            flags.append((sdo, agreements[sdo].agreement, agreements[sdo].updated, agreements[sdo].rebroadcast,
+                          sorted(agreements[sdo].per_sdo_agreement)))
+        if not rebroadcast:
+            break
+
+    outcome = {sdo: orchestrators[sdo].implementations for sdo in rap.sdos}
+    outcome['_winners'] = {sdo: sorted(orchestrators[sdo].get_winners()) for sdo in rap.sdos}
+    outcome['_rounds'] = rounds
+    outcome['_flags'] = flags
+    # orchestrators of older commits, digests may be recorded on, do not hold workers
+    for orchestrator in orchestrators.values():
+        if hasattr(orchestrator, 'close'):
+            orchestrator.close()
+    return hashlib.sha256(json.dumps(outcome, sort_keys=True, default=str).encode()).hexdigest()
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+    logging.disable(logging.CRITICAL)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+
+    rnd = random.Random(args.seed)
+    bundle_size = max(1, len(rap.services)*configuration.BUNDLE_PERCENTAGE//100)
+    bundles = {sdo: rnd.sample(rap.services, bundle_size) for sdo in rap.sdos}
+
+    variants = list()
+    if args.dense:
+        variants.append(("dense", {'BIDDING_STORE': 'DENSE'}))
+    if args.scoring_workers > 1:
+        variants.append(("parallel", {'SCORING_WORKERS': args.scoring_workers, 'PARALLEL_SCORING_THRESHOLD': 1}))
+
+    recorded = None
+    if args.compare is not None:
+        with open(args.compare) as recorded_file:
+            recorded = json.loads(recorded_file.read())
+        if recorded['hash-seed'] != os.environ.get('PYTHONHASHSEED'):
+            print("digests were recorded with PYTHONHASHSEED=" + str(recorded['hash-seed']))
+            sys.exit(2)
+
+    failures = 0
+    digests = dict()
+    for utility in args.utilities:
+        configuration.PRIVATE_UTILITY = utility
+        for submodular in (False, True):
+            configuration.SUBMODULAR_P_UTILITY = submodular
+            case = utility + " submodular=" + str(submodular).lower()
+            digests[case] = agreement(rap, bundles, args.rounds)
+            if recorded is not None and recorded['digests'].get(case) != digests[case]:
+                failures += 1
+                print("MISMATCH " + case + ": recorded")
+            for name, settings in variants:
+                defaults = {key: getattr(configuration, key) for key in settings}
+                configuration.__dict__.update(settings)
+                if agreement(rap, bundles, args.rounds) != digests[case]:
+                    failures += 1
+                    print("MISMATCH " + case + ": " + name)
+                configuration.__dict__.update(defaults)
+            print("{:40s} {}".format(case, digests[case][:16]))
+
+    if args.record is not None:
+        with open(args.record, 'w') as record_file:
+            record_file.write(json.dumps({'hash-seed': os.environ.get('PYTHONHASHSEED'), 'digests': digests},
+                                         indent=4, sort_keys=True) + "\n")
+
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
@@ -0,0 +1,179 @@
+"""
+Checks that skipping the unchanged nodes in sdo_multi_agreement does not change its outcome when the local bids are
+changed during the agreement, i.e. by a rebid (pending or due to an overbid) or by the reset of the bids.
+The agreement among the sdos of the instance is run with rebids postponed every other round (so that rebids are
+pending), then, once converged, each sdo is given an other bundle and a pending rebid, on data where every node is
+unchanged but the senders winners lag behind (they are the ones of the first orchestration), so that the decision table
+is evaluated on the unchanged nodes: the rebid changes the local bids, but the decision table must still compare the
+received bids with the ones held before the agreement.
+The local bids the decision table compares with (see SdoAgreement._compare_bid_times) must be the ones held before
+the agreement. The run is repeated with every node taken as changed, as if all of them were merged again: flags of
+each agreement, winners, bids and implementations must be the same.
+"""
+
+import argparse
+import copy
+import json
+import logging
+import random
+import sys
+import time
+
+from config.config import Configuration
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+from dragon_agent.agreement.sdo_agreement import SdoAgreement
+from dragon_agent.orchestration.sdo_orchestrator import SdoOrchestrator
+from tests.agreement_parity import Clock, UTILITIES
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the service bundles.'
+    )
+    parser.add_argument(
+        '-r',
+        '--rounds',
+        type=int,
+        default=30,
+        help='Maximum number of agreement rounds.'
+    )
+    parser.add_argument(
+        '--dense',
+        action='store_true',
+        help='Bids are stored in DenseBiddingData.'
+    )
+    return parser.parse_args()
+
+
+class SnapshotSpy:
+    """
+    Replaces SdoAgreement._compare_bid_times, checking that the local bids it is given (second argument) are some of
+    the ones held before the agreement
+    """
+
+    def __init__(self):
+        self.compare_bid_times = SdoAgreement.__dict__['_compare_bid_times'].__func__
+        self.tables = None
+        """ Node tables held before the current agreement, None if not checking """
+        self.stale = 0
+        """ Number of comparisons with bids that were not held before the agreement """
+
+    def __call__(self, node_bidding_data_1, node_bidding_data_2, sdo=None):
+        if self.tables is not None and dict(node_bidding_data_2) not in self.tables:
+            self.stale += 1
+        return self.compare_bid_times(node_bidding_data_1, node_bidding_data_2, sdo)
+
+
+def state(orchestrator, sdo_agreement):
+    """
+
+    :return: flags of the last agreement of the sdo, and its winners, bids and implementations
+    """
+    return (sdo_agreement.agreement, sdo_agreement.updated, sdo_agreement.rebroadcast,
+            sorted(sdo_agreement.per_sdo_agreement),
+            {node: sorted(winners) for node, winners in orchestrator.per_node_winners.items()},
+            {node: dict(orchestrator.bidding_data[node]) for node in orchestrator.bidding_data},
+            orchestrator.implementations)
+
+
+def agreement(rap, bundles, other_bundles, max_rounds, spy):
+    """
+    Runs the agreement among all the sdos of the instance, postponing rebids every other round, then gives each sdo an
+    other bundle and a pending rebid once converged
+    :param ResourceAllocationProblem rap:
+    :param dict[str, list of str] bundles:
+    :param dict[str, list of str] other_bundles: bundles of the sdos once converged
+    :param int max_rounds:
+    :param SnapshotSpy spy:
+    :return list: the state of each sdo after each of its agreements
+    """
+    time.time = Clock().time
+    orchestrators = {sdo: SdoOrchestrator(sdo, rap, bundles[sdo]) for sdo in rap.sdos}
+    agreements = {sdo: SdoAgreement(sdo, rap, orchestrators[sdo]) for sdo in rap.sdos}
+    for sdo in rap.sdos:
+        orchestrators[sdo].sdo_orchestrate()
+    first_winners = {sdo: copy.deepcopy(orchestrators[sdo].per_node_winners) for sdo in rap.sdos}
+
+    states = list()
+    for rounds in range(max_rounds + 1):
+        converged = rounds == max_rounds
+        messages = {sdo: {'bidding-data': copy.deepcopy(orchestrators[sdo].bidding_data),
+                          'winners': copy.deepcopy(first_winners[sdo] if converged
+                                                   else orchestrators[sdo].per_node_winners)} for sdo in rap.sdos}
+        rebroadcast = False
+        for sdo in rap.sdos:
+            if converged:
+                orchestrators[sdo].service_bundle = [str(i) + "_" + s for i, s in enumerate(other_bundles[sdo])]
+                orchestrators[sdo].embedding_seeds.clear()
+                agreements[sdo]._pending_rebid = True
+            spy.tables = [dict(orchestrators[sdo].bidding_data[node]) for node in rap.nodes]
+            agreements[sdo].sdo_multi_agreement({sender: messages[sender] for sender in rap.sdos if sender != sdo},
+                                                rebid_enabled=converged or rounds % 2 == 1)
+            spy.tables = None
+            rebroadcast |= agreements[sdo].rebroadcast
+            states.append(state(orchestrators[sdo], agreements[sdo]))
+        if converged:
+            break
+        if not rebroadcast and not any(sdo_agreement._pending_rebid for sdo_agreement in agreements.values()):
+            # one more round, with a pending rebid for everybody
+            max_rounds = rounds + 1
+    return states
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+    logging.disable(logging.CRITICAL)
+    if args.dense:
+        configuration.BIDDING_STORE = 'DENSE'
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+
+    rnd = random.Random(args.seed)
+    bundle_size = max(1, len(rap.services)*configuration.BUNDLE_PERCENTAGE//100)
+    bundles = {sdo: rnd.sample(rap.services, bundle_size) for sdo in rap.sdos}
+    other_bundles = {sdo: rnd.sample(rap.services, bundle_size) for sdo in rap.sdos}
+
+    unchanged_node = SdoAgreement.__dict__['_unchanged_node']
+    spy = SnapshotSpy()
+    SdoAgreement._compare_bid_times = staticmethod(spy)
+    failures = 0
+    for utility in UTILITIES:
+        configuration.PRIVATE_UTILITY = utility
+        for submodular in (False, True):
+            configuration.SUBMODULAR_P_UTILITY = submodular
+            case = utility + " submodular=" + str(submodular).lower()
+            states = agreement(rap, bundles, other_bundles, args.rounds, spy)
+            # every node merged again
+            SdoAgreement._unchanged_node = staticmethod(lambda received_data, current_bidding_data, node: False)
+            merged_states = agreement(rap, bundles, other_bundles, args.rounds, spy)
+            SdoAgreement._unchanged_node = unchanged_node
+            if spy.stale > 0:
+                failures += 1
+                print("MISMATCH " + case + ": " + str(spy.stale) + " comparisons with bids changed by the agreement")
+                spy.stale = 0
+            mismatches = [i for i in range(max(len(states), len(merged_states)))
+                          if i >= len(states) or i >= len(merged_states) or states[i] != merged_states[i]]
+            if len(mismatches) > 0:
+                failures += 1
+                print("MISMATCH " + case + ": " + str(len(mismatches)) + " agreements, first " +
+                      str(mismatches[0] // len(rap.sdos)) + " round")
+            print("{:40s} {} agreements".format(case, len(states)))
+
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
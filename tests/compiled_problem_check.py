@@ -0,0 +1,219 @@
+"""
+Checks that the dict API of ResourceAllocationProblem, now running over the compiled instance, gives the results of
+the original dict-based implementation, kept here as reference.
+Random node assignments (fractional consumption and bids without consumption included), bounds and resource vectors
+of the instance are checked before and after replacing the available resources, that must drop the compiled form.
+All results must be identical, but norms: numpy squares as x*x, while the original x**2 is computed by pow, so
+fractional demands may differ in the last bit.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+
+from config.config import Configuration
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-n',
+        '--instances',
+        type=int,
+        default=2000,
+        help='Number of random assignments checked.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the assignments.'
+    )
+    return parser.parse_args()
+
+
+class ReferenceProblem:
+    """
+    The original dict-based implementation of the methods of ResourceAllocationProblem, over the same instance
+    """
+
+    def __init__(self, rap):
+        """
+
+        :param ResourceAllocationProblem rap:
+        """
+        self.rap = rap
+
+    def sum_resources(self, resources_a, resources_b):
+        return {resource: resources_a[resource] + resources_b[resource] for resource in self.rap.resources}
+
+    def sub_resources(self, resources_a, resources_b):
+        return {resource: resources_a[resource] - resources_b[resource] for resource in self.rap.resources}
+
+    def get_node_assignment_dict_consumption(self, node_assignment_dict):
+        assignment_dict_consumption = {r: 0 for r in self.rap.resources}
+        for sdo in node_assignment_dict:
+            if 'consumption' in node_assignment_dict[sdo]:
+                assignment_dict_consumption = self.sum_resources(assignment_dict_consumption,
+                                                                 node_assignment_dict[sdo]['consumption'])
+        return assignment_dict_consumption
+
+    def check_custom_node_bound(self, node_assignment_dict, bound):
+        node_assignment_dict_consumption = self.get_node_assignment_dict_consumption(node_assignment_dict)
+        for resource in self.rap.resources:
+            if node_assignment_dict_consumption[resource] > bound[resource]:
+                return False
+        return True
+
+    def check_node_bounded(self, node_assignment_dict, node):
+        return self.check_custom_node_bound(node_assignment_dict, self.rap.available_resources[node])
+
+    def check_custom_bound(self, assignment_dict, bounds):
+        for node in set(assignment_dict.keys()):
+            if bounds[node] is None:
+                return False
+            if not self.check_custom_node_bound(assignment_dict[node], bounds[node]):
+                return False
+        return True
+
+    def get_residual_resources_on_node(self, node_assignment_dict, node):
+        assignment_dict_consumption = self.get_node_assignment_dict_consumption(node_assignment_dict)
+        residual_res = dict()
+        for resource in self.rap.resources:
+            if assignment_dict_consumption[resource] > self.rap.available_resources[node][resource]:
+                return None
+            residual_res[resource] = self.rap.available_resources[node][resource] - \
+                assignment_dict_consumption[resource]
+        return residual_res
+
+    def get_total_resources_amount(self):
+        total_resources = {resource: 0 for resource in self.rap.resources}
+        for node in self.rap.nodes:
+            total_resources = self.sum_resources(total_resources, self.rap.available_resources[node])
+        return total_resources
+
+    def get_bundle_resource_consumption(self, functions):
+        total_consumption = {resource: 0 for resource in self.rap.resources}
+        for function in functions:
+            total_consumption = self.sum_resources(total_consumption, self.rap.consumption[function])
+        return total_consumption
+
+    def resource_scalar(self, resource, node=None):
+        if node is None:
+            total_resources_amount = self.get_total_resources_amount()
+        else:
+            total_resources_amount = self.rap.available_resources[node]
+        avg = sum(total_resources_amount.values())/len(self.rap.resources)
+        return avg/total_resources_amount[resource]
+
+    def norm(self, node, resources):
+        return math.sqrt(sum([(resources[resource]*self.resource_scalar(resource, node))**2
+                              for resource in self.rap.resources]))
+
+
+def random_resources(rap, node, rnd):
+    """
+
+    :param ResourceAllocationProblem rap:
+    :param str node:
+    :param random.Random rnd:
+    :return dict[str, union[int, float]]: for each resource, an integer or fractional share of the available one
+    """
+    return {resource: rnd.choice([0, rnd.randint(1, rap.available_resources[node][resource]),
+                                  rap.available_resources[node][resource]*rnd.random()])
+            for resource in rap.resources}
+
+
+def random_node_assignment(rap, node, rnd):
+    """
+
+    :return dict[str, dict[str, union[int, dict, float]]]: bids of some sdos on the node, some without consumption
+    """
+    node_assignment = dict()
+    for sdo in rnd.sample(rap.sdos, rnd.randint(0, 4)):
+        node_assignment[sdo] = {'bid': rnd.randint(0, 100), 'timestamp': rnd.random()*1000}
+        if rnd.random() < 0.9:
+            node_assignment[sdo]['consumption'] = random_resources(rap, node, rnd)
+    return node_assignment
+
+
+def compare(label, value, reference, exact=True):
+    """
+
+    :param bool exact: if False, floats are compared up to the last bits
+    :return int: 1 if the values differ, 0 otherwise
+    """
+    if value != reference and (exact or not math.isclose(value, reference, rel_tol=1e-12)):
+        print("MISMATCH " + label + ": " + str(value) + " != " + str(reference))
+        return 1
+    return 0
+
+
+def check(rap, reference, rnd):
+    """
+    Checks a random assignment on each node
+    :param ResourceAllocationProblem rap:
+    :param ReferenceProblem reference:
+    :param random.Random rnd:
+    :return int: number of differences found
+    """
+    failures = 0
+    assignment = {node: random_node_assignment(rap, node, rnd) for node in rap.nodes}
+    bounds = {node: random_resources(rap, node, rnd) if rnd.random() < 0.9 else None for node in rap.nodes}
+    for node in rap.nodes:
+        a, b = random_resources(rap, node, rnd), random_resources(rap, node, rnd)
+        failures += compare(node + " sum", rap.sum_resources(a, b), reference.sum_resources(a, b))
+        failures += compare(node + " sub", rap.sub_resources(a, b), reference.sub_resources(a, b))
+        failures += compare(node + " norm", rap.norm(node, a), reference.norm(node, a), exact=False)
+        failures += compare(node + " consumption", rap.get_node_assignment_dict_consumption(assignment[node]),
+                            reference.get_node_assignment_dict_consumption(assignment[node]))
+        failures += compare(node + " bounded", rap.check_node_bounded(assignment[node], node),
+                            reference.check_node_bounded(assignment[node], node))
+        failures += compare(node + " residual", rap.get_residual_resources_on_node(assignment[node], node),
+                            reference.get_residual_resources_on_node(assignment[node], node))
+        if bounds[node] is not None:
+            failures += compare(node + " custom bound", rap.check_custom_node_bound(assignment[node], bounds[node]),
+                                reference.check_custom_node_bound(assignment[node], bounds[node]))
+    failures += compare("custom bounds", rap.check_custom_bound(assignment, bounds),
+                        reference.check_custom_bound(assignment, bounds))
+    failures += compare("total", rap.get_total_resources_amount(), reference.get_total_resources_amount())
+    functions = rnd.sample(rap.functions, rnd.randint(0, len(rap.functions)))
+    failures += compare("bundle", rap.get_bundle_resource_consumption(functions),
+                        reference.get_bundle_resource_consumption(functions))
+    return failures
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+    reference = ReferenceProblem(rap)
+
+    rnd = random.Random(args.seed)
+    failures = 0
+    for i in range(args.instances):
+        failures += check(rap, reference, rnd)
+        if i == args.instances // 2:
+            # the compiled form must follow the instance
+            rap.available_resources = {node: {resource: amount*rnd.randint(1, 3)
+                                              for resource, amount in rap.available_resources[node].items()}
+                                       for node in rap.nodes}
+
+    print(str(args.instances) + " assignments")
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
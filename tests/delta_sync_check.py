@@ -0,0 +1,218 @@
+"""
+Checks that the state of an sdo, sent to a neighbor through DeltaSynchronizer, is rebuilt by the neighbor as it is.
+The state changes at random between messages (bids replaced, added and removed, winners changed and emptied), on
+dicts and on DenseBiddingData, and messages go through the JSON and the binary wire formats.
+A missed message must make the receiver drop the following deltas and ask a snapshot once, through the resync flag of
+its next message; the snapshot sent back must bring the receiver in sync again. Duplicates must be dropped silently.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+
+from config.config import Configuration
+from dragon_agent.orchestration.dense_bidding_data import DenseBiddingData
+from dragon_agent.orchestration.winner_set import WinnerSet
+from dragon_agent.utils.delta_sync import DeltaSynchronizer
+from dragon_agent.utils.message_codec import BiddingMessageCodec
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+from tests.message_codec_check import json_round_trip, random_bid
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-n',
+        '--instances',
+        type=int,
+        default=50,
+        help='Number of random exchanges checked, for each wire format and bidding store.'
+    )
+    parser.add_argument(
+        '-r',
+        '--rounds',
+        type=int,
+        default=20,
+        help='Number of messages of each exchange.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the changes.'
+    )
+    return parser.parse_args()
+
+
+class Exchange:
+    """
+    State of a sender, changed at random, and the synchronizers of the sender and of the receiver
+    """
+
+    def __init__(self, rap, rnd, wire, dense):
+        """
+
+        :param ResourceAllocationProblem rap:
+        :param random.Random rnd:
+        :param function wire: encodes and decodes a message
+        :param bool dense: if True, bids are stored in a DenseBiddingData
+        """
+        self.rap = rap
+        self.rnd = rnd
+        self.wire = wire
+        self.sender, self.receiver = rap.sdos[0], rap.sdos[1]
+        bidding_data = {node: dict() for node in rap.nodes}
+        self.bidding_data = DenseBiddingData(rap, bidding_data) if dense else bidding_data
+        self.winners = {node: WinnerSet() for node in rap.nodes}
+        self.sender_sync = DeltaSynchronizer(self.sender)
+        self.receiver_sync = DeltaSynchronizer(self.receiver)
+
+        self.removed_bids = 0
+        self.emptied_winners = 0
+
+    def change(self):
+        """
+        Replaces, adds and removes some bids, and changes the winners of some nodes
+        """
+        for _ in range(self.rnd.randint(0, 6)):
+            node, sdo = self.rnd.choice(self.rap.nodes), self.rnd.choice(self.rap.sdos)
+            if sdo in self.bidding_data[node] and self.rnd.random() < 0.3:
+                del self.bidding_data[node][sdo]
+                self.removed_bids += 1
+            else:
+                self.bidding_data[node][sdo] = random_bid(self.rap, node, self.rnd, self.rnd.random() < 0.5)
+        for node in self.rnd.sample(self.rap.nodes, self.rnd.randint(0, 2)):
+            bidders = sorted(self.bidding_data[node])
+            winners = WinnerSet(self.rnd.sample(bidders, min(len(bidders), self.rnd.randint(0, 2))))
+            if len(winners) == 0 and len(self.winners[node]) > 0:
+                self.emptied_winners += 1
+            self.winners[node] = winners
+
+    def send(self, resync=False):
+        """
+
+        :param bool resync: if True, the message asks the receiver for a snapshot
+        :return BiddingMessage: the message to the receiver, as received
+        """
+        message = self.sender_sync.messages([self.receiver], self.winners, self.bidding_data, resync=resync)
+        return self.wire(message[self.receiver])
+
+    def ask_snapshot(self):
+        """
+        Sends a message of the receiver, asking a snapshot, to the sender
+        """
+        message = self.receiver_sync.messages([self.sender], {node: WinnerSet() for node in self.rap.nodes},
+                                              {node: dict() for node in self.rap.nodes}, resync=True)
+        self.sender_sync.receive(self.wire(message[self.sender]))
+
+    def differences(self, full_message):
+        """
+
+        :param BiddingMessage full_message: the state of the sender, as rebuilt by the receiver
+        :return list of str: the parts of the state that have not been rebuilt as they are
+        """
+        fields = list()
+        if full_message is None:
+            return ['message dropped']
+        if {node: WinnerSet.of(winners) for node, winners in full_message.winners.items()} != self.winners:
+            fields.append('winners')
+        if {node: dict(full_message.bidding_data[node]) for node in full_message.bidding_data} != \
+                {node: dict(self.bidding_data[node]) for node in self.bidding_data}:
+            fields.append('bidding data')
+        return fields
+
+
+def exchange(rap, rnd, wire, dense, rounds):
+    """
+
+    :return (list of str, int, int): differences found, bids removed and winners emptied along the exchange
+    """
+    failures = list()
+    ex = Exchange(rap, rnd, wire, dense)
+    for r in range(rounds):
+        ex.change()
+        failures += [str(r) + " " + field for field in ex.differences(ex.receiver_sync.receive(ex.send()))]
+
+    # a message is missed: the following deltas are dropped, and a snapshot is asked once
+    ex.change()
+    ex.send()
+    for r in range(3):
+        ex.change()
+        if ex.receiver_sync.receive(ex.send()) is not None:
+            failures.append("gap: delta applied")
+        requests = ex.receiver_sync.resync_requests()
+        if requests != ({ex.sender} if r == 0 else set()):
+            failures.append("gap: resync requests " + str(sorted(requests)))
+
+    # the snapshot brings the receiver in sync again
+    ex.ask_snapshot()
+    if ex.sender_sync.snapshot_requests() != {ex.receiver}:
+        failures.append("resync: snapshot not requested")
+    ex.change()
+    snapshot = ex.send()
+    if snapshot.delta or len(ex.sender_sync.snapshot_requests()) > 0:
+        failures.append("resync: no snapshot sent")
+    failures += ["snapshot " + field for field in ex.differences(ex.receiver_sync.receive(snapshot))]
+    ex.change()
+    duplicate = ex.send()
+    failures += ["after snapshot " + field for field in ex.differences(ex.receiver_sync.receive(duplicate))]
+
+    # duplicates are dropped without asking anything
+    if ex.receiver_sync.receive(duplicate) is not None or len(ex.receiver_sync.resync_requests()) > 0:
+        failures.append("duplicate: not dropped silently")
+
+    # once in sync, a new gap is detected again
+    ex.change()
+    ex.send()
+    ex.change()
+    if ex.receiver_sync.receive(ex.send()) is not None or ex.receiver_sync.resync_requests() != {ex.sender}:
+        failures.append("second gap: not detected")
+    return failures, ex.removed_bids, ex.emptied_winners
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+    # missed messages are expected
+    logging.disable(logging.WARNING)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+    codec = BiddingMessageCodec(rap)
+    wires = [("json", json_round_trip), ("binary", lambda message: codec.decode(codec.encode(message)))]
+
+    rnd = random.Random(args.seed)
+    failures = 0
+    removed_bids = 0
+    emptied_winners = 0
+    for i in range(args.instances):
+        for wire_name, wire in wires:
+            for dense in (False, True):
+                label = str(i) + " " + wire_name + (" dense" if dense else "")
+                exchange_failures, removed, emptied = exchange(rap, rnd, wire, dense, args.rounds)
+                removed_bids += removed
+                emptied_winners += emptied
+                for failure in exchange_failures:
+                    failures += 1
+                    print("MISMATCH " + label + ": " + failure)
+
+    if removed_bids == 0 or emptied_winners == 0:
+        failures += 1
+        print("MISMATCH no bid removed or no winners emptied, try more instances")
+
+    print(str(args.instances) + " exchanges, " + str(removed_bids) + " bids removed, " + str(emptied_winners) +
+          " winners emptied")
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
@@ -0,0 +1,117 @@
+"""
+Checks that DenseBiddingData holds the same bids of BiddingData, fractional consumption included.
+Random bidding tables of the instance are stored in both, then read back, updated through the node views and copied:
+entries, total consumption of each node and the election on each node must be identical.
+"""
+
+import argparse
+import json
+import random
+import sys
+
+from config.config import Configuration
+from dragon_agent.orchestration.bidding_data import BiddingData
+from dragon_agent.orchestration.dense_bidding_data import DenseBiddingData
+from dragon_agent.orchestration.election import ElectionEngine
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-n',
+        '--instances',
+        type=int,
+        default=200,
+        help='Number of random bidding tables checked.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the bids.'
+    )
+    return parser.parse_args()
+
+
+def random_bid(rap, node, rnd):
+    """
+
+    :param ResourceAllocationProblem rap:
+    :param str node:
+    :param random.Random rnd:
+    :return dict: a bid whose consumption is, for each resource, a multiple of halves, thirds or eighths of the
+    available one
+    """
+    return {'bid': rnd.choice([0, rnd.randint(1, 100), rnd.random()*100]),
+            'consumption': {resource: rap.available_resources[node][resource]*rnd.randint(1, 6)/rnd.choice([2, 3, 8])
+                            for resource in rap.resources},
+            'timestamp': rnd.random()*1000}
+
+
+def compare(rap, dict_data, dense_data, election_engines, label):
+    """
+
+    :return int: number of differences found
+    """
+    failures = 0
+    for node in rap.nodes:
+        if dict(dense_data[node]) != dict(dict_data[node]):
+            failures += 1
+            print("MISMATCH " + label + " " + node + ": entries")
+        if dense_data[node].total_consumption() != dict_data[node].total_consumption():
+            failures += 1
+            print("MISMATCH " + label + " " + node + ": total consumption " +
+                  str(dense_data[node].total_consumption()) + " != " + str(dict_data[node].total_consumption()))
+        dict_election = election_engines[0].elect(node, dict_data[node])
+        dense_election = election_engines[1].elect(node, dense_data[node])
+        if dense_election != dict_election:
+            failures += 1
+            print("MISMATCH " + label + " " + node + ": election " + str(dense_election) + " != " + str(dict_election))
+    return failures
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+
+    rnd = random.Random(args.seed)
+    failures = 0
+    for i in range(args.instances):
+        election_engines = (ElectionEngine(rap), ElectionEngine(rap))
+        bidding_data = {node: {sdo: random_bid(rap, node, rnd) for sdo in rap.sdos if rnd.random() < 0.8}
+                        for node in rap.nodes}
+        dict_data = BiddingData(bidding_data)
+        dense_data = DenseBiddingData(rap, bidding_data)
+        failures += compare(rap, dict_data, dense_data, election_engines, str(i) + " stored")
+
+        # replace and remove single bids through the node views, then copy
+        for _ in range(10):
+            node = rnd.choice(rap.nodes)
+            sdo = rnd.choice(rap.sdos)
+            if sdo in dict_data[node] and rnd.random() < 0.3:
+                del dict_data[node][sdo]
+                del dense_data[node][sdo]
+            else:
+                bid = random_bid(rap, node, rnd)
+                dict_data[node][sdo] = bid
+                dense_data[node][sdo] = dict(bid)
+        failures += compare(rap, dict_data, dense_data, election_engines, str(i) + " updated")
+        failures += compare(rap, dict_data.copy(), dense_data.copy(), election_engines, str(i) + " copied")
+
+    print(str(args.instances) + " bidding tables")
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
@@ -0,0 +1,188 @@
+"""
+Checks that FalseWinnerResolver finds the same false winners of the original recursive search, kept here as
+reference, on random elections (each sdo bidding on some nodes, one or two winners per node, distinct max bids),
+on a tangled chain where the false winners depend on each other through a cycle of lost nodes, and on a long chain,
+deeper than the recursion limit of the reference search.
+"""
+
+import argparse
+import itertools
+import random
+import sys
+
+from dragon_agent.orchestration.false_winners import FalseWinnerResolver
+from dragon_agent.orchestration.winner_set import WinnerSet
+
+TANGLED_CHAIN = {'winners': {'n0': {'sdo0'}, 'n1': {'sdo1'}, 'n2': {'sdo2'}},
+                 'bidded_nodes': {'sdo0': {'n0', 'n2'}, 'sdo1': {'n0', 'n1', 'n2'}, 'sdo2': {'n1', 'n2'}},
+                 'max_bids': {'sdo0': 19, 'sdo1': 11, 'sdo2': 6},
+                 'false_winners': {'sdo0', 'sdo1'}}
+"""
+sdo0 lost n2 against sdo2, sdo1 lost n0 against sdo0 and n2 against sdo2, sdo2 lost n1 against sdo1.
+sdo1 loses for sure against sdo2 and, once it is out, sdo2 is a true winner: so sdo0, the higher bidder, is a false
+winner as well, since it lost n2 against sdo2.
+"""
+
+
+def long_chain(length):
+    """
+    Each sdo wins its own node and loses the next one against the next sdo, the last one wins all its nodes: going
+    back from the last, every other sdo is a false winner
+    :param int length: number of sdos
+    :return: winners, bidded nodes, max bids and false winners of the chain
+    """
+    sdos = ['sdo' + str(i) for i in range(length)]
+    winners = {'n' + str(i): WinnerSet([sdos[i]]) for i in range(length)}
+    bidded_nodes = {sdos[i]: {'n' + str(i), 'n' + str(i + 1)} for i in range(length - 1)}
+    bidded_nodes[sdos[-1]] = {'n' + str(length - 1)}
+    max_bids = {sdos[i]: length - i for i in range(length)}
+    return winners, bidded_nodes, max_bids, set(sdos[length - 2::-2])
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-n',
+        '--instances',
+        type=int,
+        default=20000,
+        help='Number of random elections checked.'
+    )
+    parser.add_argument(
+        '-l',
+        '--chain_length',
+        type=int,
+        default=1500,
+        help='Number of sdos of the long chain.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the elections.'
+    )
+    return parser.parse_args()
+
+
+def reference_false_winners(winners, bidded_nodes, lost_nodes, max_bids):
+    """
+    False winners, as computed by the original SdoOrchestrator._compute_false_winners
+    """
+    known_fakes = set()
+    for sdo in sorted(set(itertools.chain(*winners.values())), key=lambda x: max_bids[x], reverse=True):
+        if sdo in known_fakes:
+            continue
+        if len(bidded_nodes[sdo]) > 0 and len(lost_nodes[sdo]) > 0:
+            collected_fakes = set()
+            for node in lost_nodes[sdo]:
+                false_winner, found_falses = reference_find_false_winner(sdo, node, winners, max_bids, bidded_nodes,
+                                                                         lost_nodes, known_fakes)
+                collected_fakes.update(found_falses)
+                if false_winner is not None:
+                    collected_fakes.add(false_winner)
+                    continue
+                else:
+                    known_fakes.add(sdo)
+                    break
+            for fake in sorted(set(collected_fakes)):
+                real_losts = [node for node in lost_nodes[fake] if len(winners[node].difference(known_fakes)) > 0]
+                if len(real_losts) > 0:
+                    known_fakes.add(fake)
+    return set(known_fakes)
+
+
+def reference_find_false_winner(sdo, node, winners, max_bids, bidded_nodes, lost_nodes, known_falses, ignore=list()):
+    """
+    The original SdoOrchestrator._find_false_winner
+    """
+    found_falses = set()
+    for w in sorted(winners[node], key=lambda x: max_bids[x]):
+        if w in known_falses:
+            return w, found_falses
+        if w not in ignore and len(bidded_nodes[w]) > 0:
+            for lost_node in lost_nodes[w]:
+                other_false, other_falses = reference_find_false_winner(w, lost_node, winners, max_bids, bidded_nodes,
+                                                                        lost_nodes, known_falses.union(found_falses),
+                                                                        ignore + [sdo])
+                if other_false is None:
+                    return w, found_falses
+                else:
+                    found_falses.add(other_false)
+                    found_falses.update(other_falses)
+    return None, found_falses
+
+
+def random_election(rnd):
+    """
+
+    :param random.Random rnd:
+    :return: winners, bidded nodes and max bids of a random election
+    """
+    sdos = ['sdo' + str(i) for i in range(rnd.randint(2, 7))]
+    nodes = ['n' + str(i) for i in range(rnd.randint(2, 6))]
+    bidded_nodes = {sdo: set(rnd.sample(nodes, rnd.randint(1, len(nodes)))) for sdo in sdos}
+    winners = dict()
+    for node in nodes:
+        bidders = [sdo for sdo in sdos if node in bidded_nodes[sdo]]
+        winners[node] = WinnerSet(rnd.sample(bidders, min(len(bidders), rnd.randint(1, 2))))
+    max_bids = dict(zip(sdos, rnd.sample(range(1, 1000), len(sdos))))
+    return winners, bidded_nodes, max_bids
+
+
+def false_winners(winners, bidded_nodes, max_bids):
+    """
+
+    :return (FalseWinnerResolver, set of str, set of str): the resolver, with the false winners it found, and the
+        ones found by the reference search
+    """
+    lost_nodes = lost(winners, bidded_nodes)
+    resolver = FalseWinnerResolver(winners, bidded_nodes, lost_nodes, max_bids)
+    return resolver, resolver.resolve(), reference_false_winners(winners, bidded_nodes, lost_nodes, max_bids)
+
+
+def lost(winners, bidded_nodes):
+    """
+
+    :return dict[str, set of str]: for each sdo, nodes where it bid but it was not elected
+    """
+    return {sdo: {node for node in bidded_nodes[sdo] if sdo not in winners[node]} for sdo in bidded_nodes}
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    rnd = random.Random(args.seed)
+
+    failures = 0
+    _, resolved, reference = false_winners(TANGLED_CHAIN['winners'], TANGLED_CHAIN['bidded_nodes'],
+                                        TANGLED_CHAIN['max_bids'])
+    if resolved != TANGLED_CHAIN['false_winners'] or reference != TANGLED_CHAIN['false_winners']:
+        failures += 1
+        print("MISMATCH tangled chain: " + str(sorted(resolved)) + " (reference " + str(sorted(reference)) + ")")
+
+    # the search must not be bound by the recursion limit
+    winners, bidded_nodes, max_bids, expected = long_chain(args.chain_length)
+    resolved = FalseWinnerResolver(winners, bidded_nodes, lost(winners, bidded_nodes), max_bids).resolve()
+    if resolved != expected:
+        failures += 1
+        print("MISMATCH long chain: " + str(len(resolved)) + " false winners (expected " + str(len(expected)) + ")")
+
+    found = 0
+    searched = 0
+    reused = 0
+    for i in range(args.instances):
+        winners, bidded_nodes, max_bids = random_election(rnd)
+        resolver, resolved, reference = false_winners(winners, bidded_nodes, max_bids)
+        found += len(reference)
+        searched += resolver.searched
+        reused += resolver.reused
+        if resolved != reference:
+            failures += 1
+            print("MISMATCH election " + str(i) + ": " + str(sorted(resolved)) + " (reference " +
+                  str(sorted(reference)) + ")")
+
+    print(str(args.instances) + " elections, " + str(found) + " false winners, " + str(searched) +
+          " search steps, " + str(reused) + " settled steps reused")
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
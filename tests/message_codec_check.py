@@ -0,0 +1,155 @@
+"""
+Checks that bidding messages encoded by BiddingMessageCodec are decoded as they were sent, as JSON ones are.
+Random bidding data of the instance (integer and fractional consumption, missing entries) are sent as dicts and as
+DenseBiddingData, with or without sequence number and resync request: sender, winners, bids, timestamps and flags
+must come back unchanged. Messages built on a different instance must be refused.
+"""
+
+import argparse
+import json
+import random
+import sys
+
+from config.config import Configuration
+from dragon_agent.orchestration.dense_bidding_data import DenseBiddingData
+from dragon_agent.orchestration.winner_set import WinnerSet
+from dragon_agent.utils.bidding_message import BiddingMessage
+from dragon_agent.utils.message_codec import BiddingMessageCodec
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-n',
+        '--instances',
+        type=int,
+        default=500,
+        help='Number of random messages checked.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the messages.'
+    )
+    return parser.parse_args()
+
+
+def random_bid(rap, node, rnd, fractional):
+    """
+
+    :param ResourceAllocationProblem rap:
+    :param str node:
+    :param random.Random rnd:
+    :param bool fractional: if True, consumption may be fractional
+    :return dict: a bid entry
+    """
+    return {'bid': rnd.choice([0, rnd.randint(1, 100), rnd.random()*100]),
+            'consumption': {resource: rap.available_resources[node][resource]*rnd.randint(0, 4) /
+                            (rnd.choice([2, 3, 8]) if fractional else 4)
+                            for resource in rap.resources},
+            'timestamp': rnd.random()*1000}
+
+
+def random_message(rap, rnd):
+    """
+
+    :return BiddingMessage: a message carrying the whole state of a random sdo
+    """
+    fractional = rnd.random() < 0.5
+    bidding_data = {node: {sdo: random_bid(rap, node, rnd, fractional) for sdo in rap.sdos if rnd.random() < 0.6}
+                    for node in rap.nodes}
+    winners = {node: WinnerSet(rnd.sample(sorted(bidding_data[node]), min(len(bidding_data[node]), rnd.randint(0, 2))))
+               for node in rap.nodes}
+    sequence = rnd.choice([None, rnd.randint(0, 2**40)])
+    return BiddingMessage(sender=rnd.choice(rap.sdos), winners=winners, bidding_data=bidding_data, sequence=sequence,
+                          resync=sequence is not None and rnd.random() < 0.3)
+
+
+def json_round_trip(message):
+    """
+    Encodes and decodes the message as Messaging does for the JSON wire format
+    :param BiddingMessage message:
+    :return BiddingMessage:
+    """
+    decoded = BiddingMessage()
+    decoded.parse_dict(json.loads(json.dumps(message.to_dict())))
+    return decoded
+
+
+def differences(message, decoded):
+    """
+
+    :param BiddingMessage message: the message sent
+    :param BiddingMessage decoded: the message received
+    :return list of str: the fields that did not come back as they were sent
+    """
+    bidding_data = message.bidding_data.to_dict() if hasattr(message.bidding_data, 'to_dict') \
+        else message.bidding_data
+    fields = list()
+    for field, sent, received in [('sender', message.sender, decoded.sender),
+                                  ('winners', message.winners, decoded.winners),
+                                  ('bidding data', bidding_data, decoded.bidding_data),
+                                  ('timestamp', message.timestamp, decoded.timestamp),
+                                  ('sequence', message.sequence, decoded.sequence),
+                                  ('delta', message.delta, decoded.delta),
+                                  ('resync', message.resync, decoded.resync)]:
+        if sent != received:
+            fields.append(field)
+    # fingerprints are what winner sets are compared on first
+    if any(decoded.winners[node].fingerprint != WinnerSet(message.winners[node]).fingerprint
+           for node in message.winners if node in decoded.winners):
+        fields.append('winner fingerprints')
+    return fields
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+    codec = BiddingMessageCodec(rap)
+
+    rnd = random.Random(args.seed)
+    failures = 0
+    for i in range(args.instances):
+        message = random_message(rap, rnd)
+        dense_message = BiddingMessage(sender=message.sender, winners=message.winners,
+                                       bidding_data=DenseBiddingData(rap, message.bidding_data),
+                                       sequence=message.sequence, resync=message.resync)
+        dense_message.timestamp = message.timestamp
+        for label, decoded in [("binary", codec.decode(codec.encode(message))),
+                               ("binary dense", codec.decode(codec.encode(dense_message))),
+                               ("json", json_round_trip(message)),
+                               ("json dense", json_round_trip(dense_message))]:
+            fields = differences(message, decoded)
+            if len(fields) > 0:
+                failures += 1
+                print("MISMATCH " + str(i) + " " + label + ": " + ", ".join(fields))
+
+    # an other instance, with one more sdo
+    other_rap = ResourceAllocationProblem()
+    other_rap.parse_dict(rap.to_dict())
+    other_rap.sdos = rap.sdos + ['sdo' + str(len(rap.sdos))]
+    try:
+        BiddingMessageCodec(other_rap).decode(codec.encode(random_message(rap, rnd)))
+        failures += 1
+        print("MISMATCH message built on a different instance has been decoded")
+    except ValueError:
+        pass
+
+    print(str(args.instances) + " messages")
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
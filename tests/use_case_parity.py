@@ -0,0 +1,100 @@
+"""
+Checks that the orchestrators of the use cases (CDN and mobile game) share the orchestration engine of the sdo agent.
+Each sdo of the instance is orchestrated by the core SdoOrchestrator and by the use-case ones, with the use-case
+switches set back to the core values: bundles, bids and bid ratios must be identical.
+With the SERVICE utility sdo0 is skipped, since it is the one using the use-case utility.
+State is serialized and parsed back between two orchestrations.
+"""
+
+import argparse
+import copy
+import json
+import random
+import sys
+
+from config.config import Configuration
+from resource_assignment.resource_assignment_problem import ResourceAllocationProblem
+from dragon_agent.orchestration.sdo_orchestrator import SdoOrchestrator
+from use_cases_simulation.cdn import sdo_orchestrator as cdn_orchestrator
+from use_cases_simulation.game import sdo_orchestrator as game_orchestrator
+
+ORCHESTRATORS = [("core", SdoOrchestrator),
+                 ("cdn", cdn_orchestrator.SdoOrchestrator),
+                 ("game", game_orchestrator.SdoOrchestrator)]
+SWITCHES = ['RELEASE_BIDS_ON_ORCHESTRATION', 'EXCLUDE_COMPLETED_BID_NODES', 'GREEDY_TIME_LIMIT',
+            'KEEP_LOWEST_BID_RATIO']
+UTILITIES = ["SERVICE", "GREEDY", "LOAD-BALANCE", "NODE-LOADING", "POWER-CONSUMPTION", "BEST-FIT-POLICY"]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-d',
+        '--conf_file',
+        nargs='?',
+        default='config/default-config.ini',
+        help='Configuration file.'
+    )
+    parser.add_argument(
+        '-s',
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed used to draw the service bundles.'
+    )
+    return parser.parse_args()
+
+
+def orchestrate(orchestrator_class, sdo, rap, bundle):
+    """
+
+    :param orchestrator_class: class of the orchestrator to use
+    :param str sdo:
+    :param ResourceAllocationProblem rap:
+    :param list of str bundle:
+    :return: the state of the orchestrator after each of two orchestrations
+    """
+    orchestrator = orchestrator_class(sdo, rap, bundle)
+    for switch in SWITCHES:
+        setattr(orchestrator, switch, getattr(SdoOrchestrator, switch))
+    states = list()
+    for _ in range(2):
+        orchestrator.sdo_orchestrate()
+        state = orchestrator.serialize()
+        states.append({'implementations': state['implementations'],
+                       'per-node-max-bid-ratio': state['per-node-max-bid-ratio'],
+                       'bids': {node: state['bidding-data'][node][sdo]['bid'] for node in rap.nodes}})
+        orchestrator.parse(copy.deepcopy(state))
+    return states
+
+
+if __name__ == "__main__":
+
+    args = parse_arguments()
+    configuration = Configuration(args.conf_file)
+
+    rap = ResourceAllocationProblem()
+    with open(configuration.RAP_INSTANCE) as rap_file:
+        rap.parse_dict(json.loads(rap_file.read()))
+
+    rnd = random.Random(args.seed)
+    bundle_size = max(1, len(rap.services)*configuration.BUNDLE_PERCENTAGE//100)
+    bundles = {sdo: rnd.sample(rap.services, bundle_size) for sdo in rap.sdos}
+
+    failures = 0
+    for utility in UTILITIES:
+        configuration.PRIVATE_UTILITY = utility
+        for submodular in (False, True):
+            configuration.SUBMODULAR_P_UTILITY = submodular
+            for sdo in rap.sdos:
+                if utility == "SERVICE" and sdo == 'sdo0':
+                    continue
+                core_states = orchestrate(SdoOrchestrator, sdo, rap, bundles[sdo])
+                for name, orchestrator_class in ORCHESTRATORS[1:]:
+                    if orchestrate(orchestrator_class, sdo, rap, bundles[sdo]) != core_states:
+                        failures += 1
+                        print("MISMATCH " + name + " " + utility + " submodular=" + str(submodular) + " " + sdo)
+            print("{:20s} submodular={:5s} done".format(utility, str(submodular).lower()))
+
+    print(str(failures) + " mismatches")
+    sys.exit(1 if failures > 0 else 0)
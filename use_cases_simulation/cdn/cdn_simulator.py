@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import shutil
@@ -10,6 +11,7 @@ from numpy import random
 from subprocess import TimeoutExpired
 
 from config.config import Configuration
+from dragon_agent.utils.statistics_provider import StatisticsProvider
 from resource_assignment.resoruce_allocation_problem import ResourceAllocationProblem
 
 
@@ -127,11 +129,10 @@ users_per_node_list = [
     {"node0": 10, "node1": 10, "node2": 10, "node3": 10, "node4": 10, "node5": 10, "node6": 10, "node7": 10, "node8": 12, "node9": 8},  # 19
 ]
 
-stat_filename = "config/use_case_stat/cache_statistics.json"
+statistics = StatisticsProvider.of("config/use_case_stat/cache_statistics.json")
 init_stats = {'misses-ratio': {'node0': 1, 'node1': 1, 'node2': 1, 'node3': 1, 'node4': 1, 'node5': 1, 'node6': 1, 'node7': 1, 'node8': 1, 'node9': 1}, 'max-caches': 31500, 'current-caches-storage': {'node0': 0, 'node1': 0, 'node2': 0, 'node3': 0, 'node4': 0, 'node5': 0, 'node6': 0, 'node7': 0, 'node8': 0, 'node9': 0}, 'traffic': {'node0': 3, 'node1': 6, 'node2': 4, 'node3': 0, 'node4': 0, 'node5': 0, 'node6': 0, 'node7': 0, 'node8': 0, 'node9': 0}}
 
-with open(stat_filename, "w") as f:
-    f.write(json.dumps(init_stats, indent=4))
+statistics.push(init_stats)
 
 USER_AVG_STORAGE = 256
 
@@ -149,8 +150,7 @@ except OSError as err:
 
 
 while current_distribution < len(users_per_node_list):
-    with open(stat_filename, "r") as stat_file:
-        stats = json.loads(stat_file.read())
+    stats = copy.deepcopy(statistics.stats())
 
     try:
         with open(placement_filename, "r") as placement_file:
@@ -173,8 +173,7 @@ while current_distribution < len(users_per_node_list):
             tot_users += n_users
         stats["misses-ratio"][node] = round(misses_ratio, 2)
 
-    with open(stat_filename, "w") as f:
-        f.write(json.dumps(stats, indent=4))
+    statistics.push(stats)
 
     gini = gini_index(users_per_node_list[current_distribution])
     herfindahl = herfindahl_index(users_per_node_list[current_distribution])
@@ -217,8 +216,7 @@ while current_distribution < len(users_per_node_list):
         except TimeoutExpired:
             p.kill()
 
-with open(stat_filename, "w") as f:
-    f.write(json.dumps(init_stats, indent=4))
+statistics.push(init_stats)
 
 try:
     os.remove("sdo_instances/sdo0_frozen")
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import shutil
@@ -10,6 +11,8 @@ from numpy import random
 from subprocess import TimeoutExpired
 
 from config.config import Configuration
+from dragon_agent.utils.latency_table import LatencyTable
+from dragon_agent.utils.statistics_provider import StatisticsProvider
 from resource_assignment.resoruce_allocation_problem import ResourceAllocationProblem
 
 
@@ -60,61 +63,6 @@ def users_range_size(data, user_a, user_b):
     return sum([size for i, size in enumerate(data) if user_a <= i <= user_b])
 
 
-def get_latency(topology, node_a, node_b):
-
-    shortest_path = get_path(topology, node_a, node_b)
-
-    latency = 0
-    src = node_a
-    for dst in shortest_path[1:]:
-        latency += topology[src+':'+dst]
-        src = dst
-    return latency
-
-
-def get_path(topology, node_a, node_b):
-
-    if node_a == node_b:
-        return []
-
-    a_tree = dict()
-    a_tree[node_a] = _get_tree_to_domain(topology, node_a, node_b, len(rap.nodes) - 2)
-    a_paths = _get_path_list(a_tree, [])
-    a_paths = [path for path in a_paths if path[-1] == node_b]
-
-    if len(a_paths) == 0:
-        return None
-    shortest_path = a_paths[0]
-    for path in a_paths:
-        if len(path) < len(shortest_path):
-            shortest_path = path
-    return shortest_path
-
-
-def _get_path_list(tree, prefix):
-    paths = []
-    for domain in tree:
-        p = []
-        p.extend(prefix)
-        p.append(domain)
-        if len(tree[domain]) > 0:
-            paths.extend(_get_path_list(tree[domain], p))
-        else:
-            prefix.append(domain)
-            paths.append(prefix)
-    return paths
-
-
-def _get_tree_to_domain(topology, root_node, leaf_node, deep):
-    tree = {}
-    for link in [l for l in topology if l.split(':')[0] == root_node]:
-        if link.split(':')[1] != leaf_node and deep > 0:
-            tree[link.split(':')[1]] = _get_tree_to_domain(topology, link.split(':')[1], leaf_node, deep-1)
-        else:
-            tree[link.split(':')[1]] = {}
-    return tree
-
-
 def compute_que(l):
 
     if l < LATENCY_EXCL_THRESHOLD:
@@ -272,14 +220,13 @@ if __name__ == "__main__":
         {"node0": 0, "node1": 0, "node2": 0, "node3": 0, "node4": 0, "node5": 0, "node6": 0, "node7": 0, "node8": 1, "node9": 0}        # 12
     ]
 
-    get_latency(edge_topology, "node0", "node1")
+    latency_table = LatencyTable(edge_topology)
 
-    stat_filename = "config/use_case_stat/game_statistics.json"
+    statistics = StatisticsProvider.of("config/use_case_stat/game_statistics.json")
     init_stats = {'users': {'node0': 1, 'node1': 0, 'node2': 0, 'node3': 0, 'node4': 0, 'node5': 0, 'node6': 0, 'node7': 0, 'node8': 0, 'node9': 0}, 'max-copies': 4, 'current-copies': {'node0': 1, 'node1': 0, 'node2': 0, 'node3': 0, 'node4': 0, 'node5': 0, 'node6': 0, 'node7': 0, 'node8': 0, 'node9': 0}, 'traffic': {'node0': 3, 'node1': 6, 'node2': 4, 'node3': 0, 'node4': 0, 'node5': 0, 'node6': 0, 'node7': 0, 'node8': 0, 'node9': 0}, 'function': 'f10', 'topology': edge_topology, 'max-latency': 210}
     migrating_stats = dict(init_stats)
 
-    with open(stat_filename, "w") as f:
-        f.write(json.dumps(init_stats, indent=4))
+    statistics.push(init_stats)
 
     current_distribution = 0
     stationary_iteration = 0
@@ -296,8 +243,7 @@ if __name__ == "__main__":
         pass
 
     while current_distribution < len(users_per_node_list):
-        with open(stat_filename, "r") as stat_file:
-            stats = json.loads(stat_file.read())
+        stats = copy.deepcopy(statistics.stats())
 
         try:
             with open(placement_filename, "r") as placement_file:
@@ -312,7 +258,7 @@ if __name__ == "__main__":
         game_node = [node for node in stats['current-copies'] if stats['current-copies'][node] == 1][0]
         if migrating > 0:
             game_node = [node for node in migrating_stats['current-copies'] if migrating_stats['current-copies'][node] == 1][0]
-        latency = (base_latency + get_latency(edge_topology, user_node, game_node))*quality_factor(stats['function'])
+        latency = (base_latency + latency_table.latency(user_node, game_node))*quality_factor(stats['function'])
 
         qoe = compute_que(latency)
         allow_migration = False
@@ -404,8 +350,7 @@ if __name__ == "__main__":
             stats["misses-ratio"][node] = round(misses_ratio, 2)
         '''
 
-        with open(stat_filename, "w") as f:
-            f.write(json.dumps(stats, indent=4))
+        statistics.push(stats)
 
         '''
         gini = gini_index(users_per_node_list[current_distribution])
@@ -445,8 +390,7 @@ if __name__ == "__main__":
         if migrating > 0:
             migrating -= 1
 
-    with open(stat_filename, "w") as f:
-        f.write(json.dumps(init_stats, indent=4))
+    statistics.push(init_stats)
 
     try:
         os.remove("sdo_instances/sdo0_frozen")